@@ -0,0 +1,1202 @@
+"""
+Bedrock / Amazon Q CLI 사용량 분석 코어
+
+Athena 트래커(BedrockAthenaTracker, QCliAthenaTracker)와 리전 설정을 UI 없이 제공합니다.
+streamlit/plotly를 import하지 않으므로 CLI나 cron 작업에서 가볍게 불러올 수 있고,
+대시보드(bedrock_tracker.py)와 CLI(bedrock_tracker_cli.py)가 같은 구현을 공유합니다.
+쿼리 실패는 로그와 on_error 콜백으로 전달하고, 결과는 빈 DataFrame으로 반환합니다.
+합계 컬럼은 COALESCE(SUM(...), 0)으로 조회하므로, 값이 모두 NULL인 그룹도 표와 차트에 0으로 표시됩니다.
+
+가격 계산(pricing), 쿼리 조건절(query_builder), 사용량 큐브(usage_cube),
+S3 로그 분석(qcli_s3_analyzer)도 이 모듈에서 함께 import할 수 있습니다.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import boto3
+import pandas as pd
+
+# Athena 쿼리 실행/결과 조회 유틸리티
+from athena_utils import (
+    DEFAULT_CHUNK_ROWS,
+    DEFAULT_QUERY_TIMEOUT,
+    AthenaQueryHandle,
+    fetch_query_results,
+    iter_completed_queries,
+    iter_query_result_chunks,
+    start_query,
+)
+
+# Athena 쿼리 결과 디스크 캐시
+from query_cache import OPEN_RANGE_TTL, QueryResultCache, cache_ttl_for_range
+
+# 파티션 프루닝 날짜 조건 / 가격 CTE
+from query_builder import (
+    bedrock_cost_expression,
+    bedrock_partition_predicate,
+    bedrock_price_cte,
+    bedrock_price_join,
+    qcli_date_predicate,
+)
+
+# 단일 스캔 사용량 큐브
+from usage_cube import UsageCube
+
+# 대시보드/CLI가 코어에서 함께 가져가는 헬퍼 (모델 가격 / 비용 계산, S3 로그 분석)
+from pricing import calculate_cost_for_dataframe, calculate_user_costs, get_token_pricing  # noqa: F401
+from qcli_s3_analyzer import (  # noqa: F401
+    DEFAULT_MAX_RETRIES as DEFAULT_S3_RETRIES,
+    DEFAULT_MAX_WORKERS as DEFAULT_S3_WORKERS,
+    QCliS3LogAnalyzer,
+)
+
+
+# 리전 설정
+REGIONS = {
+    "us-east-1": "US East (N. Virginia)",
+    "us-west-2": "US West (Oregon)",
+    "eu-central-1": "Europe (Frankfurt)",
+    "ap-northeast-1": "Asia Pacific (Tokyo)",
+    "ap-northeast-2": "Asia Pacific (Seoul)",
+    "ap-southeast-1": "Asia Pacific (Singapore)",
+}
+
+default_region = "us-east-1"
+
+
+class AthenaTracker:
+    """Athena 트래커 공통 기반 클래스
+
+    Athena/S3 클라이언트, 쿼리 결과 캐시, 타임아웃과 쿼리 실행/결과 조회를 담당합니다.
+    하위 클래스는 DATABASE와 결과 버킷 이름(_default_results_bucket),
+    그리고 각 분석 쿼리만 제공합니다.
+    """
+
+    # 쿼리를 실행할 기본 Athena 데이터베이스
+    DATABASE = None
+
+    def __init__(
+        self,
+        region=default_region,
+        query_timeout: float = DEFAULT_QUERY_TIMEOUT,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+        on_error: Optional[Callable[[str], None]] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Args:
+            region: AWS 리전
+            query_timeout: 쿼리 완료 대기 제한 시간 (초)
+            use_cache: 쿼리 결과 디스크 캐시 사용 여부
+            refresh_cache: 캐시를 읽지 않고 새 결과로 덮어쓸지 여부
+            on_error: 쿼리 실패 메시지를 받을 콜백 (예: st.error). 없으면 로그만 남김
+            logger: 로거 (없으면 모듈 로거)
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_error = on_error
+        self.logger.info(f"Initializing {type(self).__name__} with region: {region}")
+        self.region = region
+        self.query_timeout = query_timeout
+        # 쿼리 결과 캐시 (refresh_cache면 캐시를 읽지 않고 새 결과로 덮어씀)
+        self.cache = QueryResultCache(logger=self.logger) if use_cache else None
+        self.refresh_cache = refresh_cache
+        self.athena = boto3.client("athena", region_name=region)
+        # 대용량 결과는 S3 결과 CSV를 직접 다운로드
+        self.s3 = boto3.client("s3", region_name=region)
+        # STS 클라이언트도 region을 지정하여 생성
+        sts_client = boto3.client("sts", region_name=region)
+        self.account_id = sts_client.get_caller_identity()["Account"]
+        self.results_bucket = self._default_results_bucket()
+        self.logger.info(
+            f"Account ID: {self.account_id}, Results bucket: {self.results_bucket}"
+        )
+
+    def _default_results_bucket(self) -> str:
+        """Athena 쿼리 결과를 저장할 기본 버킷 이름"""
+        raise NotImplementedError
+
+    def set_results_bucket(self, bucket_name: str):
+        """Athena 결과 저장용 버킷 설정"""
+        self.results_bucket = bucket_name
+        self.logger.info(f"Results bucket set to: {self.results_bucket}")
+
+    def _report_error(self, message: str):
+        """쿼리 실패를 on_error 콜백으로 전달 (실패한 쿼리 결과는 빈 DataFrame)"""
+        if self.on_error is not None:
+            self.on_error(message)
+
+    def start_athena_query(self, query: str, database: str) -> AthenaQueryHandle:
+        """Athena 쿼리 제출 후 완료를 기다리지 않고 핸들 반환 (논블로킹)"""
+        handle = start_query(
+            self.athena,
+            query,
+            database,
+            f"s3://{self.results_bucket}/query-results/",
+        )
+        self.logger.info(f"Query execution started: {handle.query_id}")
+        return handle
+
+    def _cache_key(self, query: str, database: str) -> Optional[str]:
+        """쿼리 결과 캐시 키 (캐시 미사용 시 None)"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(query, database, self.region, self.account_id)
+
+    def _get_cached_result(self, cache_key: Optional[str]) -> Optional[pd.DataFrame]:
+        """캐시된 쿼리 결과 조회 (캐시 미사용, 새로고침, 미스/만료 시 None)"""
+        if cache_key is None or self.refresh_cache:
+            return None
+
+        df = self.cache.get(cache_key)
+        if df is not None:
+            self.logger.info(f"Query cache hit: {len(df)} rows (key: {cache_key[:12]})")
+        return df
+
+    def _run_query(self, query: str, database: str) -> str:
+        """Athena 쿼리 실행 후 완료까지 대기하고 QueryExecutionId 반환"""
+        handle = self.start_athena_query(query, database)
+
+        # 쿼리 완료 대기 (적응형 백오프, 마감 시간 초과 시 쿼리 취소)
+        result = handle.wait(timeout=self.query_timeout, cancel_on_timeout=True)
+        status = result["state"]
+
+        if status == "SUCCEEDED":
+            self.logger.info(
+                f"Query succeeded in {result['wait_seconds']:.2f} seconds "
+                f"(queue: {result['queue_time_ms']} ms, engine: {result['engine_time_ms']} ms, "
+                f"scanned: {result['data_scanned_bytes']} bytes, polls: {result['poll_count']})"
+            )
+            return handle.query_id
+        elif status in ["FAILED", "CANCELLED"]:
+            error = result["reason"] or "Unknown error"
+            self.logger.error(f"Query failed: {error}")
+            raise Exception(f"Query failed: {error}")
+
+        self.logger.error(f"Query timeout after {self.query_timeout} seconds")
+        raise Exception("Query timeout")
+
+    def execute_athena_query(
+        self,
+        query: str,
+        database: Optional[str] = None,
+        cache_ttl: float = OPEN_RANGE_TTL,
+    ) -> pd.DataFrame:
+        """Athena 쿼리 실행 및 결과 반환 (NextToken을 따라 전체 결과 조회)"""
+        database = database or self.DATABASE
+        self.logger.info(f"Executing Athena query on database: {database}")
+        self.logger.debug(f"Query: {query}")
+
+        cache_key = self._cache_key(query, database)
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            query_id = self._run_query(query, database)
+
+            # 결과 조회 (전체 페이지를 컬럼 버퍼에 누적 후 DataFrame 생성)
+            df = fetch_query_results(self.athena, query_id, s3_client=self.s3)
+            self.logger.info(f"Query returned {len(df)} rows")
+
+            if cache_key is not None:
+                self.cache.put(cache_key, df, cache_ttl)
+            return df
+
+        except Exception as e:
+            self.logger.error(f"Athena query execution failed: {str(e)}")
+            self._report_error(f"Athena 쿼리 실행 실패: {str(e)}")
+            return pd.DataFrame()
+
+    def iter_athena_query_chunks(
+        self,
+        query: str,
+        database: Optional[str] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """Athena 쿼리 결과를 행 청크 단위로 순회 (대용량 결과를 제한된 메모리로 처리)
+
+        Args:
+            query: 실행할 SQL
+            database: Athena 데이터베이스 (없으면 트래커 기본 데이터베이스)
+            chunk_rows: 청크당 최대 행 수
+
+        Yields:
+            pd.DataFrame: 결과 청크
+        """
+        database = database or self.DATABASE
+        self.logger.info(f"Executing chunked Athena query on database: {database}")
+        self.logger.debug(f"Query: {query}")
+
+        query_id = self._run_query(query, database)
+        yield from iter_query_result_chunks(
+            self.athena, query_id, chunk_rows, s3_client=self.s3
+        )
+
+    def execute_athena_queries_concurrently(
+        self,
+        queries: Dict[str, str],
+        database: Optional[str] = None,
+        cache_ttl: float = OPEN_RANGE_TTL,
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """여러 쿼리를 한 번에 제출하고 완료되는 순서대로 (이름, DataFrame) 반환
+
+        전체 대기 시간이 각 쿼리 지연의 합이 아니라 가장 느린 쿼리에 가까워집니다.
+        캐시에 있는 결과는 제출하지 않고 바로 반환하며,
+        실패한 쿼리는 execute_athena_query와 마찬가지로 빈 DataFrame을 반환합니다.
+        """
+        database = database or self.DATABASE
+        self.logger.info(f"Submitting {len(queries)} Athena queries concurrently on database: {database}")
+
+        handles = {}
+        cache_keys = {}
+        for name, query in queries.items():
+            self.logger.debug(f"Query [{name}]: {query}")
+
+            cache_keys[name] = self._cache_key(query, database)
+            cached = self._get_cached_result(cache_keys[name])
+            if cached is not None:
+                yield name, cached
+                continue
+
+            try:
+                handles[name] = self.start_athena_query(query, database)
+            except Exception as e:
+                self.logger.error(f"Athena query execution failed [{name}]: {str(e)}")
+                self._report_error(f"Athena 쿼리 실행 실패: {str(e)}")
+                yield name, pd.DataFrame()
+
+        for name, result in iter_completed_queries(
+            handles, timeout=self.query_timeout, cancel_on_timeout=True
+        ):
+            try:
+                if result["state"] == "TIMEOUT":
+                    raise Exception("Query timeout")
+                elif result["state"] != "SUCCEEDED":
+                    raise Exception(f"Query failed: {result['reason'] or 'Unknown error'}")
+
+                self.logger.info(
+                    f"Query [{name}] succeeded in {result['wait_seconds']:.2f} seconds "
+                    f"(queue: {result['queue_time_ms']} ms, engine: {result['engine_time_ms']} ms)"
+                )
+                df = fetch_query_results(
+                    self.athena,
+                    result["query_id"],
+                    s3_client=self.s3,
+                    output_location=result["output_location"],
+                )
+                self.logger.info(f"Query [{name}] returned {len(df)} rows")
+
+                if cache_keys[name] is not None:
+                    self.cache.put(cache_keys[name], df, cache_ttl)
+
+            except Exception as e:
+                self.logger.error(f"Athena query execution failed [{name}]: {str(e)}")
+                self._report_error(f"Athena 쿼리 실행 실패: {str(e)}")
+                df = pd.DataFrame()
+
+            yield name, df
+
+
+class BedrockAthenaTracker(AthenaTracker):
+    """Bedrock 모델 호출 로그 분석을 위한 Athena 쿼리 클래스"""
+
+    DATABASE = "bedrock_analytics"
+
+    # 대시보드 섹션 (표시 순서)
+    DASHBOARD_SECTIONS = ["summary", "user", "user_app", "model", "daily", "hourly"]
+
+    def _default_results_bucket(self) -> str:
+        """리전별 Athena 결과 저장용 버킷"""
+        return f"bedrock-analytics-{self.account_id}-{self.region}"
+
+    def get_current_logging_config(self) -> Dict:
+        """현재 설정된 Model Invocation Logging 정보 조회"""
+        self.logger.info("Getting current logging configuration")
+        try:
+            bedrock = boto3.client("bedrock", region_name=self.region)
+            response = bedrock.get_model_invocation_logging_configuration()
+
+            if "loggingConfig" in response:
+                config = response["loggingConfig"]
+
+                if "s3Config" in config:
+                    result = {
+                        "type": "s3",
+                        "bucket": config["s3Config"].get("bucketName", ""),
+                        "prefix": config["s3Config"].get("keyPrefix", ""),
+                        "status": "enabled",
+                    }
+                    self.logger.info(f"Logging config: {result}")
+                    return result
+
+            self.logger.warning("Logging is disabled")
+            return {"status": "disabled"}
+
+        except Exception as e:
+            self.logger.error(f"Error getting logging config: {str(e)}")
+            return {"status": "error", "error": str(e)}
+
+    def build_user_cost_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """사용자별 비용 분석 SQL 생성"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            CASE
+                WHEN identity.arn LIKE '%assumed-role%' THEN
+                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
+                WHEN identity.arn LIKE '%user%' THEN
+                    regexp_extract(identity.arn, 'user/([^/]+)')
+                ELSE 'Unknown'
+            END as user_or_app,
+            COUNT(*) as call_count,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY identity.arn
+        ORDER BY call_count DESC
+        """
+
+    def get_user_cost_analysis(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> pd.DataFrame:
+        """사용자별 비용 분석"""
+        self.logger.info(f"Getting user cost analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return self.execute_athena_query(
+            self.build_user_cost_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_user_app_detail_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """유저별 애플리케이션별 상세 분석 SQL 생성"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            CASE
+                WHEN identity.arn LIKE '%assumed-role%' THEN
+                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
+                WHEN identity.arn LIKE '%user%' THEN
+                    regexp_extract(identity.arn, 'user/([^/]+)')
+                ELSE 'Unknown'
+            END as user_or_app,
+            regexp_extract(modelId, '([^/]+)$') as model_name,
+            COUNT(*) as call_count,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY identity.arn, modelId
+        ORDER BY user_or_app, call_count DESC
+        """
+
+    def get_user_app_detail_analysis(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> pd.DataFrame:
+        """유저별 애플리케이션별 상세 분석"""
+        self.logger.info(f"Getting user-app detail analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return self.execute_athena_query(
+            self.build_user_app_detail_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_hourly_usage_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """시간별 사용 패턴 SQL 생성 (timestamp에서 hour 추출)"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            year,
+            month,
+            day,
+            date_format(from_iso8601_timestamp(timestamp), '%H') as hour,
+            COUNT(*) as call_count,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
+        ORDER BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
+        """
+
+    def get_hourly_usage_pattern(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> pd.DataFrame:
+        """시간별 사용 패턴 - timestamp에서 hour 추출"""
+        self.logger.info(f"Getting hourly usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return self.execute_athena_query(
+            self.build_hourly_usage_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_daily_usage_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """일별 사용 패턴 SQL 생성"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            year, month, day,
+            COUNT(*) as call_count,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY year, month, day
+        ORDER BY year, month, day
+        """
+
+    def get_daily_usage_pattern(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> pd.DataFrame:
+        """일별 사용 패턴"""
+        self.logger.info(f"Getting daily usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return self.execute_athena_query(
+            self.build_daily_usage_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_model_usage_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """모델별 사용 통계 SQL 생성"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            regexp_extract(modelId, '([^/]+)$') as model_name,
+            COUNT(*) as call_count,
+            AVG(CAST(input.inputTokenCount AS DOUBLE)) as avg_input_tokens,
+            AVG(CAST(output.outputTokenCount AS DOUBLE)) as avg_output_tokens,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY modelId
+        ORDER BY call_count DESC
+        """
+
+    def get_model_usage_stats(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> pd.DataFrame:
+        """모델별 사용 통계"""
+        self.logger.info(f"Getting model usage stats from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return self.execute_athena_query(
+            self.build_model_usage_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_total_summary_query(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> str:
+        """전체 요약 통계 SQL 생성"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            COUNT(*) as total_calls,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as total_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        """
+
+    def get_total_summary(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> Dict:
+        """전체 요약 통계"""
+        self.logger.info(f"Getting total summary from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        df = self.execute_athena_query(
+            self.build_total_summary_query(start_date, end_date, arn_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+        return self._summary_from_dataframe(df)
+
+    def _summary_from_dataframe(self, df: pd.DataFrame) -> Dict:
+        """전체 요약 쿼리 결과(1행)를 딕셔너리로 변환"""
+        if not df.empty:
+            # 빈 기간의 SUM은 NULL(<NA>)이므로 0으로 채워 합계로 사용
+            row = df.iloc[0].fillna(0)
+            result = {
+                "total_calls": int(row["total_calls"]),
+                "total_input_tokens": int(row["total_input_tokens"]),
+                "total_output_tokens": int(row["total_output_tokens"]),
+                # 비용은 가격 CTE 조인으로 쿼리에서 함께 계산
+                "total_cost_usd": float(row["total_cost_usd"]) if "total_cost_usd" in df.columns else 0.0,
+            }
+            self.logger.info(f"Total summary: {result}")
+            return result
+        else:
+            self.logger.warning("No data found for summary")
+            return {
+                "total_calls": 0,
+                "total_input_tokens": 0,
+                "total_output_tokens": 0,
+                "total_cost_usd": 0.0,
+            }
+
+    def build_usage_cube_query(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> str:
+        """사용량 큐브 SQL 생성 (일/시간/사용자/모델 단위 단일 스캔 집계)"""
+        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
+        date_filter = bedrock_partition_predicate(start_date, end_date)
+        price_cte = bedrock_price_cte(self.region)
+        cost_expression = bedrock_cost_expression(self.region)
+        price_join = bedrock_price_join(self.region)
+
+        return f"""
+        {price_cte}
+        SELECT
+            year,
+            month,
+            day,
+            date_format(from_iso8601_timestamp(timestamp), '%H') as hour,
+            CASE
+                WHEN identity.arn LIKE '%assumed-role%' THEN
+                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
+                WHEN identity.arn LIKE '%user%' THEN
+                    regexp_extract(identity.arn, 'user/([^/]+)')
+                ELSE 'Unknown'
+            END as user_or_app,
+            regexp_extract(modelId, '([^/]+)$') as model_name,
+            COUNT(*) as call_count,
+            COALESCE(SUM(CAST(input.inputTokenCount AS BIGINT)), 0) as total_input_tokens,
+            COALESCE(SUM(CAST(output.outputTokenCount AS BIGINT)), 0) as total_output_tokens,
+            COALESCE(SUM({cost_expression}), 0) as estimated_cost_usd
+        FROM bedrock_invocation_logs
+        {price_join}
+        WHERE {date_filter}
+            {arn_filter}
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """
+
+    def get_usage_cube(
+        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
+    ) -> UsageCube:
+        """사용량 큐브 조회 - 대시보드의 모든 뷰를 한 번의 스캔으로 파생"""
+        self.logger.info(f"Getting usage cube from {start_date} to {end_date}, arn_pattern={arn_pattern}")
+
+        return UsageCube(
+            self.execute_athena_query(
+                self.build_usage_cube_query(start_date, end_date, arn_pattern),
+                cache_ttl=cache_ttl_for_range(end_date),
+            )
+        )
+
+    def iter_dashboard_results(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        arn_pattern: str = None,
+        sections: List[str] = None,
+        concurrent: bool = True,
+        use_cube: bool = True,
+    ) -> Iterator[Tuple[str, object]]:
+        """대시보드 섹션별 분석 결과 순회
+
+        Args:
+            start_date: 시작 날짜
+            end_date: 종료 날짜
+            arn_pattern: ARN 패턴 필터
+            sections: 조회할 섹션 목록 (None이면 DASHBOARD_SECTIONS 전체, 빈 목록이면 조회 없음)
+            concurrent: True면 모든 쿼리를 동시에 제출해 완료 순서대로,
+                False면 섹션 순서대로 하나씩 실행 (큐브 사용 시에는 쿼리가 하나뿐이라 무시)
+            use_cube: True면 두 개 이상의 섹션을 사용량 큐브 한 번의 스캔에서 파생
+
+        Yields:
+            (섹션명, 결과) - summary는 Dict, 나머지는 DataFrame
+        """
+        if sections is None:
+            sections = self.DASHBOARD_SECTIONS
+        if not sections:
+            return
+
+        if use_cube and len(sections) > 1:
+            if concurrent:
+                self.logger.info("Usage cube runs a single query; concurrent option has no effect")
+            cube = self.get_usage_cube(start_date, end_date, arn_pattern)
+            for section in sections:
+                data = cube.view(section)
+                if section == "summary":
+                    yield section, self._summary_from_dataframe(data)
+                else:
+                    yield section, data
+            return
+
+        builders = {
+            "summary": self.build_total_summary_query,
+            "user": self.build_user_cost_query,
+            "user_app": self.build_user_app_detail_query,
+            "model": self.build_model_usage_query,
+            "daily": self.build_daily_usage_query,
+            "hourly": self.build_hourly_usage_query,
+        }
+        queries = {
+            section: builders[section](start_date, end_date, arn_pattern)
+            for section in sections
+        }
+        cache_ttl = cache_ttl_for_range(end_date)
+
+        if concurrent:
+            results = self.execute_athena_queries_concurrently(queries, cache_ttl=cache_ttl)
+        else:
+            results = (
+                (section, self.execute_athena_query(query, cache_ttl=cache_ttl))
+                for section, query in queries.items()
+            )
+
+        for section, df in results:
+            if section == "summary":
+                yield section, self._summary_from_dataframe(df)
+            else:
+                yield section, df
+
+
+# QCli 토큰 사용량 추정 상수
+# 기준: 영어 단어 1.4토큰, 4글자당 5토큰
+# 코드 1줄 평균 60-80문자 = 약 75-100토큰
+QCLI_TOKEN_ESTIMATION = {
+    "conservative": {  # 보수적 추정 (짧은 코드/간단한 질문)
+        "chat_message_input": 100,
+        "chat_message_output": 300,
+        "chat_code_line": 50,
+        "inline_suggestion": 40,
+        "inline_code_line": 50,
+        "dev_event_input": 400,
+        "dev_event_output": 600,
+        "test_event_input": 300,
+        "test_event_output": 500,
+        "doc_event_input": 200,
+        "doc_event_output": 400,
+    },
+    "average": {  # 평균 추정 (일반적인 사용) - 권장
+        "chat_message_input": 150,
+        "chat_message_output": 500,
+        "chat_code_line": 75,
+        "inline_suggestion": 60,
+        "inline_code_line": 75,
+        "dev_event_input": 600,
+        "dev_event_output": 1000,
+        "test_event_input": 450,
+        "test_event_output": 750,
+        "doc_event_input": 350,
+        "doc_event_output": 600,
+    },
+    "optimistic": {  # 낙관적 추정 (복잡한 코드/긴 대화)
+        "chat_message_input": 200,
+        "chat_message_output": 800,
+        "chat_code_line": 100,
+        "inline_suggestion": 80,
+        "inline_code_line": 100,
+        "dev_event_input": 1000,
+        "dev_event_output": 1500,
+        "test_event_input": 600,
+        "test_event_output": 1000,
+        "doc_event_input": 500,
+        "doc_event_output": 800,
+    }
+}
+
+
+class QCliAthenaTracker(AthenaTracker):
+    """Amazon Q CLI 사용량 추적을 위한 Athena 쿼리 클래스"""
+
+    DATABASE = "qcli_analytics"
+
+    # 리포트 섹션 (표시 순서)
+    REPORT_SECTIONS = ["summary", "user", "feature", "daily"]
+
+    def _default_results_bucket(self) -> str:
+        """Amazon Q Developer 리포트 버킷 (쿼리 결과도 같은 버킷에 저장)"""
+        return f"amazonq-developer-reports-{self.account_id}"
+
+    def build_total_summary_query(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> str:
+        """전체 요약 통계 SQL 생성 (Amazon Q Developer CSV 리포트 기반)"""
+        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
+        date_filter = qcli_date_predicate(start_date, end_date)
+
+        # 실제 AWS CSV 메트릭 사용:
+        # - Chat_MessagesSent: 채팅 메시지 수
+        # - Inline_SuggestionsCount: 인라인 코드 제안 수
+        # - Chat_MessagesInteracted: 사용자 상호작용 메트릭
+
+        return f"""
+        SELECT
+            COUNT(DISTINCT UserId) as unique_users,
+            COUNT(DISTINCT Date) as active_days,
+            COALESCE(SUM(CAST(Chat_MessagesSent AS BIGINT)), 0) as total_chat_messages,
+            COALESCE(SUM(CAST(Inline_SuggestionsCount AS BIGINT)), 0) as total_inline_suggestions,
+            COALESCE(SUM(CAST(Inline_AcceptanceCount AS BIGINT)), 0) as total_inline_acceptances,
+            COALESCE(SUM(CAST(Chat_AICodeLines AS BIGINT)), 0) as total_chat_code_lines,
+            COALESCE(SUM(CAST(Inline_AICodeLines AS BIGINT)), 0) as total_inline_code_lines,
+            COALESCE(SUM(CAST(Dev_GenerationEventCount AS BIGINT)), 0) as total_dev_events,
+            COALESCE(SUM(CAST(TestGeneration_EventCount AS BIGINT)), 0) as total_test_events
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        """
+
+    def get_total_summary(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> Dict:
+        """전체 요약 통계 - Amazon Q Developer CSV 리포트 기반"""
+        self.logger.info(
+            f"Getting QCli total summary from {start_date} to {end_date}, user_pattern={user_pattern}"
+        )
+
+        df = self.execute_athena_query(
+            self.build_total_summary_query(start_date, end_date, user_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+        return self._summary_from_dataframe(df)
+
+    def _summary_from_dataframe(self, df: pd.DataFrame) -> Dict:
+        """전체 요약 쿼리 결과(1행)를 딕셔너리로 변환"""
+        if not df.empty and df.iloc[0]["unique_users"]:
+            # 빈 기간의 SUM은 NULL(<NA>)이므로 0으로 채워 합계로 사용
+            row = df.iloc[0].fillna(0)
+            result = {
+                "unique_users": int(row["unique_users"]),
+                "active_days": int(row["active_days"]),
+                "total_chat_messages": int(row["total_chat_messages"]),
+                "total_inline_suggestions": int(row["total_inline_suggestions"]),
+                "total_inline_acceptances": int(row["total_inline_acceptances"]),
+                "total_chat_code_lines": int(row["total_chat_code_lines"]),
+                "total_inline_code_lines": int(row["total_inline_code_lines"]),
+                "total_dev_events": int(row["total_dev_events"]),
+                "total_test_events": int(row["total_test_events"]),
+            }
+            self.logger.info(f"QCli total summary: {result}")
+            return result
+        else:
+            self.logger.warning("No data found for summary")
+            return {
+                "unique_users": 0,
+                "active_days": 0,
+                "total_chat_messages": 0,
+                "total_inline_suggestions": 0,
+                "total_inline_acceptances": 0,
+                "total_chat_code_lines": 0,
+                "total_inline_code_lines": 0,
+                "total_dev_events": 0,
+                "total_test_events": 0,
+            }
+
+    def build_user_usage_query(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> str:
+        """사용자별 사용량 분석 SQL 생성"""
+        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
+        date_filter = qcli_date_predicate(start_date, end_date)
+
+        return f"""
+        SELECT
+            UserId as user_id,
+            COALESCE(SUM(CAST(Chat_MessagesSent AS BIGINT)), 0) as total_chat_messages,
+            COALESCE(SUM(CAST(Inline_SuggestionsCount AS BIGINT)), 0) as total_inline_suggestions,
+            COALESCE(SUM(CAST(Inline_AcceptanceCount AS BIGINT)), 0) as total_inline_acceptances,
+            COALESCE(SUM(CAST(Chat_AICodeLines AS BIGINT)), 0) as total_chat_code_lines,
+            COALESCE(SUM(CAST(Inline_AICodeLines AS BIGINT)), 0) as total_inline_code_lines,
+            COALESCE(SUM(CAST(Dev_GenerationEventCount AS BIGINT)), 0) as total_dev_events,
+            COALESCE(SUM(CAST(TestGeneration_EventCount AS BIGINT)), 0) as total_test_events,
+            COALESCE(SUM(CAST(DocGeneration_EventCount AS BIGINT)), 0) as total_doc_events,
+            COUNT(DISTINCT Date) as active_days,
+            MIN(Date) as first_activity,
+            MAX(Date) as last_activity
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        GROUP BY UserId
+        ORDER BY total_chat_messages DESC
+        """
+
+    def get_user_usage_analysis(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> pd.DataFrame:
+        """사용자별 사용량 분석"""
+        self.logger.info(
+            f"Getting QCli user usage analysis from {start_date} to {end_date}, user_pattern={user_pattern}"
+        )
+
+        return self.execute_athena_query(
+            self.build_user_usage_query(start_date, end_date, user_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def build_daily_usage_query(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> str:
+        """일별 사용 패턴 SQL 생성"""
+        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
+        date_filter = qcli_date_predicate(start_date, end_date)
+
+        return f"""
+        SELECT
+            Date as date_str,
+            COALESCE(SUM(CAST(Chat_MessagesSent AS BIGINT)), 0) as total_chat_messages,
+            COALESCE(SUM(CAST(Inline_SuggestionsCount AS BIGINT)), 0) as total_inline_suggestions,
+            COALESCE(SUM(CAST(Inline_AcceptanceCount AS BIGINT)), 0) as total_inline_acceptances,
+            COALESCE(SUM(CAST(Chat_AICodeLines AS BIGINT)), 0) as total_chat_code_lines,
+            COALESCE(SUM(CAST(Inline_AICodeLines AS BIGINT)), 0) as total_inline_code_lines,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        GROUP BY Date
+        ORDER BY Date
+        """
+
+    def get_daily_usage_pattern(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> pd.DataFrame:
+        """일별 사용 패턴"""
+        self.logger.info(
+            f"Getting QCli daily usage pattern from {start_date} to {end_date}, user_pattern={user_pattern}"
+        )
+
+        return self.execute_athena_query(
+            self.build_daily_usage_query(start_date, end_date, user_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+
+    def build_feature_usage_query(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> str:
+        """기능별 사용 통계 SQL 생성 (Chat, Inline, Dev, Test, Doc 등)"""
+        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
+        date_filter = qcli_date_predicate(start_date, end_date)
+
+        return f"""
+        SELECT
+            'Chat Messages' as feature_type,
+            COALESCE(SUM(CAST(Chat_MessagesSent AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        UNION ALL
+        SELECT
+            'Inline Suggestions' as feature_type,
+            COALESCE(SUM(CAST(Inline_SuggestionsCount AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        UNION ALL
+        SELECT
+            'Inline Acceptances' as feature_type,
+            COALESCE(SUM(CAST(Inline_AcceptanceCount AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        UNION ALL
+        SELECT
+            '/dev Events' as feature_type,
+            COALESCE(SUM(CAST(Dev_GenerationEventCount AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        UNION ALL
+        SELECT
+            '/test Events' as feature_type,
+            COALESCE(SUM(CAST(TestGeneration_EventCount AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        UNION ALL
+        SELECT
+            '/doc Events' as feature_type,
+            COALESCE(SUM(CAST(DocGeneration_EventCount AS BIGINT)), 0) as total_count,
+            COUNT(DISTINCT UserId) as unique_users
+        FROM qcli_user_activity_reports
+        WHERE {date_filter}
+            {user_filter}
+        ORDER BY total_count DESC
+        """
+
+    def get_feature_usage_stats(
+        self, start_date: datetime, end_date: datetime, user_pattern: str = None
+    ) -> pd.DataFrame:
+        """기능별 사용 통계 (Chat, Inline, Dev, Test, Doc 등)"""
+        self.logger.info(
+            f"Getting QCli feature usage stats from {start_date} to {end_date}, user_pattern={user_pattern}"
+        )
+
+        return self.execute_athena_query(
+            self.build_feature_usage_query(start_date, end_date, user_pattern),
+            cache_ttl=cache_ttl_for_range(end_date),
+        )
+
+    def iter_report_results(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_pattern: str = None,
+        sections: List[str] = None,
+        concurrent: bool = True,
+    ) -> Iterator[Tuple[str, object]]:
+        """리포트 섹션별 분석 결과 순회
+
+        Args:
+            start_date: 시작 날짜
+            end_date: 종료 날짜
+            user_pattern: 사용자 ID 필터 패턴
+            sections: 조회할 섹션 목록 (None이면 REPORT_SECTIONS 전체)
+            concurrent: True면 모든 쿼리를 동시에 제출해 완료 순서대로,
+                False면 섹션 순서대로 하나씩 실행
+
+        Yields:
+            (섹션명, 결과) - summary는 Dict, 나머지는 DataFrame
+        """
+        builders = {
+            "summary": self.build_total_summary_query,
+            "user": self.build_user_usage_query,
+            "feature": self.build_feature_usage_query,
+            "daily": self.build_daily_usage_query,
+        }
+        queries = {
+            section: builders[section](start_date, end_date, user_pattern)
+            for section in (self.REPORT_SECTIONS if sections is None else sections)
+        }
+        cache_ttl = cache_ttl_for_range(end_date)
+
+        if concurrent:
+            results = self.execute_athena_queries_concurrently(queries, cache_ttl=cache_ttl)
+        else:
+            results = (
+                (section, self.execute_athena_query(query, cache_ttl=cache_ttl))
+                for section, query in queries.items()
+            )
+
+        for section, df in results:
+            if section == "summary":
+                yield section, self._summary_from_dataframe(df)
+            else:
+                yield section, df
+
+    def estimate_tokens(self, summary: Dict, estimation_type: str = "average") -> Dict:
+        """사용량 데이터로부터 토큰 사용량 추정
+
+        Args:
+            summary: get_total_summary()에서 반환된 요약 데이터
+            estimation_type: "conservative", "average", "optimistic" 중 선택
+
+        Returns:
+            Dict: 추정된 토큰 사용량 정보
+        """
+        self.logger.info(f"Estimating tokens with {estimation_type} model")
+
+        if estimation_type not in QCLI_TOKEN_ESTIMATION:
+            self.logger.warning(f"Unknown estimation type: {estimation_type}, using 'average'")
+            estimation_type = "average"
+
+        constants = QCLI_TOKEN_ESTIMATION[estimation_type]
+
+        # Input 토큰 추정
+        estimated_input_tokens = (
+            summary.get("total_chat_messages", 0) * constants["chat_message_input"] +
+            summary.get("total_inline_suggestions", 0) * constants["inline_suggestion"] +
+            summary.get("total_dev_events", 0) * constants["dev_event_input"] +
+            summary.get("total_test_events", 0) * constants["test_event_input"] +
+            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_input"]
+        )
+
+        # Output 토큰 추정
+        estimated_output_tokens = (
+            summary.get("total_chat_messages", 0) * constants["chat_message_output"] +
+            summary.get("total_chat_code_lines", 0) * constants["chat_code_line"] +
+            summary.get("total_inline_code_lines", 0) * constants["inline_code_line"] +
+            summary.get("total_inline_acceptances", 0) * constants["inline_suggestion"] +
+            summary.get("total_dev_events", 0) * constants["dev_event_output"] +
+            summary.get("total_test_events", 0) * constants["test_event_output"] +
+            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_output"]
+        )
+
+        total_tokens = estimated_input_tokens + estimated_output_tokens
+
+        result = {
+            "estimation_type": estimation_type,
+            "estimated_input_tokens": int(estimated_input_tokens),
+            "estimated_output_tokens": int(estimated_output_tokens),
+            "estimated_total_tokens": int(total_tokens),
+        }
+
+        self.logger.info(f"Token estimation result: {result}")
+        return result
+
+    def check_official_limits(self, summary: Dict, days_in_period: int) -> Dict:
+        """공식 리밋 체크 및 경고 생성
+
+        Args:
+            summary: get_total_summary()에서 반환된 요약 데이터
+            days_in_period: 조회 기간의 일수
+
+        Returns:
+            Dict: 리밋 체크 결과 및 경고
+        """
+        self.logger.info("Checking official limits")
+
+        # 공식 문서화된 리밋
+        OFFICIAL_LIMITS = {
+            "dev_events": 30,  # /dev 명령어: 30회/월
+            "transformation_lines": 4000,  # Code Transformation: 4,000줄/월
+            # 채팅/인라인: AWS가 공개하지 않음
+        }
+
+        # 월간 사용량 추정 (현재 기간을 30일로 환산)
+        monthly_factor = 30 / days_in_period if days_in_period > 0 else 1
+
+        dev_events_used = summary.get("total_dev_events", 0)
+        dev_events_projected = int(dev_events_used * monthly_factor)
+
+        # Transformation 데이터는 summary에 없을 수 있음 (추후 추가 가능)
+        transformation_lines_used = summary.get("total_transformation_lines", 0)
+        transformation_lines_projected = int(transformation_lines_used * monthly_factor)
+
+        result = {
+            "dev_events": {
+                "used": dev_events_used,
+                "limit": OFFICIAL_LIMITS["dev_events"],
+                "projected_monthly": dev_events_projected,
+                "percentage": (dev_events_projected / OFFICIAL_LIMITS["dev_events"] * 100) if OFFICIAL_LIMITS["dev_events"] > 0 else 0,
+                "warning": dev_events_projected >= OFFICIAL_LIMITS["dev_events"] * 0.8
+            },
+            "transformation_lines": {
+                "used": transformation_lines_used,
+                "limit": OFFICIAL_LIMITS["transformation_lines"],
+                "projected_monthly": transformation_lines_projected,
+                "percentage": (transformation_lines_projected / OFFICIAL_LIMITS["transformation_lines"] * 100) if OFFICIAL_LIMITS["transformation_lines"] > 0 else 0,
+                "warning": transformation_lines_projected >= OFFICIAL_LIMITS["transformation_lines"] * 0.8
+            }
+        }
+
+        self.logger.info(f"Limit check result: {result}")
+        return result
+
+    def analyze_usage_trends(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        user_pattern: str = None,
+        daily_df: pd.DataFrame = None,
+    ) -> Dict:
+        """사용량 추세 분석 및 이상 감지
+
+        Args:
+            start_date: 시작 날짜
+            end_date: 종료 날짜
+            user_pattern: 사용자 필터 패턴
+            daily_df: 이미 조회한 일별 사용 패턴 (None이면 새로 조회)
+
+        Returns:
+            Dict: 추세 분석 결과
+        """
+        self.logger.info(f"Analyzing usage trends from {start_date} to {end_date}")
+
+        # 일별 사용 패턴 조회 (이미 조회한 결과가 있으면 재사용)
+        if daily_df is None:
+            daily_df = self.get_daily_usage_pattern(start_date, end_date, user_pattern)
+        else:
+            daily_df = daily_df.copy()
+
+        if daily_df.empty:
+            return {
+                "daily_avg": 0,
+                "daily_max": 0,
+                "daily_min": 0,
+                "anomaly_detected": False
+            }
+
+        # 일일 총 활동 계산 (NULL 합계는 컬럼별로 0으로 채운 뒤 더함)
+        daily_df["total_activity"] = sum(
+            daily_df[col].fillna(0) if col in daily_df.columns else 0
+            for col in ["total_chat_messages", "total_inline_suggestions"]
+        )
+
+        daily_avg = daily_df["total_activity"].mean()
+        daily_max = daily_df["total_activity"].max()
+        daily_min = daily_df["total_activity"].min()
+
+        # 이상 감지: 일평균의 3배 초과하는 날이 있는지
+        anomaly_threshold = daily_avg * 3
+        anomaly_days = daily_df[daily_df["total_activity"] > anomaly_threshold]
+
+        result = {
+            "daily_avg": float(daily_avg),
+            "daily_max": float(daily_max),
+            "daily_min": float(daily_min),
+            "anomaly_detected": len(anomaly_days) > 0,
+            "anomaly_count": len(anomaly_days),
+            "anomaly_threshold": float(anomaly_threshold)
+        }
+
+        self.logger.info(f"Trend analysis result: {result}")
+        return result
@@ -0,0 +1,607 @@
+"""
+Athena 쿼리 실행/결과 조회 유틸리티 (bedrock_tracker / bedrock_tracker_cli / setup 스크립트 공용)
+
+- 쿼리 완료 대기: 첫 폴링은 1초 미만으로 시작하고 지수 백오프(+지터)로 간격을 늘립니다.
+  마감 시간을 지정할 수 있으며, 블로킹 없이 핸들만 받아 상태를 조회할 수도 있습니다.
+- 결과 조회: get_query_results는 한 번에 최대 1000행만 반환하므로 NextToken을 끝까지
+  따라가며 결과를 읽습니다. 페이지는 컬럼 버퍼에 누적한 뒤 마지막에 한 번만
+  DataFrame으로 변환하며, 대용량 결과는 행 청크 단위로 순회할 수 있습니다.
+- 대용량 결과: 첫 페이지로 결과가 1000행을 넘는지 확인한 뒤, 넘으면 Athena가 S3에
+  저장한 결과 CSV를 한 번의 스트리밍 GET으로 내려받아 C 파서로 읽습니다.
+- 타입 변환: ColumnInfo.Type에 따라 정수/실수/날짜 컬럼은 Int64/Float64/datetime64로,
+  반복 값이 많은 문자열 컬럼은 category로 디코딩합니다 (청크 단위 조회는 청크 간 타입이
+  같도록 문자열 그대로). 숫자 NULL은 0이 아니라 <NA>로 남기므로, 합계가 필요한
+  호출자가 직접 채웁니다.
+"""
+
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# get_query_results 한 페이지 최대 행 수 (API 상한)
+ATHENA_MAX_PAGE_ROWS = 1000
+
+# iter_query_result_chunks 기본 청크 크기 (행)
+DEFAULT_CHUNK_ROWS = 50000
+
+# 쿼리 완료 대기 설정 (초)
+DEFAULT_QUERY_TIMEOUT = 300
+INITIAL_POLL_INTERVAL = 0.25
+MAX_POLL_INTERVAL = 5.0
+POLL_BACKOFF_FACTOR = 1.5
+POLL_JITTER = 0.25  # 폴링 간격의 ±25%
+
+TERMINAL_STATES = ("SUCCEEDED", "FAILED", "CANCELLED")
+
+# 결과 조회 방식
+# - api: get_query_results 페이지 조회
+# - s3: S3 결과 CSV 직접 다운로드
+# - auto: 첫 페이지로 결과가 끝나면 api, 다음 페이지가 있으면 s3
+RESULT_READER_API = "api"
+RESULT_READER_S3 = "s3"
+RESULT_READER_AUTO = "auto"
+
+# ColumnInfo.Type별 pandas 타입 매핑
+INTEGER_TYPES = ("tinyint", "smallint", "integer", "int", "bigint")
+FLOAT_TYPES = ("float", "real", "double", "decimal")
+DATETIME_TYPES = ("date", "timestamp")
+BOOLEAN_TYPES = ("boolean",)
+
+# 고유 값 비율이 이 값 이하인 문자열 컬럼은 category로 변환
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+class AthenaQueryHandle:
+    """실행 중인 Athena 쿼리 핸들
+
+    poll()은 get_query_execution을 한 번만 호출하는 논블로킹 상태 조회이고,
+    wait()은 적응형 백오프로 완료(또는 마감 시간)까지 대기합니다.
+    """
+
+    def __init__(
+        self,
+        athena_client,
+        query_id: str,
+        initial_interval: float = INITIAL_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+        backoff_factor: float = POLL_BACKOFF_FACTOR,
+        jitter: float = POLL_JITTER,
+    ):
+        """
+        Args:
+            athena_client: boto3 Athena 클라이언트
+            query_id: QueryExecutionId
+            initial_interval: 첫 폴링 간격 (초)
+            max_interval: 최대 폴링 간격 (초)
+            backoff_factor: 폴링마다 간격에 곱하는 배수
+            jitter: 간격에 적용할 무작위 편차 비율
+        """
+        self.athena = athena_client
+        self.query_id = query_id
+        self.state = "QUEUED"
+        self.reason = None
+        self.statistics = {}
+        self.output_location = None
+        self.submitted_at = time.monotonic()
+        self.poll_count = 0
+
+        self._interval = initial_interval
+        self._max_interval = max_interval
+        self._backoff_factor = backoff_factor
+        self._jitter = jitter
+
+    @property
+    def done(self) -> bool:
+        """종료 상태(SUCCEEDED/FAILED/CANCELLED/TIMEOUT) 여부"""
+        return self.state in TERMINAL_STATES or self.state == "TIMEOUT"
+
+    def poll(self) -> str:
+        """쿼리 상태를 한 번 조회하여 갱신 (블로킹 없음)
+
+        Returns:
+            str: 현재 상태 (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)
+        """
+        if self.done:
+            return self.state
+
+        execution = self.athena.get_query_execution(QueryExecutionId=self.query_id)[
+            "QueryExecution"
+        ]
+        self.poll_count += 1
+        self.state = execution["Status"]["State"]
+        self.reason = execution["Status"].get("StateChangeReason")
+        self.statistics = execution.get("Statistics", {})
+        self.output_location = execution.get("ResultConfiguration", {}).get(
+            "OutputLocation"
+        )
+        return self.state
+
+    def next_delay(self) -> float:
+        """다음 폴링까지의 대기 시간 (지터 적용 후 간격을 지수적으로 증가)"""
+        delay = self._interval * random.uniform(1 - self._jitter, 1 + self._jitter)
+        self._interval = min(self._interval * self._backoff_factor, self._max_interval)
+        return delay
+
+    def wait(
+        self, timeout: float = DEFAULT_QUERY_TIMEOUT, cancel_on_timeout: bool = False
+    ) -> Dict:
+        """쿼리가 종료될 때까지 적응형 백오프로 대기
+
+        Args:
+            timeout: 제출 시점부터의 마감 시간 (초)
+            cancel_on_timeout: 마감 시간 초과 시 쿼리 취소 여부
+
+        Returns:
+            Dict: result()와 동일한 실행 결과 (마감 초과 시 state="TIMEOUT")
+        """
+        deadline = self.submitted_at + timeout
+
+        while True:
+            if self.poll() in TERMINAL_STATES:
+                return self.result()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.expire(cancel_on_timeout)
+                return self.result()
+
+            time.sleep(min(self.next_delay(), remaining))
+
+    def expire(self, cancel: bool = False):
+        """마감 시간 초과 처리 (state="TIMEOUT", 필요 시 쿼리 취소)"""
+        self.state = "TIMEOUT"
+        if cancel:
+            try:
+                self.athena.stop_query_execution(QueryExecutionId=self.query_id)
+            except Exception:
+                pass
+
+    def result(self) -> Dict:
+        """실행 결과 요약 (Statistics 블록의 대기열/엔진 시간 포함)"""
+        return {
+            "query_id": self.query_id,
+            "state": self.state,
+            "reason": self.reason,
+            "queue_time_ms": self.statistics.get("QueryQueueTimeInMillis"),
+            "engine_time_ms": self.statistics.get("EngineExecutionTimeInMillis"),
+            "total_time_ms": self.statistics.get("TotalExecutionTimeInMillis"),
+            "data_scanned_bytes": self.statistics.get("DataScannedInBytes"),
+            "wait_seconds": round(time.monotonic() - self.submitted_at, 3),
+            "poll_count": self.poll_count,
+            "output_location": self.output_location,
+        }
+
+
+def start_query(
+    athena_client, query: str, database: str, output_location: str
+) -> AthenaQueryHandle:
+    """Athena 쿼리를 제출하고 완료를 기다리지 않고 핸들 반환
+
+    Args:
+        athena_client: boto3 Athena 클라이언트
+        query: 실행할 SQL
+        database: Athena 데이터베이스
+        output_location: 결과 저장 S3 경로
+
+    Returns:
+        AthenaQueryHandle: 실행 중인 쿼리 핸들
+    """
+    response = athena_client.start_query_execution(
+        QueryString=query,
+        QueryExecutionContext={"Database": database},
+        ResultConfiguration={"OutputLocation": output_location},
+    )
+    return AthenaQueryHandle(athena_client, response["QueryExecutionId"])
+
+
+def wait_for_query_completion(
+    athena_client,
+    query_id: str,
+    timeout: float = DEFAULT_QUERY_TIMEOUT,
+    cancel_on_timeout: bool = False,
+) -> Dict:
+    """이미 제출된 쿼리의 완료 대기 (적응형 백오프)
+
+    Args:
+        athena_client: boto3 Athena 클라이언트
+        query_id: QueryExecutionId
+        timeout: 마감 시간 (초)
+        cancel_on_timeout: 마감 시간 초과 시 쿼리 취소 여부
+
+    Returns:
+        Dict: AthenaQueryHandle.result() 참고 (state는 SUCCEEDED/FAILED/CANCELLED/TIMEOUT)
+    """
+    handle = AthenaQueryHandle(athena_client, query_id)
+    return handle.wait(timeout=timeout, cancel_on_timeout=cancel_on_timeout)
+
+
+def iter_completed_queries(
+    handles: Dict[str, AthenaQueryHandle],
+    timeout: float = DEFAULT_QUERY_TIMEOUT,
+    cancel_on_timeout: bool = False,
+) -> Iterator[Tuple[str, Dict]]:
+    """여러 쿼리를 함께 대기하며 완료되는 순서대로 결과 반환
+
+    각 핸들은 자신의 백오프 간격에 따라 폴링되므로, 동시에 제출한 쿼리들의
+    전체 대기 시간은 가장 느린 쿼리 하나의 시간에 가깝습니다.
+
+    Args:
+        handles: {이름: AthenaQueryHandle}
+        timeout: 각 쿼리의 제출 시점부터의 마감 시간 (초)
+        cancel_on_timeout: 마감 시간 초과 시 쿼리 취소 여부
+
+    Yields:
+        (이름, AthenaQueryHandle.result()) - 종료된 순서대로
+    """
+    pending = dict(handles)
+    next_poll = {name: time.monotonic() for name in pending}
+
+    while pending:
+        for name in list(pending):
+            handle = pending[name]
+            if time.monotonic() < next_poll[name]:
+                continue
+
+            if handle.poll() in TERMINAL_STATES:
+                del pending[name]
+                yield name, handle.result()
+            elif time.monotonic() - handle.submitted_at >= timeout:
+                handle.expire(cancel_on_timeout)
+                del pending[name]
+                yield name, handle.result()
+            else:
+                next_poll[name] = time.monotonic() + handle.next_delay()
+
+        if pending:
+            wake_at = min(next_poll[name] for name in pending)
+            time.sleep(max(0.0, wake_at - time.monotonic()))
+
+
+def _decode_rows(rows: List[Dict]) -> List[List[str]]:
+    """get_query_results의 Rows를 행 값 리스트로 변환 (NULL은 빈 문자열)"""
+    return [[field.get("VarCharValue", "") for field in row["Data"]] for row in rows]
+
+
+def iter_query_result_pages(
+    athena_client,
+    query_id: str,
+    page_size: int = ATHENA_MAX_PAGE_ROWS,
+    starting_token: str = None,
+) -> Iterator[Tuple[List[Dict], List[List[str]]]]:
+    """get_query_results를 NextToken 끝까지 페이지 단위로 조회
+
+    Args:
+        athena_client: boto3 Athena 클라이언트
+        query_id: 완료된 쿼리의 QueryExecutionId
+        page_size: 페이지당 행 수 (최대 1000)
+        starting_token: 이어서 조회할 NextToken (None이면 처음부터)
+
+    Yields:
+        (ColumnInfo 리스트, 행 값 리스트) - 첫 페이지의 헤더 행은 제외
+    """
+    paginator = athena_client.get_paginator("get_query_results")
+    pagination_config = {"PageSize": min(page_size, ATHENA_MAX_PAGE_ROWS)}
+    if starting_token:
+        pagination_config["StartingToken"] = starting_token
+    pages = paginator.paginate(
+        QueryExecutionId=query_id, PaginationConfig=pagination_config
+    )
+
+    # 헤더 행은 결과의 맨 첫 페이지에만 존재
+    first_page = starting_token is None
+    for page in pages:
+        result_set = page["ResultSet"]
+        column_info = result_set["ResultSetMetadata"]["ColumnInfo"]
+        rows = result_set.get("Rows", [])
+
+        if first_page:
+            rows = rows[1:]
+            first_page = False
+
+        yield column_info, _decode_rows(rows)
+
+
+def parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """s3://bucket/key 형식의 URI를 (bucket, key)로 분리"""
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Not an S3 URI: {uri}")
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def get_query_output_location(athena_client, query_id: str) -> str:
+    """쿼리 결과 CSV의 S3 위치 조회 (s3://.../<QueryExecutionId>.csv)"""
+    execution = athena_client.get_query_execution(QueryExecutionId=query_id)
+    return execution["QueryExecution"]["ResultConfiguration"]["OutputLocation"]
+
+
+def read_query_results_csv(
+    s3_client,
+    output_location: str,
+    columns: List[str] = None,
+    chunk_rows: int = None,
+    types: List[str] = None,
+):
+    """Athena가 S3에 저장한 결과 CSV를 스트리밍 GET 한 번으로 읽기
+
+    Athena 결과 CSV는 모든 값을 따옴표로 감싸고 NULL은 빈 값으로 기록하므로,
+    get_query_results 경로와 같게 모든 값을 문자열로 읽고 NULL은 빈 문자열로 둔 뒤
+    types가 있으면 같은 규칙으로 타입을 변환합니다.
+
+    Args:
+        s3_client: boto3 S3 클라이언트
+        output_location: 결과 CSV의 S3 URI
+        columns: 컬럼 라벨 (지정 시 CSV 헤더 대신 사용 - 중복 라벨 유지용)
+        chunk_rows: 지정 시 행 청크 단위 DataFrame 이터레이터 반환
+        types: 컬럼별 ColumnInfo.Type
+
+    Returns:
+        pd.DataFrame 또는 (chunk_rows 지정 시) Iterator[pd.DataFrame]
+    """
+    bucket, key = parse_s3_uri(output_location)
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+
+    result = pd.read_csv(
+        body,
+        dtype=str,
+        keep_default_na=False,
+        na_filter=False,
+        engine="c",
+        chunksize=chunk_rows,
+    )
+
+    if chunk_rows is not None:
+        return _decode_chunks(result, columns, types)
+
+    return _decode_frame(result, columns, types)
+
+
+def _decode_frame(
+    df: pd.DataFrame,
+    columns: Optional[List[str]],
+    types: Optional[List[str]],
+    categorize: bool = True,
+) -> pd.DataFrame:
+    if columns is None:
+        columns = list(df.columns)
+    if types is None:
+        df.columns = columns
+        return df
+    return _frame_from_buffers(
+        columns, [df.iloc[:, i] for i in range(df.shape[1])], types, categorize
+    )
+
+
+def _decode_chunks(
+    reader, columns: Optional[List[str]], types: Optional[List[str]]
+) -> Iterator[pd.DataFrame]:
+    # 청크마다 category 여부가 달라지지 않도록 문자열 컬럼은 그대로 유지
+    with reader:
+        for chunk in reader:
+            yield _decode_frame(chunk, columns, types, categorize=False)
+
+
+def _open_result_pages(
+    athena_client, query_id: str, s3_client, output_location: str, reader: str
+):
+    """결과 조회 방식 결정
+
+    auto 모드에서는 첫 페이지(최대 1000행)를 조회해 결과가 그 안에 끝나면 API 결과를
+    그대로 사용하고, 다음 페이지가 있으면 결과 CSV를 직접 내려받습니다.
+    S3 클라이언트가 없으면 reader와 관계없이 API로 조회합니다.
+
+    Returns:
+        ("s3", (output_location, ColumnInfo 리스트)) 또는 ("api", 페이지 이터레이터)
+    """
+    if reader == RESULT_READER_API or s3_client is None:
+        return RESULT_READER_API, iter_query_result_pages(athena_client, query_id)
+
+    if reader == RESULT_READER_S3:
+        if output_location is None:
+            output_location = get_query_output_location(athena_client, query_id)
+        # 컬럼 타입은 결과 메타데이터에서 조회 (헤더 행만 받음)
+        metadata = athena_client.get_query_results(
+            QueryExecutionId=query_id, MaxResults=1
+        )
+        column_info = metadata["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+        return RESULT_READER_S3, (output_location, column_info)
+
+    first = athena_client.get_query_results(
+        QueryExecutionId=query_id, MaxResults=ATHENA_MAX_PAGE_ROWS
+    )
+    column_info = first["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+    next_token = first.get("NextToken")
+
+    if next_token:
+        # 1000행 초과: 나머지 페이지를 API로 받는 대신 결과 CSV 한 번에 다운로드
+        if output_location is None:
+            output_location = get_query_output_location(athena_client, query_id)
+        return RESULT_READER_S3, (output_location, column_info)
+
+    first_page = (column_info, _decode_rows(first["ResultSet"].get("Rows", [])[1:]))
+    return RESULT_READER_API, iter([first_page])
+
+
+def decode_column(values, athena_type: str, categorize: bool = True) -> pd.Series:
+    """문자열 값 목록을 ColumnInfo.Type에 맞는 pandas 배열로 변환
+
+    Args:
+        values: 컬럼 값 (문자열, NULL은 빈 문자열)
+        athena_type: ColumnInfo.Type (예: bigint, double, date, varchar, decimal(10,2))
+        categorize: 반복 값이 많은 문자열 컬럼을 category로 변환할지 여부
+            (청크 단위 조회에서는 청크마다 타입이 달라지지 않도록 False)
+
+    Returns:
+        pd.Series: nullable Int64/Float64(NULL은 <NA>), datetime64(NULL은 NaT), bool,
+            또는 문자열(반복 값이 많으면 category)
+    """
+    base_type = (athena_type or "varchar").lower().split("(")[0].strip()
+    series = pd.Series(values, dtype=object)
+
+    if base_type in INTEGER_TYPES or base_type in FLOAT_TYPES:
+        # 빈 문자열(NULL)은 0이 아닌 <NA>로 유지 (float 경유 없이 변환해 bigint 정밀도 유지)
+        numbers = pd.to_numeric(
+            series.mask(series == "", None),
+            errors="coerce",
+            dtype_backend="numpy_nullable",
+        )
+        return numbers.astype("Int64" if base_type in INTEGER_TYPES else "Float64")
+    if base_type in DATETIME_TYPES:
+        return pd.to_datetime(series, errors="coerce")
+    if base_type in BOOLEAN_TYPES:
+        return series == "true"
+
+    if categorize and len(series) > 0 and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+        return series.astype("category")
+    return series
+
+
+def _frame_from_buffers(
+    columns: List[str],
+    buffers: List[List[str]],
+    types: List[str] = None,
+    categorize: bool = True,
+) -> pd.DataFrame:
+    """컬럼 버퍼를 DataFrame으로 변환 (중복 라벨도 유지, types가 있으면 타입 변환)"""
+    if types is None:
+        df = pd.DataFrame({i: buffer for i, buffer in enumerate(buffers)})
+    else:
+        df = pd.DataFrame(
+            {
+                i: decode_column(buffer, athena_type, categorize)
+                for i, (buffer, athena_type) in enumerate(zip(buffers, types))
+            }
+        )
+    df.columns = columns
+    return df
+
+
+def iter_query_result_chunks(
+    athena_client,
+    query_id: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    s3_client=None,
+    output_location: str = None,
+    reader: str = RESULT_READER_AUTO,
+) -> Iterator[pd.DataFrame]:
+    """쿼리 결과를 최대 chunk_rows 행 단위의 DataFrame으로 순회
+
+    전체 결과를 메모리에 올리지 않고 청크 단위로 처리할 때 사용합니다.
+
+    Args:
+        athena_client: boto3 Athena 클라이언트
+        query_id: 완료된 쿼리의 QueryExecutionId
+        chunk_rows: 청크당 최대 행 수
+        s3_client: boto3 S3 클라이언트 (없으면 항상 API로 조회)
+        output_location: 결과 CSV의 S3 URI (없으면 필요할 때 조회)
+        reader: 결과 조회 방식 (auto, api, s3)
+
+    Yields:
+        pd.DataFrame: 결과 청크 (결과가 없으면 컬럼만 있는 빈 DataFrame 1개,
+            문자열 컬럼은 모든 청크에서 같은 타입이 되도록 category로 변환하지 않음)
+    """
+    mode, source = _open_result_pages(
+        athena_client, query_id, s3_client, output_location, reader
+    )
+    if mode == RESULT_READER_S3:
+        location, column_info = source
+        yield from read_query_results_csv(
+            s3_client,
+            location,
+            columns=[col["Label"] for col in column_info],
+            chunk_rows=chunk_rows,
+            types=[col.get("Type") for col in column_info],
+        )
+        return
+
+    columns = None
+    buffers = None
+    buffered_rows = 0
+    yielded = False
+
+    for column_info, rows in source:
+        if columns is None:
+            columns = [col["Label"] for col in column_info]
+            types = [col.get("Type") for col in column_info]
+            buffers = [[] for _ in columns]
+
+        # 행 단위 데이터를 컬럼 단위로 전치하여 버퍼에 추가
+        for buffer, values in zip(buffers, zip(*rows)):
+            buffer.extend(values)
+        buffered_rows += len(rows)
+
+        # 청크를 내보낸 위치(offset)만 옮기고, 남은 행은 페이지당 한 번만 앞으로 당김
+        offset = 0
+        while buffered_rows - offset >= chunk_rows:
+            yield _frame_from_buffers(
+                columns,
+                [buffer[offset:offset + chunk_rows] for buffer in buffers],
+                types,
+                categorize=False,
+            )
+            yielded = True
+            offset += chunk_rows
+
+        if offset:
+            buffers = [buffer[offset:] for buffer in buffers]
+            buffered_rows -= offset
+
+    if columns is None:
+        return
+
+    if buffered_rows > 0 or not yielded:
+        yield _frame_from_buffers(columns, buffers, types, categorize=False)
+
+
+def fetch_query_results(
+    athena_client,
+    query_id: str,
+    s3_client=None,
+    output_location: str = None,
+    reader: str = RESULT_READER_AUTO,
+) -> pd.DataFrame:
+    """쿼리 결과 전체를 조회하여 하나의 DataFrame으로 반환
+
+    API로 조회할 때는 모든 페이지를 컬럼 버퍼에 누적한 뒤 마지막에 한 번만
+    DataFrame을 생성하고, 결과가 한 페이지를 넘으면 S3 결과 CSV를 직접 읽습니다.
+
+    Args:
+        athena_client: boto3 Athena 클라이언트
+        query_id: 완료된 쿼리의 QueryExecutionId
+        s3_client: boto3 S3 클라이언트 (없으면 항상 API로 조회)
+        output_location: 결과 CSV의 S3 URI (없으면 필요할 때 조회)
+        reader: 결과 조회 방식 (auto, api, s3)
+
+    Returns:
+        pd.DataFrame: 전체 결과 (ColumnInfo.Type에 따라 타입 변환)
+    """
+    mode, source = _open_result_pages(
+        athena_client, query_id, s3_client, output_location, reader
+    )
+    if mode == RESULT_READER_S3:
+        location, column_info = source
+        return read_query_results_csv(
+            s3_client,
+            location,
+            columns=[col["Label"] for col in column_info],
+            types=[col.get("Type") for col in column_info],
+        )
+
+    columns = None
+    buffers = None
+
+    for column_info, rows in source:
+        if columns is None:
+            columns = [col["Label"] for col in column_info]
+            types = [col.get("Type") for col in column_info]
+            buffers = [[] for _ in columns]
+
+        for buffer, values in zip(buffers, zip(*rows)):
+            buffer.extend(values)
+
+    if columns is None:
+        return pd.DataFrame()
+
+    return _frame_from_buffers(columns, buffers, types)
@@ -1,15 +1,25 @@
 import streamlit as st
 import boto3
 import pandas as pd
-from datetime import datetime, timedelta
-import time
-from typing import Dict, List
+import plotly.express as px
+import plotly.graph_objects as go
+from datetime import datetime, time, timedelta
+from typing import Dict, Optional, Tuple
 import logging
 import os
 from pathlib import Path
 
-# Amazon Q Developer S3 로그 분석 모듈
-from qcli_s3_analyzer import QCliS3LogAnalyzer
+# 분석 코어 (트래커 / 가격 계산 / S3 로그 분석, UI 의존성 없음)
+from analytics_core import (
+    REGIONS,
+    BedrockAthenaTracker,
+    QCliAthenaTracker,
+    DEFAULT_S3_WORKERS,
+    QCliS3LogAnalyzer,
+    calculate_cost_for_dataframe,
+    calculate_user_costs,
+    get_token_pricing,
+)
 
 
 # 로깅 설정
@@ -44,1013 +54,6 @@ def setup_logger():
 # 글로벌 로거
 logger = setup_logger()
 
-# AWS Bedrock 모델 가격 테이블 (리전별)
-# 참고: 최신 가격은 https://aws.amazon.com/bedrock/pricing/ 에서 확인하세요
-# 가격은 USD 기준이며, 1000 토큰당 가격입니다
-MODEL_PRICING = {
-    # 기본 가격 (대부분의 리전에 적용)
-    "default": {
-        # Claude 3 모델
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        # Claude 3.5 모델
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        # Claude 3.7 모델
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        # Claude 4 모델
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # US East (N. Virginia) - us-east-1
-    "us-east-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # US West (Oregon) - us-west-2
-    "us-west-2": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Europe (Frankfurt) - eu-central-1
-    "eu-central-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Tokyo) - ap-northeast-1
-    "ap-northeast-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Seoul) - ap-northeast-2
-    "ap-northeast-2": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Singapore) - ap-southeast-1
-    "ap-southeast-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-}
-
-# 리전 설정
-REGIONS = {
-    "us-east-1": "US East (N. Virginia)",
-    "us-west-2": "US West (Oregon)",
-    "eu-central-1": "Europe (Frankfurt)",
-    "ap-northeast-1": "Asia Pacific (Tokyo)",
-    "ap-northeast-2": "Asia Pacific (Seoul)",
-    "ap-southeast-1": "Asia Pacific (Singapore)",
-}
-
-default_region = "us-east-1"
-
-
-def get_model_cost(model_id: str, input_tokens: int, output_tokens: int, region: str = "default") -> float:
-    """모델별 비용 계산 (리전별 가격 반영)
-
-    Args:
-        model_id: Bedrock 모델 ID (예: us.anthropic.claude-3-haiku-20240307-v1:0)
-        input_tokens: 입력 토큰 수
-        output_tokens: 출력 토큰 수
-        region: AWS 리전 (예: us-east-1, ap-northeast-2)
-
-    Returns:
-        float: 계산된 비용 (USD)
-    """
-    logger.debug(
-        f"Calculating cost for model: {model_id}, input: {input_tokens}, output: {output_tokens}, region: {region}"
-    )
-
-    # 모델 ID에서 모델명 추출 (예: us.anthropic.claude-3-haiku-20240307-v1:0 -> claude-3-haiku-20240307)
-    model_name = model_id.split(".")[-1].split("-v")[0] if "." in model_id else model_id
-
-    # 리전별 가격 테이블 선택 (해당 리전이 없으면 default 사용)
-    region_pricing = MODEL_PRICING.get(region, MODEL_PRICING["default"])
-
-    # 가격 테이블에서 모델 찾기
-    for key, pricing in region_pricing.items():
-        if key in model_name:
-            # 가격은 1000 토큰당 가격이므로 1000으로 나눔
-            cost = (input_tokens * pricing["input"] / 1000) + (
-                output_tokens * pricing["output"] / 1000
-            )
-            logger.debug(f"Model: {key}, Region: {region}, Cost: ${cost:.6f}")
-            return cost
-
-    # 기본 가격 (Claude 3 Haiku)
-    logger.warning(f"Unknown model: {model_id}, using default pricing (Claude 3 Haiku)")
-    default_pricing = MODEL_PRICING["default"]["claude-3-haiku-20240307"]
-    default_cost = (input_tokens * default_pricing["input"] / 1000) + (
-        output_tokens * default_pricing["output"] / 1000
-    )
-    return default_cost
-
-
-class BedrockAthenaTracker:
-    def __init__(self, region=default_region):
-        logger.info(f"Initializing BedrockAthenaTracker with region: {region}")
-        self.region = region
-        self.athena = boto3.client("athena", region_name=region)
-        # STS 클라이언트도 region을 지정하여 생성
-        sts_client = boto3.client("sts", region_name=region)
-        self.account_id = sts_client.get_caller_identity()["Account"]
-        # 리전별 Athena 결과 저장용 버킷
-        self.results_bucket = f"bedrock-analytics-{self.account_id}-{self.region}"
-        logger.info(
-            f"Account ID: {self.account_id}, Results bucket: {self.results_bucket}"
-        )
-
-    def get_current_logging_config(self) -> Dict:
-        """현재 설정된 Model Invocation Logging 정보 조회"""
-        logger.info("Getting current logging configuration")
-        try:
-            bedrock = boto3.client("bedrock", region_name=self.region)
-            response = bedrock.get_model_invocation_logging_configuration()
-
-            if "loggingConfig" in response:
-                config = response["loggingConfig"]
-
-                if "s3Config" in config:
-                    result = {
-                        "type": "s3",
-                        "bucket": config["s3Config"].get("bucketName", ""),
-                        "prefix": config["s3Config"].get("keyPrefix", ""),
-                        "status": "enabled",
-                    }
-                    logger.info(f"Logging config: {result}")
-                    return result
-
-            logger.warning("Logging is disabled")
-            return {"status": "disabled"}
-
-        except Exception as e:
-            logger.error(f"Error getting logging config: {str(e)}")
-            return {"status": "error", "error": str(e)}
-
-    def set_results_bucket(self, bucket_name: str):
-        """Athena 결과 저장용 버킷 설정"""
-        self.results_bucket = bucket_name
-        logger.info(f"Results bucket set to: {self.results_bucket}")
-
-    def execute_athena_query(
-        self, query: str, database: str = "bedrock_analytics"
-    ) -> pd.DataFrame:
-        """Athena 쿼리 실행 및 결과 반환"""
-        logger.info(f"Executing Athena query on database: {database}")
-        logger.debug(f"Query: {query}")
-
-        try:
-            # 쿼리 실행
-            response = self.athena.start_query_execution(
-                QueryString=query,
-                QueryExecutionContext={"Database": database},
-                ResultConfiguration={
-                    "OutputLocation": f"s3://{self.results_bucket}/query-results/"
-                },
-            )
-
-            query_id = response["QueryExecutionId"]
-            logger.info(f"Query execution started: {query_id}")
-
-            # 쿼리 완료 대기
-            max_wait = 60
-            for i in range(max_wait):
-                result = self.athena.get_query_execution(QueryExecutionId=query_id)
-                status = result["QueryExecution"]["Status"]["State"]
-
-                if status == "SUCCEEDED":
-                    logger.info(f"Query succeeded in {i+1} seconds")
-                    break
-                elif status in ["FAILED", "CANCELLED"]:
-                    error = result["QueryExecution"]["Status"].get(
-                        "StateChangeReason", "Unknown error"
-                    )
-                    logger.error(f"Query failed: {error}")
-                    raise Exception(f"Query failed: {error}")
-
-                time.sleep(1)
-            else:
-                logger.error("Query timeout")
-                raise Exception("Query timeout")
-
-            # 결과 조회
-            result_response = self.athena.get_query_results(QueryExecutionId=query_id)
-
-            # DataFrame으로 변환
-            columns = [
-                col["Label"]
-                for col in result_response["ResultSet"]["ResultSetMetadata"][
-                    "ColumnInfo"
-                ]
-            ]
-            rows = []
-
-            for row in result_response["ResultSet"]["Rows"][1:]:  # 헤더 제외
-                row_data = [field.get("VarCharValue", "") for field in row["Data"]]
-                rows.append(row_data)
-
-            df = pd.DataFrame(rows, columns=columns)
-            logger.info(f"Query returned {len(df)} rows")
-            return df
-
-        except Exception as e:
-            logger.error(f"Athena query execution failed: {str(e)}")
-            st.error(f"Athena 쿼리 실행 실패: {str(e)}")
-            return pd.DataFrame()
-
-    def get_user_cost_analysis(
-        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
-    ) -> pd.DataFrame:
-        """사용자별 비용 분석"""
-        logger.info(f"Getting user cost analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            CASE
-                WHEN identity.arn LIKE '%assumed-role%' THEN
-                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
-                WHEN identity.arn LIKE '%user%' THEN
-                    regexp_extract(identity.arn, 'user/([^/]+)')
-                ELSE 'Unknown'
-            END as user_or_app,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY identity.arn
-        ORDER BY call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_user_app_detail_analysis(
-        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
-    ) -> pd.DataFrame:
-        """유저별 애플리케이션별 상세 분석"""
-        logger.info(f"Getting user-app detail analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            CASE
-                WHEN identity.arn LIKE '%assumed-role%' THEN
-                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
-                WHEN identity.arn LIKE '%user%' THEN
-                    regexp_extract(identity.arn, 'user/([^/]+)')
-                ELSE 'Unknown'
-            END as user_or_app,
-            regexp_extract(modelId, '([^/]+)$') as model_name,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY identity.arn, modelId
-        ORDER BY user_or_app, call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_hourly_usage_pattern(
-        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
-    ) -> pd.DataFrame:
-        """시간별 사용 패턴 - timestamp에서 hour 추출"""
-        logger.info(f"Getting hourly usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            year,
-            month,
-            day,
-            date_format(from_iso8601_timestamp(timestamp), '%H') as hour,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
-        ORDER BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_daily_usage_pattern(
-        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
-    ) -> pd.DataFrame:
-        """일별 사용 패턴"""
-        logger.info(f"Getting daily usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            year, month, day,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY year, month, day
-        ORDER BY year, month, day
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_model_usage_stats(
-        self, start_date: datetime, end_date: datetime, arn_pattern: str = None
-    ) -> pd.DataFrame:
-        """모델별 사용 통계"""
-        logger.info(f"Getting model usage stats from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            regexp_extract(modelId, '([^/]+)$') as model_name,
-            COUNT(*) as call_count,
-            AVG(CAST(input.inputTokenCount AS DOUBLE)) as avg_input_tokens,
-            AVG(CAST(output.outputTokenCount AS DOUBLE)) as avg_output_tokens,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY modelId
-        ORDER BY call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_total_summary(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> Dict:
-        """전체 요약 통계"""
-        logger.info(f"Getting total summary from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            COUNT(*) as total_calls,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        """
-
-        df = self.execute_athena_query(query)
-
-        if not df.empty:
-            result = {
-                "total_calls": (
-                    int(df.iloc[0]["total_calls"]) if df.iloc[0]["total_calls"] else 0
-                ),
-                "total_input_tokens": (
-                    int(df.iloc[0]["total_input_tokens"])
-                    if df.iloc[0]["total_input_tokens"]
-                    else 0
-                ),
-                "total_output_tokens": (
-                    int(df.iloc[0]["total_output_tokens"])
-                    if df.iloc[0]["total_output_tokens"]
-                    else 0
-                ),
-                "total_cost_usd": 0.0,  # 모델별로 계산 필요
-            }
-            logger.info(f"Total summary: {result}")
-            return result
-        else:
-            logger.warning("No data found for summary")
-            return {
-                "total_calls": 0,
-                "total_input_tokens": 0,
-                "total_output_tokens": 0,
-                "total_cost_usd": 0.0,
-            }
-
-
-# QCli 토큰 사용량 추정 상수
-# 기준: 영어 단어 1.4토큰, 4글자당 5토큰
-# 코드 1줄 평균 60-80문자 = 약 75-100토큰
-QCLI_TOKEN_ESTIMATION = {
-    "conservative": {  # 보수적 추정 (짧은 코드/간단한 질문)
-        "chat_message_input": 100,
-        "chat_message_output": 300,
-        "chat_code_line": 50,
-        "inline_suggestion": 40,
-        "inline_code_line": 50,
-        "dev_event_input": 400,
-        "dev_event_output": 600,
-        "test_event_input": 300,
-        "test_event_output": 500,
-        "doc_event_input": 200,
-        "doc_event_output": 400,
-    },
-    "average": {  # 평균 추정 (일반적인 사용) - 권장
-        "chat_message_input": 150,
-        "chat_message_output": 500,
-        "chat_code_line": 75,
-        "inline_suggestion": 60,
-        "inline_code_line": 75,
-        "dev_event_input": 600,
-        "dev_event_output": 1000,
-        "test_event_input": 450,
-        "test_event_output": 750,
-        "doc_event_input": 350,
-        "doc_event_output": 600,
-    },
-    "optimistic": {  # 낙관적 추정 (복잡한 코드/긴 대화)
-        "chat_message_input": 200,
-        "chat_message_output": 800,
-        "chat_code_line": 100,
-        "inline_suggestion": 80,
-        "inline_code_line": 100,
-        "dev_event_input": 1000,
-        "dev_event_output": 1500,
-        "test_event_input": 600,
-        "test_event_output": 1000,
-        "doc_event_input": 500,
-        "doc_event_output": 800,
-    }
-}
-
-
-class QCliAthenaTracker:
-    """Amazon Q CLI 사용량 추적을 위한 Athena 쿼리 클래스"""
-
-    def __init__(self, region=default_region):
-        logger.info(f"Initializing QCliAthenaTracker with region: {region}")
-        self.region = region
-        self.athena = boto3.client("athena", region_name=region)
-        sts_client = boto3.client("sts", region_name=region)
-        self.account_id = sts_client.get_caller_identity()["Account"]
-        self.results_bucket = f"amazonq-developer-reports-{self.account_id}"
-        logger.info(
-            f"Account ID: {self.account_id}, Results bucket: {self.results_bucket}"
-        )
-
-    def execute_athena_query(
-        self, query: str, database: str = "qcli_analytics"
-    ) -> pd.DataFrame:
-        """Athena 쿼리 실행 및 결과 반환"""
-        logger.info(f"Executing Athena query on database: {database}")
-        logger.debug(f"Query: {query}")
-
-        try:
-            # 쿼리 실행
-            response = self.athena.start_query_execution(
-                QueryString=query,
-                QueryExecutionContext={"Database": database},
-                ResultConfiguration={
-                    "OutputLocation": f"s3://{self.results_bucket}/query-results/"
-                },
-            )
-
-            query_id = response["QueryExecutionId"]
-            logger.info(f"Query execution started: {query_id}")
-
-            # 쿼리 완료 대기
-            max_wait = 60
-            for i in range(max_wait):
-                result = self.athena.get_query_execution(QueryExecutionId=query_id)
-                status = result["QueryExecution"]["Status"]["State"]
-
-                if status == "SUCCEEDED":
-                    logger.info(f"Query succeeded in {i+1} seconds")
-                    break
-                elif status in ["FAILED", "CANCELLED"]:
-                    error = result["QueryExecution"]["Status"].get(
-                        "StateChangeReason", "Unknown error"
-                    )
-                    logger.error(f"Query failed: {error}")
-                    raise Exception(f"Query failed: {error}")
-
-                time.sleep(1)
-            else:
-                logger.error("Query timeout")
-                raise Exception("Query timeout")
-
-            # 결과 조회
-            result_response = self.athena.get_query_results(QueryExecutionId=query_id)
-
-            # DataFrame으로 변환
-            columns = [
-                col["Label"]
-                for col in result_response["ResultSet"]["ResultSetMetadata"][
-                    "ColumnInfo"
-                ]
-            ]
-            rows = []
-
-            for row in result_response["ResultSet"]["Rows"][1:]:  # 헤더 제외
-                row_data = [field.get("VarCharValue", "") for field in row["Data"]]
-                rows.append(row_data)
-
-            df = pd.DataFrame(rows, columns=columns)
-            logger.info(f"Query returned {len(df)} rows")
-            return df
-
-        except Exception as e:
-            logger.error(f"Athena query execution failed: {str(e)}")
-            st.error(f"Athena 쿼리 실행 실패: {str(e)}")
-            return pd.DataFrame()
-
-    def get_total_summary(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> Dict:
-        """전체 요약 통계 - Amazon Q Developer CSV 리포트 기반"""
-        logger.info(
-            f"Getting QCli total summary from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        # 실제 AWS CSV 메트릭 사용:
-        # - Chat_MessagesSent: 채팅 메시지 수
-        # - Inline_SuggestionsCount: 인라인 코드 제안 수
-        # - Chat_MessagesInteracted: 사용자 상호작용 메트릭
-        query = f"""
-        SELECT
-            COUNT(DISTINCT UserId) as unique_users,
-            COUNT(DISTINCT Date) as active_days,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_dev_events,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_test_events
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        """
-
-        df = self.execute_athena_query(query)
-
-        if not df.empty and df.iloc[0]["unique_users"]:
-            result = {
-                "unique_users": (
-                    int(df.iloc[0]["unique_users"])
-                    if df.iloc[0]["unique_users"]
-                    else 0
-                ),
-                "active_days": (
-                    int(df.iloc[0]["active_days"]) if df.iloc[0]["active_days"] else 0
-                ),
-                "total_chat_messages": (
-                    int(df.iloc[0]["total_chat_messages"])
-                    if df.iloc[0]["total_chat_messages"]
-                    else 0
-                ),
-                "total_inline_suggestions": (
-                    int(df.iloc[0]["total_inline_suggestions"])
-                    if df.iloc[0]["total_inline_suggestions"]
-                    else 0
-                ),
-                "total_inline_acceptances": (
-                    int(df.iloc[0]["total_inline_acceptances"])
-                    if df.iloc[0]["total_inline_acceptances"]
-                    else 0
-                ),
-                "total_chat_code_lines": (
-                    int(df.iloc[0]["total_chat_code_lines"])
-                    if df.iloc[0]["total_chat_code_lines"]
-                    else 0
-                ),
-                "total_inline_code_lines": (
-                    int(df.iloc[0]["total_inline_code_lines"])
-                    if df.iloc[0]["total_inline_code_lines"]
-                    else 0
-                ),
-                "total_dev_events": (
-                    int(df.iloc[0]["total_dev_events"])
-                    if df.iloc[0]["total_dev_events"]
-                    else 0
-                ),
-                "total_test_events": (
-                    int(df.iloc[0]["total_test_events"])
-                    if df.iloc[0]["total_test_events"]
-                    else 0
-                ),
-            }
-            logger.info(f"QCli total summary: {result}")
-            return result
-        else:
-            logger.warning("No data found for summary")
-            return {
-                "unique_users": 0,
-                "active_days": 0,
-                "total_chat_messages": 0,
-                "total_inline_suggestions": 0,
-                "total_inline_acceptances": 0,
-                "total_chat_code_lines": 0,
-                "total_inline_code_lines": 0,
-                "total_dev_events": 0,
-                "total_test_events": 0,
-            }
-
-    def get_user_usage_analysis(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """사용자별 사용량 분석"""
-        logger.info(
-            f"Getting QCli user usage analysis from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            UserId as user_id,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_dev_events,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_test_events,
-            SUM(CAST(DocGeneration_EventCount AS BIGINT)) as total_doc_events,
-            COUNT(DISTINCT Date) as active_days,
-            MIN(Date) as first_activity,
-            MAX(Date) as last_activity
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        GROUP BY UserId
-        ORDER BY total_chat_messages DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_daily_usage_pattern(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """일별 사용 패턴"""
-        logger.info(
-            f"Getting QCli daily usage pattern from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            Date as date_str,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        GROUP BY Date
-        ORDER BY Date
-        """
-
-        return self.execute_athena_query(query)
-
-
-    def get_feature_usage_stats(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """기능별 사용 통계 (Chat, Inline, Dev, Test, Doc 등)"""
-        logger.info(
-            f"Getting QCli feature usage stats from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            'Chat Messages' as feature_type,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            'Inline Suggestions' as feature_type,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            'Inline Acceptances' as feature_type,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/dev Events' as feature_type,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/test Events' as feature_type,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/doc Events' as feature_type,
-            SUM(CAST(DocGeneration_EventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        ORDER BY total_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def estimate_tokens(self, summary: Dict, estimation_type: str = "average") -> Dict:
-        """사용량 데이터로부터 토큰 사용량 추정
-
-        Args:
-            summary: get_total_summary()에서 반환된 요약 데이터
-            estimation_type: "conservative", "average", "optimistic" 중 선택
-
-        Returns:
-            Dict: 추정된 토큰 사용량 정보
-        """
-        logger.info(f"Estimating tokens with {estimation_type} model")
-
-        if estimation_type not in QCLI_TOKEN_ESTIMATION:
-            logger.warning(f"Unknown estimation type: {estimation_type}, using 'average'")
-            estimation_type = "average"
-
-        constants = QCLI_TOKEN_ESTIMATION[estimation_type]
-
-        # Input 토큰 추정
-        estimated_input_tokens = (
-            summary.get("total_chat_messages", 0) * constants["chat_message_input"] +
-            summary.get("total_inline_suggestions", 0) * constants["inline_suggestion"] +
-            summary.get("total_dev_events", 0) * constants["dev_event_input"] +
-            summary.get("total_test_events", 0) * constants["test_event_input"] +
-            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_input"]
-        )
-
-        # Output 토큰 추정
-        estimated_output_tokens = (
-            summary.get("total_chat_messages", 0) * constants["chat_message_output"] +
-            summary.get("total_chat_code_lines", 0) * constants["chat_code_line"] +
-            summary.get("total_inline_code_lines", 0) * constants["inline_code_line"] +
-            summary.get("total_inline_acceptances", 0) * constants["inline_suggestion"] +
-            summary.get("total_dev_events", 0) * constants["dev_event_output"] +
-            summary.get("total_test_events", 0) * constants["test_event_output"] +
-            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_output"]
-        )
-
-        total_tokens = estimated_input_tokens + estimated_output_tokens
-
-        result = {
-            "estimation_type": estimation_type,
-            "estimated_input_tokens": int(estimated_input_tokens),
-            "estimated_output_tokens": int(estimated_output_tokens),
-            "estimated_total_tokens": int(total_tokens),
-        }
-
-        logger.info(f"Token estimation result: {result}")
-        return result
-
-    def check_official_limits(self, summary: Dict, days_in_period: int) -> Dict:
-        """공식 리밋 체크 및 경고 생성
-
-        Args:
-            summary: get_total_summary()에서 반환된 요약 데이터
-            days_in_period: 조회 기간의 일수
-
-        Returns:
-            Dict: 리밋 체크 결과 및 경고
-        """
-        logger.info("Checking official limits")
-
-        # 공식 문서화된 리밋
-        OFFICIAL_LIMITS = {
-            "dev_events": 30,  # /dev 명령어: 30회/월
-            "transformation_lines": 4000,  # Code Transformation: 4,000줄/월
-            # 채팅/인라인: AWS가 공개하지 않음
-        }
-
-        # 월간 사용량 추정 (현재 기간을 30일로 환산)
-        monthly_factor = 30 / days_in_period if days_in_period > 0 else 1
-
-        dev_events_used = summary.get("total_dev_events", 0)
-        dev_events_projected = int(dev_events_used * monthly_factor)
-
-        # Transformation 데이터는 summary에 없을 수 있음 (추후 추가 가능)
-        transformation_lines_used = summary.get("total_transformation_lines", 0)
-        transformation_lines_projected = int(transformation_lines_used * monthly_factor)
-
-        result = {
-            "dev_events": {
-                "used": dev_events_used,
-                "limit": OFFICIAL_LIMITS["dev_events"],
-                "projected_monthly": dev_events_projected,
-                "percentage": (dev_events_projected / OFFICIAL_LIMITS["dev_events"] * 100) if OFFICIAL_LIMITS["dev_events"] > 0 else 0,
-                "warning": dev_events_projected >= OFFICIAL_LIMITS["dev_events"] * 0.8
-            },
-            "transformation_lines": {
-                "used": transformation_lines_used,
-                "limit": OFFICIAL_LIMITS["transformation_lines"],
-                "projected_monthly": transformation_lines_projected,
-                "percentage": (transformation_lines_projected / OFFICIAL_LIMITS["transformation_lines"] * 100) if OFFICIAL_LIMITS["transformation_lines"] > 0 else 0,
-                "warning": transformation_lines_projected >= OFFICIAL_LIMITS["transformation_lines"] * 0.8
-            }
-        }
-
-        logger.info(f"Limit check result: {result}")
-        return result
-
-    def analyze_usage_trends(self, start_date: datetime, end_date: datetime, user_pattern: str = None) -> Dict:
-        """사용량 추세 분석 및 이상 감지
-
-        Args:
-            start_date: 시작 날짜
-            end_date: 종료 날짜
-            user_pattern: 사용자 필터 패턴
-
-        Returns:
-            Dict: 추세 분석 결과
-        """
-        logger.info(f"Analyzing usage trends from {start_date} to {end_date}")
-
-        # 일별 사용 패턴 조회
-        daily_df = self.get_daily_usage_pattern(start_date, end_date, user_pattern)
-
-        if daily_df.empty:
-            return {
-                "daily_avg": 0,
-                "daily_max": 0,
-                "daily_min": 0,
-                "anomaly_detected": False
-            }
-
-        # 숫자 변환
-        for col in ["total_chat_messages", "total_inline_suggestions"]:
-            if col in daily_df.columns:
-                daily_df[col] = pd.to_numeric(daily_df[col], errors='coerce').fillna(0)
-
-        # 일일 총 활동 계산
-        daily_df["total_activity"] = (
-            daily_df.get("total_chat_messages", 0) +
-            daily_df.get("total_inline_suggestions", 0)
-        )
-
-        daily_avg = daily_df["total_activity"].mean()
-        daily_max = daily_df["total_activity"].max()
-        daily_min = daily_df["total_activity"].min()
-
-        # 이상 감지: 일평균의 3배 초과하는 날이 있는지
-        anomaly_threshold = daily_avg * 3
-        anomaly_days = daily_df[daily_df["total_activity"] > anomaly_threshold]
-
-        result = {
-            "daily_avg": float(daily_avg),
-            "daily_max": float(daily_max),
-            "daily_min": float(daily_min),
-            "anomaly_detected": len(anomaly_days) > 0,
-            "anomaly_count": len(anomaly_days),
-            "anomaly_threshold": float(anomaly_threshold)
-        }
-
-        logger.info(f"Trend analysis result: {result}")
-        return result
-
-
-def calculate_cost_for_dataframe(
-    df: pd.DataFrame, model_col: str = "model_name", region: str = "default"
-) -> pd.DataFrame:
-    """DataFrame에 비용 컬럼 추가 (리전별 가격 반영)
-
-    Args:
-        df: 비용을 계산할 DataFrame
-        model_col: 모델명이 있는 컬럼명
-        region: AWS 리전 (예: us-east-1, ap-northeast-2)
-
-    Returns:
-        pd.DataFrame: 비용 컬럼이 추가된 DataFrame
-    """
-    logger.info(f"Calculating cost for DataFrame with {len(df)} rows, region: {region}")
-
-    if df.empty:
-        return df
-
-    costs = []
-    for _, row in df.iterrows():
-        model = row.get(model_col, "")
-        input_tokens = (
-            int(row.get("total_input_tokens", 0))
-            if row.get("total_input_tokens")
-            else 0
-        )
-        output_tokens = (
-            int(row.get("total_output_tokens", 0))
-            if row.get("total_output_tokens")
-            else 0
-        )
-        cost = get_model_cost(model, input_tokens, output_tokens, region)
-        costs.append(cost)
-
-    df["estimated_cost_usd"] = costs
-    logger.info(f"Total cost calculated for region {region}: ${sum(costs):.4f}")
-    return df
-
 
 def main():
     logger.info("Starting Analytics Dashboard")
@@ -1113,6 +116,30 @@ def main():
         render_qcli_analytics(selected_region, start_date, end_date)
 
 
+def render_cache_options(key_prefix: str) -> Tuple[bool, bool]:
+    """사이드바에 쿼리 결과 캐시 옵션 표시
+
+    Returns:
+        (캐시 사용 여부, 캐시 새로고침 여부)
+    """
+    st.sidebar.subheader("🗄️ 쿼리 결과 캐시")
+    use_cache = st.sidebar.checkbox(
+        "캐시 사용",
+        value=True,
+        key=f"{key_prefix}_use_cache",
+        help="같은 조건의 쿼리 결과를 로컬에 저장해 재조회 시 Athena 스캔 없이 바로 표시합니다. "
+        "오늘 이전 기간은 30일, 오늘을 포함한 기간은 5분간 유지됩니다.",
+    )
+    refresh_cache = st.sidebar.checkbox(
+        "캐시 새로고침",
+        value=False,
+        key=f"{key_prefix}_refresh_cache",
+        disabled=not use_cache,
+        help="캐시된 결과를 무시하고 Athena에서 다시 조회한 뒤 캐시를 갱신합니다.",
+    )
+    return use_cache, use_cache and refresh_cache
+
+
 def render_bedrock_analytics(selected_region, start_date, end_date):
     """Bedrock 분석 대시보드 렌더링"""
     logger.info("Rendering Bedrock Analytics")
@@ -1127,8 +154,17 @@ def render_bedrock_analytics(selected_region, start_date, end_date):
         help="특정 ARN 패턴을 포함하는 사용자만 필터링합니다. 비워두면 전체 사용자를 표시합니다."
     )
 
+    # 쿼리 결과 캐시 설정
+    use_cache, refresh_cache = render_cache_options("bedrock")
+
     # 현재 로깅 설정 자동 조회
-    tracker = BedrockAthenaTracker(region=selected_region)
+    tracker = BedrockAthenaTracker(
+        region=selected_region,
+        use_cache=use_cache,
+        refresh_cache=refresh_cache,
+        on_error=st.error,
+        logger=logger,
+    )
 
     with st.spinner("현재 Model Invocation Logging 설정 확인 중..."):
         current_config = tracker.get_current_logging_config()
@@ -1157,298 +193,70 @@ def render_bedrock_analytics(selected_region, start_date, end_date):
         logger.error(f"Error checking logging config: {current_config.get('error')}")
         return
 
+    # 쿼리 실행 방식
+    use_cube = st.sidebar.checkbox(
+        "🧊 단일 스캔 집계",
+        value=True,
+        key="bedrock_use_cube",
+        help="로그를 한 번만 스캔해 만든 사용량 큐브에서 모든 섹션을 계산합니다.",
+    )
+    # 큐브는 쿼리 하나로 실행되므로 동시 실행은 개별 쿼리 모드에서만 의미가 있음
+    concurrent = st.sidebar.checkbox(
+        "⚡ 쿼리 동시 실행",
+        value=True,
+        key="bedrock_concurrent",
+        disabled=use_cube,
+        help="모든 분석 쿼리를 한 번에 제출하고 완료되는 순서대로 섹션을 표시합니다. "
+        "단일 스캔 집계를 끈 경우에만 적용됩니다.",
+    )
+
     # 분석 실행
     if st.sidebar.button("🔍 데이터 분석", type="primary"):
         logger.info("Analysis button clicked")
 
-        with st.spinner("Athena에서 데이터 분석 중..."):
-
-            # ARN 패턴 정보 표시
-            if arn_pattern:
-                st.info(f"🔍 ARN 패턴 필터링 적용: '{arn_pattern}'")
-
-            # 전체 요약
-            summary = tracker.get_total_summary(start_date, end_date, arn_pattern if arn_pattern else None)
-
-            st.header("📊 전체 요약")
-
-            col1, col2, col3, col4 = st.columns(4)
-
-            with col1:
-                st.metric("총 API 호출", f"{summary['total_calls']:,}")
-
-            with col2:
-                st.metric("총 Input 토큰", f"{summary['total_input_tokens']:,}")
-
-            with col3:
-                st.metric("총 Output 토큰", f"{summary['total_output_tokens']:,}")
-
-            # 모델별 통계로 총 비용 계산
-            model_df = tracker.get_model_usage_stats(start_date, end_date, arn_pattern if arn_pattern else None)
-            if not model_df.empty:
-                model_df = calculate_cost_for_dataframe(model_df, region=selected_region)
-                total_cost = model_df["estimated_cost_usd"].sum()
-                summary["total_cost_usd"] = total_cost
-
-            with col4:
-                st.metric("총 비용", f"${summary['total_cost_usd']:.4f}")
-
-            # 사용자별 분석
-            st.header("👥 사용자/애플리케이션별 분석")
-
-            user_df = tracker.get_user_cost_analysis(start_date, end_date, arn_pattern if arn_pattern else None)
-
-            if not user_df.empty:
-                # 숫자 컬럼 변환
-                numeric_columns = [
-                    "call_count",
-                    "total_input_tokens",
-                    "total_output_tokens",
-                ]
-                for col in numeric_columns:
-                    if col in user_df.columns:
-                        user_df[col] = pd.to_numeric(
-                            user_df[col], errors="coerce"
-                        ).fillna(0)
-
-                # 비용 계산을 위한 임시 모델명 추가 (모델별 평균 사용)
-                # 실제로는 각 사용자가 어떤 모델을 사용했는지 알아야 정확함
-                # 여기서는 Claude 3 Haiku 기본 가격 사용 (리전별 가격 반영)
-                costs = []
-                for _, row in user_df.iterrows():
-                    input_tokens = int(row.get("total_input_tokens", 0)) if row.get("total_input_tokens") else 0
-                    output_tokens = int(row.get("total_output_tokens", 0)) if row.get("total_output_tokens") else 0
-                    # Claude 3 Haiku를 기본 모델로 사용
-                    cost = get_model_cost("claude-3-haiku-20240307", input_tokens, output_tokens, selected_region)
-                    costs.append(cost)
-                user_df["estimated_cost_usd"] = costs
-
-                st.dataframe(user_df, use_container_width=True)
-
-                # 비용 차트
-                if len(user_df) > 0:
-                    import plotly.express as px
+        # ARN 패턴 정보 표시
+        if arn_pattern:
+            st.info(f"🔍 ARN 패턴 필터링 적용: '{arn_pattern}'")
 
-                    fig = px.bar(
-                        user_df.head(10),
-                        x="user_or_app",
-                        y="estimated_cost_usd",
-                        title="상위 10명 사용자/애플리케이션별 비용",
-                        labels={
-                            "user_or_app": "사용자/애플리케이션",
-                            "estimated_cost_usd": "비용 (USD)",
-                        },
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("분석할 데이터가 없습니다.")
-
-            # 유저별 애플리케이션별 상세 분석
-            st.header("📱 유저별 애플리케이션별 상세 분석")
-
-            user_app_df = tracker.get_user_app_detail_analysis(start_date, end_date, arn_pattern if arn_pattern else None)
-
-            if not user_app_df.empty:
-                # 숫자 컬럼 변환
-                numeric_columns = [
-                    "call_count",
-                    "total_input_tokens",
-                    "total_output_tokens",
-                ]
-                for col in numeric_columns:
-                    if col in user_app_df.columns:
-                        user_app_df[col] = pd.to_numeric(
-                            user_app_df[col], errors="coerce"
-                        ).fillna(0)
-
-                # 비용 계산 (리전별 가격 반영)
-                user_app_df = calculate_cost_for_dataframe(user_app_df, region=selected_region)
-
-                st.dataframe(user_app_df, use_container_width=True)
-            else:
-                st.info("분석할 데이터가 없습니다.")
-
-            # 모델별 분석
-            st.header("🤖 모델별 사용 통계")
-
-            if not model_df.empty:
-                # 숫자 컬럼 변환
-                numeric_columns = [
-                    "call_count",
-                    "avg_input_tokens",
-                    "avg_output_tokens",
-                    "total_input_tokens",
-                    "total_output_tokens",
-                    "estimated_cost_usd",
-                ]
-                for col in numeric_columns:
-                    if col in model_df.columns:
-                        model_df[col] = pd.to_numeric(
-                            model_df[col], errors="coerce"
-                        ).fillna(0)
+        # 섹션 컨테이너를 표시 순서대로 미리 만들어 두고, 쿼리가 끝나는 대로 채움
+        containers = {section: st.container() for section in tracker.DASHBOARD_SECTIONS}
+        user_app_df = None
+        pending_user_df = None
 
-                st.dataframe(model_df, use_container_width=True)
-
-                # 모델별 호출 비율 차트
-                if len(model_df) > 0:
-                    import plotly.express as px
-
-                    fig = px.pie(
-                        model_df,
-                        values="call_count",
-                        names="model_name",
-                        title="모델별 호출 비율",
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-            # 일별 사용 패턴
-            st.header("📅 일별 사용 패턴")
-
-            daily_df = tracker.get_daily_usage_pattern(start_date, end_date, arn_pattern if arn_pattern else None)
-
-            if not daily_df.empty and len(daily_df) > 0:
-                # 날짜 컬럼 생성 (숫자를 문자열로 변환 후 zfill 적용)
-                daily_df["date"] = pd.to_datetime(
-                    daily_df["year"].astype(str)
-                    + "-"
-                    + daily_df["month"].astype(str).str.zfill(2)
-                    + "-"
-                    + daily_df["day"].astype(str).str.zfill(2)
-                )
-
-                # 숫자 컬럼 변환
-                numeric_columns = ["call_count", "total_input_tokens", "total_output_tokens"]
-                for col in numeric_columns:
-                    if col in daily_df.columns:
-                        daily_df[col] = pd.to_numeric(
-                            daily_df[col], errors="coerce"
-                        ).fillna(0)
-
-                # 표시용 DataFrame 생성 (날짜를 문자열로 포맷)
-                display_df = daily_df.copy()
-                display_df["날짜"] = display_df["date"].dt.strftime("%Y-%m-%d")
-                display_df = display_df[["날짜", "call_count", "total_input_tokens", "total_output_tokens"]]
-                display_df.columns = ["날짜", "API 호출 수", "Input 토큰", "Output 토큰"]
-
-                # 1. 테이블 먼저 표시
-                st.dataframe(display_df, use_container_width=True)
-
-                # 2. 그래프 표시
-                import plotly.express as px
-                import plotly.graph_objects as go
-
-                # 일별 API 호출 패턴
-                fig = px.line(
-                    daily_df,
-                    x="date",
-                    y="call_count",
-                    title="일별 API 호출 패턴",
-                    labels={"date": "날짜", "call_count": "API 호출 수"},
-                    markers=True
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-                # 일별 토큰 사용량
-                fig2 = go.Figure()
-                fig2.add_trace(go.Scatter(
-                    x=daily_df["date"],
-                    y=daily_df["total_input_tokens"],
-                    mode='lines+markers',
-                    name='Input 토큰',
-                    line=dict(color='blue')
-                ))
-                fig2.add_trace(go.Scatter(
-                    x=daily_df["date"],
-                    y=daily_df["total_output_tokens"],
-                    mode='lines+markers',
-                    name='Output 토큰',
-                    line=dict(color='red')
-                ))
-                fig2.update_layout(
-                    title="일별 토큰 사용량",
-                    xaxis_title="날짜",
-                    yaxis_title="토큰 수",
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig2, use_container_width=True)
-            else:
-                st.warning("선택한 기간에 일별 사용 데이터가 없습니다.")
-
-            # 시간대별 패턴
-            st.header("⏰ 시간대별 사용 패턴")
-
-            hourly_df = tracker.get_hourly_usage_pattern(start_date, end_date, arn_pattern if arn_pattern else None)
-
-            if not hourly_df.empty and len(hourly_df) > 0:
-                # 시간 컬럼 생성 (숫자를 문자열로 변환 후 zfill 적용)
-                hourly_df["datetime"] = pd.to_datetime(
-                    hourly_df["year"].astype(str)
-                    + "-"
-                    + hourly_df["month"].astype(str).str.zfill(2)
-                    + "-"
-                    + hourly_df["day"].astype(str).str.zfill(2)
-                    + " "
-                    + hourly_df["hour"].astype(str).str.zfill(2)
-                    + ":00:00"
-                )
-
-                # 숫자 컬럼 변환
-                numeric_columns = ["call_count", "total_input_tokens", "total_output_tokens"]
-                for col in numeric_columns:
-                    if col in hourly_df.columns:
-                        hourly_df[col] = pd.to_numeric(
-                            hourly_df[col], errors="coerce"
-                        ).fillna(0)
-
-                # 표시용 DataFrame 생성
-                display_df = hourly_df.copy()
-                display_df["시간"] = display_df["datetime"].dt.strftime("%Y-%m-%d %H:00")
-                display_df = display_df[["시간", "call_count", "total_input_tokens", "total_output_tokens"]]
-                display_df.columns = ["시간", "API 호출 수", "Input 토큰", "Output 토큰"]
-
-                # 1. 테이블 먼저 표시
-                st.dataframe(display_df, use_container_width=True)
-
-                # 2. 그래프 표시
-                import plotly.express as px
-                import plotly.graph_objects as go
-
-                # 시간대별 API 호출 패턴
-                fig = px.line(
-                    hourly_df,
-                    x="datetime",
-                    y="call_count",
-                    title="시간대별 API 호출 패턴",
-                    labels={"datetime": "시간", "call_count": "API 호출 수"},
-                    markers=True
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-                # 시간대별 토큰 사용량
-                fig2 = go.Figure()
-                fig2.add_trace(go.Scatter(
-                    x=hourly_df["datetime"],
-                    y=hourly_df["total_input_tokens"],
-                    mode='lines+markers',
-                    name='Input 토큰',
-                    line=dict(color='blue')
-                ))
-                fig2.add_trace(go.Scatter(
-                    x=hourly_df["datetime"],
-                    y=hourly_df["total_output_tokens"],
-                    mode='lines+markers',
-                    name='Output 토큰',
-                    line=dict(color='red')
-                ))
-                fig2.update_layout(
-                    title="시간대별 토큰 사용량",
-                    xaxis_title="시간",
-                    yaxis_title="토큰 수",
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig2, use_container_width=True)
-            else:
-                st.warning("선택한 기간에 시간대별 사용 데이터가 없습니다.")
+        with st.spinner("Athena에서 데이터 분석 중..."):
+            for section, data in tracker.iter_dashboard_results(
+                start_date,
+                end_date,
+                arn_pattern if arn_pattern else None,
+                concurrent=concurrent,
+                use_cube=use_cube,
+            ):
+                logger.info(f"Rendering section: {section}")
+
+                with containers[section]:
+                    if section == "summary":
+                        _render_bedrock_summary(data)
+                    elif section == "user":
+                        # 사용자별 비용은 사용자 x 모델 결과로 계산하므로 준비될 때까지 보류
+                        if user_app_df is None:
+                            pending_user_df = data
+                        else:
+                            _render_bedrock_user_section(data, user_app_df, selected_region)
+                    elif section == "user_app":
+                        user_app_df = _render_bedrock_user_app_section(data, selected_region)
+                        if pending_user_df is not None:
+                            with containers["user"]:
+                                _render_bedrock_user_section(pending_user_df, user_app_df, selected_region)
+                            pending_user_df = None
+                    elif section == "model":
+                        # Athena 결과에 비용이 포함되지 않은 경우에만 계산
+                        if not data.empty and "estimated_cost_usd" not in data.columns:
+                            data = calculate_cost_for_dataframe(data, region=selected_region, logger=logger)
+                        _render_bedrock_model_section(data)
+                    elif section == "daily":
+                        _render_bedrock_daily_section(data)
+                    elif section == "hourly":
+                        _render_bedrock_hourly_section(data)
 
     else:
         # 초기 화면
@@ -1529,6 +337,247 @@ streamlit run bedrock_tracker.py
     logger.info("Bedrock Dashboard rendering complete")
 
 
+def _render_bedrock_summary(summary: Dict):
+    """전체 요약 섹션 렌더링 (총 비용은 요약 쿼리에서 함께 계산)"""
+    st.header("📊 전체 요약")
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("총 API 호출", f"{summary['total_calls']:,}")
+
+    with col2:
+        st.metric("총 Input 토큰", f"{summary['total_input_tokens']:,}")
+
+    with col3:
+        st.metric("총 Output 토큰", f"{summary['total_output_tokens']:,}")
+
+    with col4:
+        st.metric("총 비용", f"${summary['total_cost_usd']:.4f}")
+
+
+def _render_bedrock_user_section(
+    user_df: pd.DataFrame, user_app_df: Optional[pd.DataFrame], selected_region: str
+):
+    """사용자/애플리케이션별 분석 섹션 렌더링
+
+    비용은 사용자 x 모델 결과(user_app_df)의 모델별 비용을 사용자별로 합산합니다.
+    """
+    st.header("👥 사용자/애플리케이션별 분석")
+
+    if not user_df.empty:
+        # 실제 사용 모델 기준 비용 (리전별 가격 반영, 추가 쿼리 없음)
+        if "estimated_cost_usd" not in user_df.columns:
+            user_df = calculate_user_costs(user_df, user_app_df, region=selected_region, logger=logger)
+
+        st.dataframe(user_df, use_container_width=True)
+
+        # 비용 차트
+        if len(user_df) > 0:
+            fig = px.bar(
+                user_df.head(10),
+                x="user_or_app",
+                y="estimated_cost_usd",
+                title="상위 10명 사용자/애플리케이션별 비용",
+                labels={
+                    "user_or_app": "사용자/애플리케이션",
+                    "estimated_cost_usd": "비용 (USD)",
+                },
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("분석할 데이터가 없습니다.")
+
+
+def _render_bedrock_user_app_section(
+    user_app_df: pd.DataFrame, selected_region: str
+) -> pd.DataFrame:
+    """유저별 애플리케이션별 상세 분석 섹션 렌더링
+
+    Returns:
+        비용 컬럼이 추가된 DataFrame (사용자별 비용 계산에 재사용)
+    """
+    st.header("📱 유저별 애플리케이션별 상세 분석")
+
+    if not user_app_df.empty:
+        # 비용 계산 (리전별 가격 반영)
+        if "estimated_cost_usd" not in user_app_df.columns:
+            user_app_df = calculate_cost_for_dataframe(user_app_df, region=selected_region, logger=logger)
+
+        st.dataframe(user_app_df, use_container_width=True)
+    else:
+        st.info("분석할 데이터가 없습니다.")
+
+    return user_app_df
+
+
+def _render_bedrock_model_section(model_df: pd.DataFrame):
+    """모델별 사용 통계 섹션 렌더링 (비용 계산이 끝난 DataFrame)"""
+    st.header("🤖 모델별 사용 통계")
+
+    if not model_df.empty:
+        st.dataframe(model_df, use_container_width=True)
+
+        # 모델별 호출 비율 차트
+        if len(model_df) > 0:
+            fig = px.pie(
+                model_df,
+                values="call_count",
+                names="model_name",
+                title="모델별 호출 비율",
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+
+def _render_bedrock_daily_section(daily_df: pd.DataFrame):
+    """일별 사용 패턴 섹션 렌더링"""
+    st.header("📅 일별 사용 패턴")
+
+    if not daily_df.empty and len(daily_df) > 0:
+        # 날짜 컬럼 생성 (숫자를 문자열로 변환 후 zfill 적용)
+        daily_df["date"] = pd.to_datetime(
+            daily_df["year"].astype(str)
+            + "-"
+            + daily_df["month"].astype(str).str.zfill(2)
+            + "-"
+            + daily_df["day"].astype(str).str.zfill(2)
+        )
+
+        # 표시용 DataFrame 생성 (날짜를 문자열로 포맷)
+        display_df = daily_df.copy()
+        display_df["날짜"] = display_df["date"].dt.strftime("%Y-%m-%d")
+        display_df = display_df[["날짜", "call_count", "total_input_tokens", "total_output_tokens"]]
+        display_df.columns = ["날짜", "API 호출 수", "Input 토큰", "Output 토큰"]
+
+        # 1. 테이블 먼저 표시
+        st.dataframe(display_df, use_container_width=True)
+
+        # 2. 그래프 표시
+        # 일별 API 호출 패턴
+        fig = px.line(
+            daily_df,
+            x="date",
+            y="call_count",
+            title="일별 API 호출 패턴",
+            labels={"date": "날짜", "call_count": "API 호출 수"},
+            markers=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        # 일별 토큰 사용량
+        fig2 = go.Figure()
+        fig2.add_trace(go.Scatter(
+            x=daily_df["date"],
+            y=daily_df["total_input_tokens"],
+            mode='lines+markers',
+            name='Input 토큰',
+            line=dict(color='blue')
+        ))
+        fig2.add_trace(go.Scatter(
+            x=daily_df["date"],
+            y=daily_df["total_output_tokens"],
+            mode='lines+markers',
+            name='Output 토큰',
+            line=dict(color='red')
+        ))
+        fig2.update_layout(
+            title="일별 토큰 사용량",
+            xaxis_title="날짜",
+            yaxis_title="토큰 수",
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig2, use_container_width=True)
+
+        # 일별 비용 (Athena 쿼리에서 날짜별 가격으로 계산)
+        if "estimated_cost_usd" in daily_df.columns:
+            fig3 = px.bar(
+                daily_df,
+                x="date",
+                y="estimated_cost_usd",
+                title="일별 비용",
+                labels={"date": "날짜", "estimated_cost_usd": "비용 (USD)"},
+            )
+            st.plotly_chart(fig3, use_container_width=True)
+    else:
+        st.warning("선택한 기간에 일별 사용 데이터가 없습니다.")
+
+
+def _render_bedrock_hourly_section(hourly_df: pd.DataFrame):
+    """시간대별 사용 패턴 섹션 렌더링"""
+    st.header("⏰ 시간대별 사용 패턴")
+
+    if not hourly_df.empty and len(hourly_df) > 0:
+        # 시간 컬럼 생성 (숫자를 문자열로 변환 후 zfill 적용)
+        hourly_df["datetime"] = pd.to_datetime(
+            hourly_df["year"].astype(str)
+            + "-"
+            + hourly_df["month"].astype(str).str.zfill(2)
+            + "-"
+            + hourly_df["day"].astype(str).str.zfill(2)
+            + " "
+            + hourly_df["hour"].astype(str).str.zfill(2)
+            + ":00:00"
+        )
+
+        # 표시용 DataFrame 생성
+        display_df = hourly_df.copy()
+        display_df["시간"] = display_df["datetime"].dt.strftime("%Y-%m-%d %H:00")
+        display_df = display_df[["시간", "call_count", "total_input_tokens", "total_output_tokens"]]
+        display_df.columns = ["시간", "API 호출 수", "Input 토큰", "Output 토큰"]
+
+        # 1. 테이블 먼저 표시
+        st.dataframe(display_df, use_container_width=True)
+
+        # 2. 그래프 표시
+        # 시간대별 API 호출 패턴
+        fig = px.line(
+            hourly_df,
+            x="datetime",
+            y="call_count",
+            title="시간대별 API 호출 패턴",
+            labels={"datetime": "시간", "call_count": "API 호출 수"},
+            markers=True
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        # 시간대별 토큰 사용량
+        fig2 = go.Figure()
+        fig2.add_trace(go.Scatter(
+            x=hourly_df["datetime"],
+            y=hourly_df["total_input_tokens"],
+            mode='lines+markers',
+            name='Input 토큰',
+            line=dict(color='blue')
+        ))
+        fig2.add_trace(go.Scatter(
+            x=hourly_df["datetime"],
+            y=hourly_df["total_output_tokens"],
+            mode='lines+markers',
+            name='Output 토큰',
+            line=dict(color='red')
+        ))
+        fig2.update_layout(
+            title="시간대별 토큰 사용량",
+            xaxis_title="시간",
+            yaxis_title="토큰 수",
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig2, use_container_width=True)
+
+        # 시간대별 비용 (Athena 쿼리에서 날짜별 가격으로 계산)
+        if "estimated_cost_usd" in hourly_df.columns:
+            fig3 = px.bar(
+                hourly_df,
+                x="datetime",
+                y="estimated_cost_usd",
+                title="시간대별 비용",
+                labels={"datetime": "시간", "estimated_cost_usd": "비용 (USD)"},
+            )
+            st.plotly_chart(fig3, use_container_width=True)
+    else:
+        st.warning("선택한 기간에 시간대별 사용 데이터가 없습니다.")
+
+
 def render_qcli_analytics(selected_region, start_date, end_date):
     """Amazon Q CLI 분석 대시보드 렌더링"""
     logger.info("Rendering Amazon Q CLI Analytics")
@@ -1567,6 +616,89 @@ def render_qcli_analytics(selected_region, start_date, end_date):
             "CSV 리포트는 매일 자정(UTC)에 생성되며 S3 버킷에 저장됩니다."
         )
 
+    # 쿼리 실행 방식 및 결과 캐시 (Athena CSV 분석에만 적용)
+    concurrent = True
+    use_cache, refresh_cache = True, False
+    if data_source == "Athena CSV (추정)":
+        concurrent = st.sidebar.checkbox(
+            "⚡ 쿼리 동시 실행",
+            value=True,
+            key="qcli_concurrent",
+            help="모든 분석 쿼리를 한 번에 제출해 전체 대기 시간을 가장 느린 쿼리 수준으로 줄입니다.",
+        )
+        use_cache, refresh_cache = render_cache_options("qcli")
+    else:
+        s3_workers = st.sidebar.slider(
+            "📥 동시 다운로드 수",
+            min_value=1,
+            max_value=64,
+            value=DEFAULT_S3_WORKERS,
+            key="qcli_s3_workers",
+            help="S3 로그 파일을 동시에 다운로드/파싱할 스레드 수입니다.",
+        )
+        s3_processes = st.sidebar.number_input(
+            "🧮 토큰 계산 프로세스 수 (0 = 사용 안 함)",
+            min_value=0,
+            max_value=os.cpu_count() or 1,
+            value=0,
+            key="qcli_s3_processes",
+            help="긴 기간을 분석할 때 여러 CPU 코어에서 토큰을 계산합니다. 0이면 스레드만 사용합니다.",
+        )
+        s3_max_files = st.sidebar.number_input(
+            "🎯 최대 분석 파일 수 (0 = 전체)",
+            min_value=0,
+            value=0,
+            step=100,
+            key="qcli_s3_max_files",
+            help="0이면 모든 로그 파일을 분석합니다. 지정하면 균등 간격으로 샘플링하고 오차 범위와 함께 추정합니다.",
+        )
+        inventory_manifest = st.sidebar.text_input(
+            "📦 S3 Inventory manifest (선택)",
+            value="",
+            placeholder="s3://bucket/.../manifest.json",
+            key="qcli_inventory_manifest",
+            help="로그 버킷의 S3 Inventory(CSV/Parquet) manifest를 지정하면 S3 나열 대신 Inventory에서 파일 목록을 읽습니다.",
+        )
+        local_dir = st.sidebar.text_input(
+            "📁 로컬 미러 디렉토리 (선택)",
+            value="",
+            placeholder="/data/amazonq-developer-reports",
+            key="qcli_local_dir",
+            help="aws s3 sync로 내려받은 로그 버킷 디렉토리를 지정하면 S3 대신 로컬 파일을 분석합니다.",
+        )
+        limit_time = st.sidebar.checkbox(
+            "⏰ 시간 범위 제한 (UTC)",
+            value=False,
+            key="qcli_limit_time",
+            help="시작 날짜의 시작 시각부터 종료 날짜의 종료 시각 전까지의 레코드만 집계합니다 (로그 timeStamp 기준).",
+        )
+        start_time = st.sidebar.time_input(
+            "시작 시각 (UTC, 포함)",
+            value=time(0, 0),
+            key="qcli_start_time",
+            disabled=not limit_time,
+        )
+        end_time = st.sidebar.time_input(
+            "종료 시각 (UTC, 제외)",
+            value=time(23, 59),
+            key="qcli_end_time",
+            disabled=not limit_time,
+        )
+        st.sidebar.subheader("💾 처리한 로그 파일 재사용")
+        use_checkpoint = st.sidebar.checkbox(
+            "체크포인트 사용",
+            value=True,
+            key="qcli_use_checkpoint",
+            help="이미 분석한 로그 파일(S3 키 + ETag)의 집계를 로컬에 저장해 두고 새 파일만 다운로드합니다.",
+        )
+        refresh_checkpoint = st.sidebar.checkbox(
+            "체크포인트 새로고침",
+            value=False,
+            key="qcli_refresh_checkpoint",
+            disabled=not use_checkpoint,
+            help="저장된 집계를 무시하고 모든 로그 파일을 다시 분석한 뒤 체크포인트를 갱신합니다.",
+        )
+
     # 분석 실행
     if st.sidebar.button("🔍 데이터 분석", type="primary", key="qcli_analyze"):
         logger.info("QCli Analysis button clicked")
@@ -1582,19 +714,58 @@ def render_qcli_analytics(selected_region, start_date, end_date):
 
                 # S3 로그 분석기 초기화
                 try:
-                    s3_analyzer = QCliS3LogAnalyzer(region=selected_region, logger=logger)
+                    s3_analyzer = QCliS3LogAnalyzer(
+                        region=selected_region,
+                        logger=logger,
+                        max_workers=s3_workers,
+                        use_processes=s3_processes > 0,
+                        max_processes=int(s3_processes) or None,
+                        use_checkpoint=use_checkpoint,
+                        refresh_checkpoint=use_checkpoint and refresh_checkpoint,
+                        inventory_manifest=inventory_manifest.strip() or None,
+                        local_dir=local_dir.strip() or None,
+                    )
 
                     # 날짜를 datetime으로 변환
                     from datetime import datetime, timedelta
                     start_dt = datetime.combine(start_date, datetime.min.time())
                     end_dt = datetime.combine(end_date, datetime.max.time())
 
-                    # S3 로그 분석 실행
+                    # 레코드 timeStamp 범위 (시작 포함, 종료 제외)
+                    time_window = None
+                    if limit_time:
+                        time_window = (
+                            datetime.combine(start_date, start_time),
+                            datetime.combine(end_date, end_time),
+                        )
+                        st.info(
+                            f"⏰ 시간 범위 필터링 적용 (UTC): "
+                            f"{time_window[0]:%Y-%m-%d %H:%M} ~ {time_window[1]:%Y-%m-%d %H:%M}"
+                        )
+
+                    # S3 로그 분석 실행 (파일 처리 진행률 표시)
+                    progress_bar = st.progress(0.0, text="로그 파일 목록 조회 중...")
+
+                    def update_progress(done: int, total: Optional[int]):
+                        # 목록 나열이 끝나기 전에는 전체 파일 수를 모름
+                        if total is None:
+                            progress_bar.progress(
+                                0.0, text=f"로그 파일 분석 중... ({done:,}개 완료, 목록 조회 중)"
+                            )
+                        else:
+                            progress_bar.progress(
+                                done / total, text=f"로그 파일 분석 중... ({done:,}/{total:,})"
+                            )
+
                     stats = s3_analyzer.analyze_usage(
                         start_dt,
                         end_dt,
-                        user_pattern if user_pattern else None
+                        user_pattern if user_pattern else None,
+                        progress_callback=update_progress,
+                        max_files=int(s3_max_files) or None,
+                        time_window=time_window,
                     )
+                    progress_bar.empty()
 
                     # 결과 표시
                     st.header("📊 전체 요약")
@@ -1613,6 +784,29 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                     with col4:
                         st.metric("분석된 파일", f"{stats['total_log_files']:,}")
 
+                    if stats.get("checkpointed_files"):
+                        st.caption(
+                            f"💾 체크포인트 재사용: {stats['checkpointed_files']:,}개 파일 "
+                            f"(새로 분석한 파일만 S3에서 다운로드)"
+                        )
+
+                    sampling = stats.get("sampling")
+                    if sampling:
+                        margin = sampling["margin_of_error"]
+                        st.caption(
+                            f"🎯 샘플링 추정: {sampling['sampled_files']:,}/{sampling['total_files']:,} 파일 분석 "
+                            f"(x{sampling['scale_factor']:.2f}). {sampling['confidence']:.0%} 오차 범위 - "
+                            f"요청 수 ±{margin['total_requests']:,}, 총 토큰 ±{margin['total_tokens']:,}"
+                        )
+
+                    tokenization = stats.get("tokenization")
+                    if tokenization and tokenization["lookups"]:
+                        st.caption(
+                            f"⚡ 토큰 캐시 적중률 {tokenization['cache_hit_rate']:.1%} "
+                            f"({tokenization['cache_hits']:,}/{tokenization['lookups']:,}), "
+                            f"인코딩 처리량 {tokenization['tokens_per_second']:,.0f} tokens/s"
+                        )
+
                     # 토큰 사용량
                     st.header("🔢 실제 토큰 사용량")
 
@@ -1731,7 +925,6 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                         st.dataframe(date_df, use_container_width=True)
 
                         # 일별 토큰 사용량 차트
-                        import plotly.express as px
                         fig = px.line(
                             date_df,
                             x='날짜',
@@ -1781,23 +974,20 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                     )
 
                     # Claude Sonnet 3.5 가격 기준
-                    MODEL_PRICING = {
-                        "input": 0.003 / 1000,  # $0.003 per 1K tokens
-                        "output": 0.015 / 1000,  # $0.015 per 1K tokens
-                    }
+                    token_pricing = get_token_pricing()
 
                     virtual_cost = (
-                        stats['total_input_tokens'] * MODEL_PRICING['input'] +
-                        stats['total_output_tokens'] * MODEL_PRICING['output']
+                        stats['total_input_tokens'] * token_pricing['input'] +
+                        stats['total_output_tokens'] * token_pricing['output']
                     )
 
                     col_cost1, col_cost2, col_cost3 = st.columns(3)
 
                     with col_cost1:
-                        st.metric("Input 비용", f"${stats['total_input_tokens'] * MODEL_PRICING['input']:.2f}")
+                        st.metric("Input 비용", f"${stats['total_input_tokens'] * token_pricing['input']:.2f}")
 
                     with col_cost2:
-                        st.metric("Output 비용", f"${stats['total_output_tokens'] * MODEL_PRICING['output']:.2f}")
+                        st.metric("Output 비용", f"${stats['total_output_tokens'] * token_pricing['output']:.2f}")
 
                     with col_cost3:
                         st.metric("총 가상 비용", f"${virtual_cost:.2f}")
@@ -1836,12 +1026,27 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                     st.info(f"🔍 사용자 ID 패턴 필터링 적용: '{user_pattern}'")
 
                 # Tracker 초기화
-                tracker = QCliAthenaTracker(region=selected_region)
+                tracker = QCliAthenaTracker(
+                    region=selected_region,
+                    use_cache=use_cache,
+                    refresh_cache=refresh_cache,
+                    on_error=st.error,
+                    logger=logger,
+                )
 
-                # 전체 요약
-                summary = tracker.get_total_summary(
-                    start_date, end_date, user_pattern if user_pattern else None
+                # 요약/사용자별/기능별/일별 쿼리 실행 (동시 실행 시 완료되는 순서대로 수집)
+                results = dict(
+                    tracker.iter_report_results(
+                        start_date,
+                        end_date,
+                        user_pattern if user_pattern else None,
+                        concurrent=concurrent,
+                    )
                 )
+                summary = results["summary"]
+                user_df = results["user"]
+                feature_df = results["feature"]
+                daily_df = results["daily"]
 
                 # 조회 기간 일수 계산
                 days_in_period = (end_date - start_date).days + 1
@@ -1849,22 +1054,9 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                 # 리밋 체크
                 limit_check = tracker.check_official_limits(summary, days_in_period)
 
-                # 추세 분석
-                trends = tracker.analyze_usage_trends(start_date, end_date, user_pattern if user_pattern else None)
-
-                # 사용자별 분석
-                user_df = tracker.get_user_usage_analysis(
-                    start_date, end_date, user_pattern if user_pattern else None
-                )
-
-                # 기능별 사용 통계
-                feature_df = tracker.get_feature_usage_stats(
-                    start_date, end_date, user_pattern if user_pattern else None
-                )
-
-                # 일별 사용 패턴
-                daily_df = tracker.get_daily_usage_pattern(
-                    start_date, end_date, user_pattern if user_pattern else None
+                # 추세 분석 (일별 사용 패턴 재사용)
+                trends = tracker.analyze_usage_trends(
+                    start_date, end_date, user_pattern if user_pattern else None, daily_df=daily_df
                 )
 
                 # 토큰 추정
@@ -1994,17 +1186,11 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                 "- 사용량 파악: 대략적인 토큰 사용 규모 이해"
             )
 
-            # 평균 추정치만 계산
-            token_estimate = tracker.estimate_tokens(summary, "average")
-
             # 가상 비용 계산 (Claude Sonnet 3.5 가격 기준)
-            MODEL_PRICING = {
-                "input": 0.003 / 1000,  # $0.003 per 1K tokens
-                "output": 0.015 / 1000,  # $0.015 per 1K tokens
-            }
+            token_pricing = get_token_pricing()
             virtual_cost = (
-                token_estimate['estimated_input_tokens'] * MODEL_PRICING['input'] +
-                token_estimate['estimated_output_tokens'] * MODEL_PRICING['output']
+                token_estimate['estimated_input_tokens'] * token_pricing['input'] +
+                token_estimate['estimated_output_tokens'] * token_pricing['output']
             )
 
             # 추정치 표시
@@ -2046,33 +1232,11 @@ def render_qcli_analytics(selected_region, start_date, end_date):
             # 사용자별 분석
             st.header("👥 사용자별 분석")
 
-            user_df = tracker.get_user_usage_analysis(
-                start_date, end_date, user_pattern if user_pattern else None
-            )
-
             if not user_df.empty:
-                # 숫자 컬럼 변환
-                numeric_columns = [
-                    "total_chat_messages",
-                    "total_inline_suggestions",
-                    "total_inline_acceptances",
-                    "total_chat_code_lines",
-                    "total_inline_code_lines",
-                    "total_dev_events",
-                    "total_test_events",
-                    "total_doc_events",
-                    "active_days",
-                ]
-                for col in numeric_columns:
-                    if col in user_df.columns:
-                        user_df[col] = pd.to_numeric(user_df[col], errors="coerce").fillna(0)
-
                 st.dataframe(user_df, use_container_width=True)
 
                 # 사용자별 활동 차트
                 if len(user_df) > 0:
-                    import plotly.express as px
-
                     fig = px.bar(
                         user_df.head(10),
                         x="user_id",
@@ -2100,22 +1264,11 @@ def render_qcli_analytics(selected_region, start_date, end_date):
             # 기능별 사용 통계
             st.header("📱 기능별 사용 통계")
 
-            feature_df = tracker.get_feature_usage_stats(
-                start_date, end_date, user_pattern if user_pattern else None
-            )
-
             if not feature_df.empty:
-                # 숫자 컬럼 변환
-                for col in ["total_count", "unique_users"]:
-                    if col in feature_df.columns:
-                        feature_df[col] = pd.to_numeric(feature_df[col], errors="coerce").fillna(0)
-
                 st.dataframe(feature_df, use_container_width=True)
 
                 # 기능별 사용량 파이 차트
                 if len(feature_df) > 0:
-                    import plotly.express as px
-
                     fig = px.pie(
                         feature_df,
                         values="total_count",
@@ -2129,24 +1282,7 @@ def render_qcli_analytics(selected_region, start_date, end_date):
             # 일별 사용 패턴
             st.header("📅 일별 사용 패턴")
 
-            daily_df = tracker.get_daily_usage_pattern(
-                start_date, end_date, user_pattern if user_pattern else None
-            )
-
             if not daily_df.empty and len(daily_df) > 0:
-                # 숫자 컬럼 변환
-                numeric_columns = [
-                    "total_chat_messages",
-                    "total_inline_suggestions",
-                    "total_inline_acceptances",
-                    "total_chat_code_lines",
-                    "total_inline_code_lines",
-                    "unique_users",
-                ]
-                for col in numeric_columns:
-                    if col in daily_df.columns:
-                        daily_df[col] = pd.to_numeric(daily_df[col], errors="coerce").fillna(0)
-
                 # 날짜를 datetime으로 변환 (MM-DD-YYYY 형식)
                 daily_df["date"] = pd.to_datetime(daily_df["date_str"], format='%m-%d-%Y')
 
@@ -2162,9 +1298,6 @@ def render_qcli_analytics(selected_region, start_date, end_date):
                 st.dataframe(display_df, use_container_width=True)
 
                 # 2. 그래프 표시
-                import plotly.express as px
-                import plotly.graph_objects as go
-
                 # 일별 채팅 메시지 패턴
                 fig = px.line(
                     daily_df,
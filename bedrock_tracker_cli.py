@@ -4,19 +4,30 @@ CLI 버전의 Bedrock Usage Tracker - Athena 기반
 터미널에서 사용 가능한 다양한 분석 기능 제공
 """
 
-import boto3
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import argparse
-import time
-from typing import Dict
+from typing import Dict, List, Optional
 import logging
 from pathlib import Path
 import json
 import sys
 
-# S3 로그 분석기 임포트
-from qcli_s3_analyzer import QCliS3LogAnalyzer
+# 분석 코어 (트래커 / 가격 계산 / S3 로그 분석, UI 의존성 없음)
+from analytics_core import (
+    REGIONS,
+    BedrockAthenaTracker,
+    QCliAthenaTracker,
+    DEFAULT_S3_RETRIES,
+    DEFAULT_S3_WORKERS,
+    QCliS3LogAnalyzer,
+    calculate_cost_for_dataframe,
+    calculate_user_costs,
+    get_token_pricing,
+)
+
+# Athena 쿼리 대기 제한 시간 기본값
+from athena_utils import DEFAULT_QUERY_TIMEOUT
 
 # 로깅 설정
 def setup_logger():
@@ -47,953 +58,16 @@ def setup_logger():
 # 글로벌 로거
 logger = setup_logger()
 
-# AWS Bedrock 모델 가격 테이블 (리전별)
-# 참고: 최신 가격은 https://aws.amazon.com/bedrock/pricing/ 에서 확인하세요
-# 가격은 USD 기준이며, 1000 토큰당 가격입니다
-MODEL_PRICING = {
-    # 기본 가격 (대부분의 리전에 적용)
-    "default": {
-        # Claude 3 모델
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        # Claude 3.5 모델
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        # Claude 3.7 모델
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        # Claude 4 모델
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # US East (N. Virginia) - us-east-1
-    "us-east-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # US West (Oregon) - us-west-2
-    "us-west-2": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Europe (Frankfurt) - eu-central-1
-    "eu-central-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Tokyo) - ap-northeast-1
-    "ap-northeast-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Seoul) - ap-northeast-2
-    "ap-northeast-2": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-    # Asia Pacific (Singapore) - ap-southeast-1
-    "ap-southeast-1": {
-        "claude-3-haiku-20240307": {"input": 0.00025, "output": 0.00125},
-        "claude-3-sonnet-20240229": {"input": 0.003, "output": 0.015},
-        "claude-3-opus-20240229": {"input": 0.015, "output": 0.075},
-        "claude-3-5-haiku-20241022": {"input": 0.0008, "output": 0.004},
-        "claude-3-5-sonnet-20240620": {"input": 0.003, "output": 0.015},
-        "claude-3-5-sonnet-20241022": {"input": 0.003, "output": 0.015},
-        "claude-3-7-sonnet-20250219": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-20250514": {"input": 0.003, "output": 0.015},
-        "claude-sonnet-4-5-20250929": {"input": 0.003, "output": 0.015},
-        "claude-opus-4-20250514": {"input": 0.015, "output": 0.075},
-        "claude-opus-4-1-20250808": {"input": 0.015, "output": 0.075},
-    },
-}
-
-# 리전 설정
-REGIONS = {
-    "us-east-1": "US East (N. Virginia)",
-    "us-west-2": "US West (Oregon)",
-    "eu-central-1": "Europe (Frankfurt)",
-    "ap-northeast-1": "Asia Pacific (Tokyo)",
-    "ap-northeast-2": "Asia Pacific (Seoul)",
-    "ap-southeast-1": "Asia Pacific (Singapore)",
-}
-
-def get_model_cost(model_id: str, input_tokens: int, output_tokens: int, region: str = "default") -> float:
-    """모델별 비용 계산 (리전별 가격 반영)
-
-    Args:
-        model_id: Bedrock 모델 ID (예: us.anthropic.claude-3-haiku-20240307-v1:0)
-        input_tokens: 입력 토큰 수
-        output_tokens: 출력 토큰 수
-        region: AWS 리전 (예: us-east-1, ap-northeast-2)
-
-    Returns:
-        float: 계산된 비용 (USD)
-    """
-    logger.debug(
-        f"Calculating cost for model: {model_id}, input: {input_tokens}, output: {output_tokens}, region: {region}"
-    )
-
-    # 모델 ID에서 모델명 추출 (예: us.anthropic.claude-3-haiku-20240307-v1:0 -> claude-3-haiku-20240307)
-    model_name = model_id.split('.')[-1].split('-v')[0] if '.' in model_id else model_id
-
-    # 리전별 가격 테이블 선택 (해당 리전이 없으면 default 사용)
-    region_pricing = MODEL_PRICING.get(region, MODEL_PRICING["default"])
-
-    # 가격 테이블에서 모델 찾기
-    for key, pricing in region_pricing.items():
-        if key in model_name:
-            # 가격은 1000 토큰당 가격이므로 1000으로 나눔
-            cost = (input_tokens * pricing["input"] / 1000) + (
-                output_tokens * pricing["output"] / 1000
-            )
-            logger.debug(f"Model: {key}, Region: {region}, Cost: ${cost:.6f}")
-            return cost
-
-    # 기본 가격 (Claude 3 Haiku)
-    logger.warning(f"Unknown model: {model_id}, using default pricing (Claude 3 Haiku)")
-    default_pricing = MODEL_PRICING["default"]["claude-3-haiku-20240307"]
-    default_cost = (input_tokens * default_pricing["input"] / 1000) + (
-        output_tokens * default_pricing["output"] / 1000
-    )
-    return default_cost
-
-
-class BedrockAthenaTracker:
-    def __init__(self, region='us-east-1'):
-        logger.info(f"Initializing BedrockAthenaTracker with region: {region}")
-        self.region = region
-        self.athena = boto3.client('athena', region_name=region)
-        sts_client = boto3.client('sts', region_name=region)
-        self.account_id = sts_client.get_caller_identity()['Account']
-        # bedrock_tracker.py와 동일한 버킷명 사용
-        self.results_bucket = f'bedrock-analytics-{self.account_id}-{self.region}'
-        logger.info(f"Account ID: {self.account_id}, Results bucket: {self.results_bucket}")
-
-    def get_current_logging_config(self) -> Dict:
-        """현재 설정된 Model Invocation Logging 정보 조회"""
-        logger.info("Getting current logging configuration")
-        try:
-            bedrock = boto3.client('bedrock', region_name=self.region)
-            response = bedrock.get_model_invocation_logging_configuration()
-
-            if 'loggingConfig' in response:
-                config = response['loggingConfig']
-
-                if 's3Config' in config:
-                    result = {
-                        'type': 's3',
-                        'bucket': config['s3Config'].get('bucketName', ''),
-                        'prefix': config['s3Config'].get('keyPrefix', ''),
-                        'status': 'enabled'
-                    }
-                    logger.info(f"Logging config: {result}")
-                    return result
-
-            logger.warning("Logging is disabled")
-            return {'status': 'disabled'}
-
-        except Exception as e:
-            logger.error(f"Error getting logging config: {str(e)}")
-            return {'status': 'error', 'error': str(e)}
 
-    def execute_athena_query(self, query: str, database: str = 'bedrock_analytics') -> pd.DataFrame:
-        """Athena 쿼리 실행 및 결과 반환"""
-        logger.info(f"Executing Athena query on database: {database}")
-        logger.debug(f"Query: {query}")
-
-        try:
-            response = self.athena.start_query_execution(
-                QueryString=query,
-                QueryExecutionContext={'Database': database},
-                ResultConfiguration={
-                    'OutputLocation': f's3://{self.results_bucket}/query-results/'
-                }
-            )
-
-            query_id = response['QueryExecutionId']
-            logger.info(f"Query execution started: {query_id}")
-
-            max_wait = 60
-            for i in range(max_wait):
-                result = self.athena.get_query_execution(QueryExecutionId=query_id)
-                status = result['QueryExecution']['Status']['State']
-
-                if status == 'SUCCEEDED':
-                    logger.info(f"Query succeeded in {i+1} seconds")
-                    break
-                elif status in ['FAILED', 'CANCELLED']:
-                    error = result['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-                    logger.error(f"Query failed: {error}")
-                    raise Exception(f"Query failed: {error}")
-
-                time.sleep(1)
-            else:
-                logger.error("Query timeout")
-                raise Exception("Query timeout")
-
-            result_response = self.athena.get_query_results(QueryExecutionId=query_id)
-
-            columns = [col['Label'] for col in result_response['ResultSet']['ResultSetMetadata']['ColumnInfo']]
-            rows = []
-
-            for row in result_response['ResultSet']['Rows'][1:]:
-                row_data = [field.get('VarCharValue', '') for field in row['Data']]
-                rows.append(row_data)
-
-            df = pd.DataFrame(rows, columns=columns)
-            logger.info(f"Query returned {len(df)} rows")
-            return df
-
-        except Exception as e:
-            logger.error(f"Athena query execution failed: {str(e)}")
-            print(f"❌ Athena 쿼리 실행 실패: {str(e)}", file=sys.stderr)
-            return pd.DataFrame()
-
-    def get_total_summary(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> Dict:
-        """전체 요약 통계"""
-        logger.info(f"Getting total summary from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            COUNT(*) as total_calls,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        """
-
-        df = self.execute_athena_query(query)
-
-        if not df.empty:
-            result = {
-                'total_calls': int(df.iloc[0]['total_calls']) if df.iloc[0]['total_calls'] else 0,
-                'total_input_tokens': int(df.iloc[0]['total_input_tokens']) if df.iloc[0]['total_input_tokens'] else 0,
-                'total_output_tokens': int(df.iloc[0]['total_output_tokens']) if df.iloc[0]['total_output_tokens'] else 0,
-                'total_cost_usd': 0.0
-            }
-            logger.info(f"Total summary: {result}")
-            return result
-        else:
-            logger.warning("No data found for summary")
-            return {'total_calls': 0, 'total_input_tokens': 0, 'total_output_tokens': 0, 'total_cost_usd': 0.0}
-
-    def get_user_cost_analysis(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> pd.DataFrame:
-        """사용자별 비용 분석"""
-        logger.info(f"Getting user cost analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            CASE
-                WHEN identity.arn LIKE '%assumed-role%' THEN
-                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
-                WHEN identity.arn LIKE '%user%' THEN
-                    regexp_extract(identity.arn, 'user/([^/]+)')
-                ELSE 'Unknown'
-            END as user_or_app,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY identity.arn
-        ORDER BY call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_user_app_detail_analysis(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> pd.DataFrame:
-        """유저별 애플리케이션별 상세 분석"""
-        logger.info(f"Getting user-app detail analysis from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            CASE
-                WHEN identity.arn LIKE '%assumed-role%' THEN
-                    regexp_extract(identity.arn, 'assumed-role/([^/]+)')
-                WHEN identity.arn LIKE '%user%' THEN
-                    regexp_extract(identity.arn, 'user/([^/]+)')
-                ELSE 'Unknown'
-            END as user_or_app,
-            regexp_extract(modelId, '([^/]+)$') as model_name,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY identity.arn, modelId
-        ORDER BY user_or_app, call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_model_usage_stats(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> pd.DataFrame:
-        """모델별 사용 통계"""
-        logger.info(f"Getting model usage stats from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            regexp_extract(modelId, '([^/]+)$') as model_name,
-            COUNT(*) as call_count,
-            AVG(CAST(input.inputTokenCount AS DOUBLE)) as avg_input_tokens,
-            AVG(CAST(output.outputTokenCount AS DOUBLE)) as avg_output_tokens,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY modelId
-        ORDER BY call_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_daily_usage_pattern(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> pd.DataFrame:
-        """일별 사용 패턴"""
-        logger.info(f"Getting daily usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            year, month, day,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY year, month, day
-        ORDER BY year, month, day
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_hourly_usage_pattern(self, start_date: datetime, end_date: datetime, arn_pattern: str = None) -> pd.DataFrame:
-        """시간별 사용 패턴 - timestamp에서 hour 추출"""
-        logger.info(f"Getting hourly usage pattern from {start_date} to {end_date}, arn_pattern={arn_pattern}")
-
-        arn_filter = f"AND identity.arn LIKE '%{arn_pattern}%'" if arn_pattern else ""
-
-        query = f"""
-        SELECT
-            year,
-            month,
-            day,
-            date_format(from_iso8601_timestamp(timestamp), '%H') as hour,
-            COUNT(*) as call_count,
-            SUM(CAST(input.inputTokenCount AS BIGINT)) as total_input_tokens,
-            SUM(CAST(output.outputTokenCount AS BIGINT)) as total_output_tokens
-        FROM bedrock_invocation_logs
-        WHERE CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)
-            BETWEEN DATE '{start_date.strftime('%Y-%m-%d')}' AND DATE '{end_date.strftime('%Y-%m-%d')}'
-            {arn_filter}
-        GROUP BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
-        ORDER BY year, month, day, date_format(from_iso8601_timestamp(timestamp), '%H')
-        """
-
-        return self.execute_athena_query(query)
-
-
-# QCli 토큰 사용량 추정 상수
-# 기준: 영어 단어 1.4토큰, 4글자당 5토큰
-# 코드 1줄 평균 60-80문자 = 약 75-100토큰
-QCLI_TOKEN_ESTIMATION = {
-    "conservative": {  # 보수적 추정 (짧은 코드/간단한 질문)
-        "chat_message_input": 100,
-        "chat_message_output": 300,
-        "chat_code_line": 50,
-        "inline_suggestion": 40,
-        "inline_code_line": 50,
-        "dev_event_input": 400,
-        "dev_event_output": 600,
-        "test_event_input": 300,
-        "test_event_output": 500,
-        "doc_event_input": 200,
-        "doc_event_output": 400,
-    },
-    "average": {  # 평균 추정 (일반적인 사용) - 권장
-        "chat_message_input": 150,
-        "chat_message_output": 500,
-        "chat_code_line": 75,
-        "inline_suggestion": 60,
-        "inline_code_line": 75,
-        "dev_event_input": 600,
-        "dev_event_output": 1000,
-        "test_event_input": 450,
-        "test_event_output": 750,
-        "doc_event_input": 350,
-        "doc_event_output": 600,
-    },
-    "optimistic": {  # 낙관적 추정 (복잡한 코드/긴 대화)
-        "chat_message_input": 200,
-        "chat_message_output": 800,
-        "chat_code_line": 100,
-        "inline_suggestion": 80,
-        "inline_code_line": 100,
-        "dev_event_input": 1000,
-        "dev_event_output": 1500,
-        "test_event_input": 600,
-        "test_event_output": 1000,
-        "doc_event_input": 500,
-        "doc_event_output": 800,
-    }
-}
+def print_error(message: str):
+    """트래커 쿼리 실패 메시지 출력 (stderr)"""
+    print(f"❌ {message}", file=sys.stderr)
 
 
-class QCliAthenaTracker:
-    """Amazon Q CLI 사용량 추적을 위한 Athena 쿼리 클래스"""
-
-    def __init__(self, region='us-east-1'):
-        logger.info(f"Initializing QCliAthenaTracker with region: {region}")
-        self.region = region
-        self.athena = boto3.client("athena", region_name=region)
-        sts_client = boto3.client("sts", region_name=region)
-        self.account_id = sts_client.get_caller_identity()["Account"]
-        self.results_bucket = f"amazonq-developer-reports-{self.account_id}"
-        logger.info(
-            f"Account ID: {self.account_id}, Results bucket: {self.results_bucket}"
-        )
-
-    def execute_athena_query(
-        self, query: str, database: str = "qcli_analytics"
-    ) -> pd.DataFrame:
-        """Athena 쿼리 실행 및 결과 반환"""
-        logger.info(f"Executing Athena query on database: {database}")
-        logger.debug(f"Query: {query}")
-
-        try:
-            # 쿼리 실행
-            response = self.athena.start_query_execution(
-                QueryString=query,
-                QueryExecutionContext={"Database": database},
-                ResultConfiguration={
-                    "OutputLocation": f"s3://{self.results_bucket}/query-results/"
-                },
-            )
-
-            query_id = response["QueryExecutionId"]
-            logger.info(f"Query execution started: {query_id}")
-
-            # 쿼리 완료 대기
-            max_wait = 60
-            for i in range(max_wait):
-                result = self.athena.get_query_execution(QueryExecutionId=query_id)
-                status = result["QueryExecution"]["Status"]["State"]
-
-                if status == "SUCCEEDED":
-                    logger.info(f"Query succeeded in {i+1} seconds")
-                    break
-                elif status in ["FAILED", "CANCELLED"]:
-                    error = result["QueryExecution"]["Status"].get(
-                        "StateChangeReason", "Unknown error"
-                    )
-                    logger.error(f"Query failed: {error}")
-                    raise Exception(f"Query failed: {error}")
-
-                time.sleep(1)
-            else:
-                logger.error("Query timeout")
-                raise Exception("Query timeout")
-
-            # 결과 조회
-            result_response = self.athena.get_query_results(QueryExecutionId=query_id)
-
-            # DataFrame으로 변환
-            columns = [
-                col["Label"]
-                for col in result_response["ResultSet"]["ResultSetMetadata"][
-                    "ColumnInfo"
-                ]
-            ]
-            rows = []
-
-            for row in result_response["ResultSet"]["Rows"][1:]:  # 헤더 제외
-                row_data = [field.get("VarCharValue", "") for field in row["Data"]]
-                rows.append(row_data)
-
-            df = pd.DataFrame(rows, columns=columns)
-            logger.info(f"Query returned {len(df)} rows")
-            return df
-
-        except Exception as e:
-            logger.error(f"Athena query execution failed: {str(e)}")
-            print(f"❌ Athena 쿼리 실행 실패: {str(e)}", file=sys.stderr)
-            return pd.DataFrame()
-
-    def get_total_summary(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> Dict:
-        """전체 요약 통계 - Amazon Q Developer CSV 리포트 기반"""
-        logger.info(
-            f"Getting QCli total summary from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        # 실제 AWS CSV 메트릭 사용:
-        # - Chat_MessagesSent: 채팅 메시지 수
-        # - Inline_SuggestionsCount: 인라인 코드 제안 수
-        # - Chat_MessagesInteracted: 사용자 상호작용 메트릭
-        query = f"""
-        SELECT
-            COUNT(DISTINCT UserId) as unique_users,
-            COUNT(DISTINCT Date) as active_days,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_dev_events,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_test_events
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        """
-
-        df = self.execute_athena_query(query)
-
-        if not df.empty and df.iloc[0]["unique_users"]:
-            result = {
-                "unique_users": (
-                    int(df.iloc[0]["unique_users"])
-                    if df.iloc[0]["unique_users"]
-                    else 0
-                ),
-                "active_days": (
-                    int(df.iloc[0]["active_days"]) if df.iloc[0]["active_days"] else 0
-                ),
-                "total_chat_messages": (
-                    int(df.iloc[0]["total_chat_messages"])
-                    if df.iloc[0]["total_chat_messages"]
-                    else 0
-                ),
-                "total_inline_suggestions": (
-                    int(df.iloc[0]["total_inline_suggestions"])
-                    if df.iloc[0]["total_inline_suggestions"]
-                    else 0
-                ),
-                "total_inline_acceptances": (
-                    int(df.iloc[0]["total_inline_acceptances"])
-                    if df.iloc[0]["total_inline_acceptances"]
-                    else 0
-                ),
-                "total_chat_code_lines": (
-                    int(df.iloc[0]["total_chat_code_lines"])
-                    if df.iloc[0]["total_chat_code_lines"]
-                    else 0
-                ),
-                "total_inline_code_lines": (
-                    int(df.iloc[0]["total_inline_code_lines"])
-                    if df.iloc[0]["total_inline_code_lines"]
-                    else 0
-                ),
-                "total_dev_events": (
-                    int(df.iloc[0]["total_dev_events"])
-                    if df.iloc[0]["total_dev_events"]
-                    else 0
-                ),
-                "total_test_events": (
-                    int(df.iloc[0]["total_test_events"])
-                    if df.iloc[0]["total_test_events"]
-                    else 0
-                ),
-            }
-            logger.info(f"QCli total summary: {result}")
-            return result
-        else:
-            logger.warning("No data found for summary")
-            return {
-                "unique_users": 0,
-                "active_days": 0,
-                "total_chat_messages": 0,
-                "total_inline_suggestions": 0,
-                "total_inline_acceptances": 0,
-                "total_chat_code_lines": 0,
-                "total_inline_code_lines": 0,
-                "total_dev_events": 0,
-                "total_test_events": 0,
-            }
-
-    def get_user_usage_analysis(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """사용자별 사용량 분석"""
-        logger.info(
-            f"Getting QCli user usage analysis from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            UserId as user_id,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_dev_events,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_test_events,
-            SUM(CAST(DocGeneration_EventCount AS BIGINT)) as total_doc_events,
-            COUNT(DISTINCT Date) as active_days,
-            MIN(Date) as first_activity,
-            MAX(Date) as last_activity
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        GROUP BY UserId
-        ORDER BY total_chat_messages DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def get_daily_usage_pattern(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """일별 사용 패턴"""
-        logger.info(
-            f"Getting QCli daily usage pattern from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            Date as date_str,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_chat_messages,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_inline_suggestions,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_inline_acceptances,
-            SUM(CAST(Chat_AICodeLines AS BIGINT)) as total_chat_code_lines,
-            SUM(CAST(Inline_AICodeLines AS BIGINT)) as total_inline_code_lines,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        GROUP BY Date
-        ORDER BY Date
-        """
-
-        return self.execute_athena_query(query)
-
-
-    def get_feature_usage_stats(
-        self, start_date: datetime, end_date: datetime, user_pattern: str = None
-    ) -> pd.DataFrame:
-        """기능별 사용 통계 (Chat, Inline, Dev, Test, Doc 등)"""
-        logger.info(
-            f"Getting QCli feature usage stats from {start_date} to {end_date}, user_pattern={user_pattern}"
-        )
-
-        user_filter = f"AND UserId LIKE '%{user_pattern}%'" if user_pattern else ""
-
-        query = f"""
-        SELECT
-            'Chat Messages' as feature_type,
-            SUM(CAST(Chat_MessagesSent AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            'Inline Suggestions' as feature_type,
-            SUM(CAST(Inline_SuggestionsCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            'Inline Acceptances' as feature_type,
-            SUM(CAST(Inline_AcceptanceCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/dev Events' as feature_type,
-            SUM(CAST(Dev_GenerationEventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/test Events' as feature_type,
-            SUM(CAST(TestGeneration_EventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        UNION ALL
-        SELECT
-            '/doc Events' as feature_type,
-            SUM(CAST(DocGeneration_EventCount AS BIGINT)) as total_count,
-            COUNT(DISTINCT UserId) as unique_users
-        FROM qcli_user_activity_reports
-        WHERE parse_datetime(Date, 'MM-dd-yyyy') BETWEEN parse_datetime('{start_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            AND parse_datetime('{end_date.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')
-            {user_filter}
-        ORDER BY total_count DESC
-        """
-
-        return self.execute_athena_query(query)
-
-    def estimate_tokens(self, summary: Dict, estimation_type: str = "average") -> Dict:
-        """사용량 데이터로부터 토큰 사용량 추정
-
-        Args:
-            summary: get_total_summary()에서 반환된 요약 데이터
-            estimation_type: "conservative", "average", "optimistic" 중 선택
-
-        Returns:
-            Dict: 추정된 토큰 사용량 정보
-        """
-        logger.info(f"Estimating tokens with {estimation_type} model")
-
-        if estimation_type not in QCLI_TOKEN_ESTIMATION:
-            logger.warning(f"Unknown estimation type: {estimation_type}, using 'average'")
-            estimation_type = "average"
-
-        constants = QCLI_TOKEN_ESTIMATION[estimation_type]
-
-        # Input 토큰 추정
-        estimated_input_tokens = (
-            summary.get("total_chat_messages", 0) * constants["chat_message_input"] +
-            summary.get("total_inline_suggestions", 0) * constants["inline_suggestion"] +
-            summary.get("total_dev_events", 0) * constants["dev_event_input"] +
-            summary.get("total_test_events", 0) * constants["test_event_input"] +
-            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_input"]
-        )
-
-        # Output 토큰 추정
-        estimated_output_tokens = (
-            summary.get("total_chat_messages", 0) * constants["chat_message_output"] +
-            summary.get("total_chat_code_lines", 0) * constants["chat_code_line"] +
-            summary.get("total_inline_code_lines", 0) * constants["inline_code_line"] +
-            summary.get("total_inline_acceptances", 0) * constants["inline_suggestion"] +
-            summary.get("total_dev_events", 0) * constants["dev_event_output"] +
-            summary.get("total_test_events", 0) * constants["test_event_output"] +
-            (summary.get("total_doc_events", 0) if "total_doc_events" in summary else 0) * constants["doc_event_output"]
-        )
-
-        total_tokens = estimated_input_tokens + estimated_output_tokens
-
-        result = {
-            "estimation_type": estimation_type,
-            "estimated_input_tokens": int(estimated_input_tokens),
-            "estimated_output_tokens": int(estimated_output_tokens),
-            "estimated_total_tokens": int(total_tokens),
-        }
-
-        logger.info(f"Token estimation result: {result}")
-        return result
-
-    def check_official_limits(self, summary: Dict, days_in_period: int) -> Dict:
-        """공식 리밋 체크 및 경고 생성
-
-        Args:
-            summary: get_total_summary()에서 반환된 요약 데이터
-            days_in_period: 조회 기간의 일수
-
-        Returns:
-            Dict: 리밋 체크 결과 및 경고
-        """
-        logger.info("Checking official limits")
-
-        # 공식 문서화된 리밋
-        OFFICIAL_LIMITS = {
-            "dev_events": 30,  # /dev 명령어: 30회/월
-            "transformation_lines": 4000,  # Code Transformation: 4,000줄/월
-            # 채팅/인라인: AWS가 공개하지 않음
-        }
-
-        # 월간 사용량 추정 (현재 기간을 30일로 환산)
-        monthly_factor = 30 / days_in_period if days_in_period > 0 else 1
-
-        dev_events_used = summary.get("total_dev_events", 0)
-        dev_events_projected = int(dev_events_used * monthly_factor)
-
-        # Transformation 데이터는 summary에 없을 수 있음 (추후 추가 가능)
-        transformation_lines_used = summary.get("total_transformation_lines", 0)
-        transformation_lines_projected = int(transformation_lines_used * monthly_factor)
-
-        result = {
-            "dev_events": {
-                "used": dev_events_used,
-                "limit": OFFICIAL_LIMITS["dev_events"],
-                "projected_monthly": dev_events_projected,
-                "percentage": (dev_events_projected / OFFICIAL_LIMITS["dev_events"] * 100) if OFFICIAL_LIMITS["dev_events"] > 0 else 0,
-                "warning": dev_events_projected >= OFFICIAL_LIMITS["dev_events"] * 0.8
-            },
-            "transformation_lines": {
-                "used": transformation_lines_used,
-                "limit": OFFICIAL_LIMITS["transformation_lines"],
-                "projected_monthly": transformation_lines_projected,
-                "percentage": (transformation_lines_projected / OFFICIAL_LIMITS["transformation_lines"] * 100) if OFFICIAL_LIMITS["transformation_lines"] > 0 else 0,
-                "warning": transformation_lines_projected >= OFFICIAL_LIMITS["transformation_lines"] * 0.8
-            }
-        }
-
-        logger.info(f"Limit check result: {result}")
-        return result
-
-    def analyze_usage_trends(self, start_date: datetime, end_date: datetime, user_pattern: str = None) -> Dict:
-        """사용량 추세 분석 및 이상 감지
-
-        Args:
-            start_date: 시작 날짜
-            end_date: 종료 날짜
-            user_pattern: 사용자 필터 패턴
-
-        Returns:
-            Dict: 추세 분석 결과
-        """
-        logger.info(f"Analyzing usage trends from {start_date} to {end_date}")
-
-        # 일별 사용 패턴 조회
-        daily_df = self.get_daily_usage_pattern(start_date, end_date, user_pattern)
-
-        if daily_df.empty:
-            return {
-                "daily_avg": 0,
-                "daily_max": 0,
-                "daily_min": 0,
-                "anomaly_detected": False
-            }
-
-        # 숫자 변환
-        for col in ["total_chat_messages", "total_inline_suggestions"]:
-            if col in daily_df.columns:
-                daily_df[col] = pd.to_numeric(daily_df[col], errors='coerce').fillna(0)
-
-        # 일일 총 활동 계산
-        daily_df["total_activity"] = (
-            daily_df.get("total_chat_messages", 0) +
-            daily_df.get("total_inline_suggestions", 0)
-        )
-
-        daily_avg = daily_df["total_activity"].mean()
-        daily_max = daily_df["total_activity"].max()
-        daily_min = daily_df["total_activity"].min()
-
-        # 이상 감지: 일평균의 3배 초과하는 날이 있는지
-        anomaly_threshold = daily_avg * 3
-        anomaly_days = daily_df[daily_df["total_activity"] > anomaly_threshold]
-
-        result = {
-            "daily_avg": float(daily_avg),
-            "daily_max": float(daily_max),
-            "daily_min": float(daily_min),
-            "anomaly_detected": len(anomaly_days) > 0,
-            "anomaly_count": len(anomaly_days),
-            "anomaly_threshold": float(anomaly_threshold)
-        }
-
-        logger.info(f"Trend analysis result: {result}")
-        return result
-
-
-def calculate_cost_for_dataframe(df: pd.DataFrame, model_col: str = 'model_name', region: str = "default") -> pd.DataFrame:
-    """DataFrame에 비용 컬럼 추가 (리전별 가격 반영)
-
-    Args:
-        df: 비용을 계산할 DataFrame
-        model_col: 모델명이 있는 컬럼명
-        region: AWS 리전 (예: us-east-1, ap-northeast-2)
-
-    Returns:
-        pd.DataFrame: 비용 컬럼이 추가된 DataFrame
-    """
-    logger.info(f"Calculating cost for DataFrame with {len(df)} rows, region: {region}")
-
-    if df.empty:
-        return df
-
-    costs = []
-    for _, row in df.iterrows():
-        model = row.get(model_col, '')
-        input_tokens = int(row.get('total_input_tokens', 0)) if row.get('total_input_tokens') else 0
-        output_tokens = int(row.get('total_output_tokens', 0)) if row.get('total_output_tokens') else 0
-        cost = get_model_cost(model, input_tokens, output_tokens, region)
-        costs.append(cost)
-
-    df['estimated_cost_usd'] = costs
-    logger.info(f"Total cost calculated for region {region}: ${sum(costs):.4f}")
-    return df
+def print_progress(done: int, total: Optional[int]):
+    """S3 로그 파일 처리 진행률 출력 (stderr, 같은 줄 갱신, 목록 조회 중이면 전체 수는 ?)"""
+    total_text = f"{total:,}" if total is not None else "?"
+    print(f"\r   📥 로그 파일 분석 중... {done:,}/{total_text}", end='', file=sys.stderr, flush=True)
 
 
 def print_summary(summary: Dict):
@@ -1084,13 +158,10 @@ def print_qcli_summary(summary: Dict, token_estimates: Dict, limit_check: Dict =
     print(f"  총 토큰:          {token_avg['estimated_total_tokens']:>15,}")
 
     # 가상 비용 계산 (Claude Sonnet 3.5 가격 기준)
-    MODEL_PRICING = {
-        "input": 0.003 / 1000,
-        "output": 0.015 / 1000,
-    }
+    token_pricing = get_token_pricing()
     virtual_cost = (
-        token_avg['estimated_input_tokens'] * MODEL_PRICING['input'] +
-        token_avg['estimated_output_tokens'] * MODEL_PRICING['output']
+        token_avg['estimated_input_tokens'] * token_pricing['input'] +
+        token_avg['estimated_output_tokens'] * token_pricing['output']
     )
     print(f"  가상 비용:        ${virtual_cost:>14.2f}")
     print()
@@ -1177,6 +248,22 @@ def print_s3_log_summary(stats: Dict):
     print("\n📋 기본 통계:")
     print(f"  분석 기간:        {stats['period']['days']}일")
     print(f"  총 로그 파일:     {stats['total_log_files']:>15,}")
+    if stats.get('checkpointed_files'):
+        print(f"    체크포인트 재사용: {stats['checkpointed_files']:>12,}")
+    sampling = stats.get('sampling')
+    if sampling:
+        margin = sampling['margin_of_error']
+        print(f"  분석 방식:        샘플링 {sampling['sampled_files']:,}/{sampling['total_files']:,} 파일 "
+              f"(x{sampling['scale_factor']:.2f}, {sampling['confidence']:.0%} 오차 범위)")
+        print(f"    요청 수:        ±{margin['total_requests']:,}")
+        print(f"    총 토큰:        ±{margin['total_tokens']:,}")
+    else:
+        print(f"  분석 방식:        전체 파일")
+    tokenization = stats.get('tokenization')
+    if tokenization and tokenization['lookups']:
+        print(f"  토큰 캐시 적중률: {tokenization['cache_hit_rate']:>15.1%} "
+              f"({tokenization['cache_hits']:,}/{tokenization['lookups']:,}, "
+              f"{tokenization['tokens_per_second']:,.0f} tokens/s)")
     print(f"  총 요청 수:       {stats['total_requests']:>15,}")
     print(f"  Chat 요청:        {stats['by_type']['chat']['count']:>15,} ({stats['by_type']['chat']['count']/stats['total_requests']*100 if stats['total_requests'] > 0 else 0:.1f}%)")
     print(f"  Inline 제안:      {stats['by_type']['inline']['count']:>15,} ({stats['by_type']['inline']['count']/stats['total_requests']*100 if stats['total_requests'] > 0 else 0:.1f}%)")
@@ -1237,18 +324,15 @@ def print_s3_log_summary(stats: Dict):
     print("   💡 Amazon Q Developer Pro는 $19/월 정액제입니다.")
     print("      아래 비용은 Claude API를 직접 사용했을 경우 가정입니다.\n")
 
-    MODEL_PRICING = {
-        "input": 0.003 / 1000,
-        "output": 0.015 / 1000,
-    }
+    token_pricing = get_token_pricing()
 
     virtual_cost = (
-        stats['total_input_tokens'] * MODEL_PRICING['input'] +
-        stats['total_output_tokens'] * MODEL_PRICING['output']
+        stats['total_input_tokens'] * token_pricing['input'] +
+        stats['total_output_tokens'] * token_pricing['output']
     )
 
-    print(f"  Input 비용:       ${stats['total_input_tokens'] * MODEL_PRICING['input']:>14.2f}")
-    print(f"  Output 비용:      ${stats['total_output_tokens'] * MODEL_PRICING['output']:>14.2f}")
+    print(f"  Input 비용:       ${stats['total_input_tokens'] * token_pricing['input']:>14.2f}")
+    print(f"  Output 비용:      ${stats['total_output_tokens'] * token_pricing['output']:>14.2f}")
     print(f"  총 가상 비용:     ${virtual_cost:>14.2f}")
 
     # ROI 비교
@@ -1318,6 +402,37 @@ def main():
                        choices=['s3', 'athena'],
                        default='s3',
                        help='QCli 데이터 소스 (s3: 실제 토큰, athena: 추정, 기본값: s3)')
+    parser.add_argument('--query-timeout', type=float, default=DEFAULT_QUERY_TIMEOUT,
+                       help=f'Athena 쿼리 대기 마감 시간 (초, 기본값: {DEFAULT_QUERY_TIMEOUT})')
+    parser.add_argument('--concurrent', action='store_true',
+                       help='Athena 쿼리를 한 번에 제출하고 함께 대기 (총 대기 시간 ≈ 가장 느린 쿼리, '
+                            'Bedrock은 --no-cube와 함께 사용)')
+    parser.add_argument('--no-cube', action='store_true',
+                       help='Bedrock 분석을 사용량 큐브 단일 스캔 대신 분석별 개별 쿼리로 실행')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='쿼리 결과 캐시와 S3 로그 처리 체크포인트를 사용하지 않음')
+    parser.add_argument('--refresh', action='store_true',
+                       help='캐시된 결과(체크포인트 포함)를 무시하고 다시 조회한 뒤 갱신')
+    parser.add_argument('--s3-workers', type=int, default=DEFAULT_S3_WORKERS,
+                       help=f'S3 로그 파일 동시 다운로드/파싱 스레드 수 (기본값: {DEFAULT_S3_WORKERS})')
+    parser.add_argument('--s3-processes', type=int, default=0,
+                       help='S3 로그 토큰 계산을 N개 프로세스로 병렬 실행 (긴 기간 분석용, 기본값: 0 = 스레드만 사용)')
+    parser.add_argument('--s3-retries', type=int, default=DEFAULT_S3_RETRIES,
+                       help=f'S3 로그 파일 다운로드 재시도 횟수 (기본값: {DEFAULT_S3_RETRIES})')
+    parser.add_argument('--s3-max-files', type=int, default=None,
+                       help='S3 로그 파일을 최대 N개만 샘플링해 분석하고 오차 범위와 함께 추정 (기본값: 전체 파일)')
+    parser.add_argument('--s3-local-dir', type=str, default=None,
+                       help='S3 로그 버킷을 내려받은 로컬 디렉토리 (aws s3 sync 결과, 지정하면 S3 대신 로컬 파일 분석)')
+    parser.add_argument('--s3-user-ids', type=str, default=None,
+                       help='S3 로그 분석 시 정확히 일치하는 사용자 ID만 집계 (쉼표로 구분)')
+    parser.add_argument('--s3-start-time', type=parse_utc_time, default=None,
+                       help='S3 로그 분석 시 이 시각 이후(포함) 레코드만 집계 (UTC, 예: 2024-10-01T09:00, '
+                            '분석 기간을 지정하지 않으면 이 날짜부터 분석)')
+    parser.add_argument('--s3-end-time', type=parse_utc_time, default=None,
+                       help='S3 로그 분석 시 이 시각 이전(제외) 레코드만 집계 (UTC, 예: 2024-10-01T18:00, '
+                            '분석 기간을 지정하지 않으면 이 날짜까지 분석)')
+    parser.add_argument('--s3-inventory-manifest', type=str, default=None,
+                       help='로그 버킷의 S3 Inventory manifest.json URI (지정하면 S3 나열 대신 Inventory에서 파일 목록 조회)')
 
     args = parser.parse_args()
 
@@ -1332,6 +447,10 @@ def main():
     if args.start_date and args.end_date:
         start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
         end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+    elif args.service == 'qcli' and (args.s3_start_time or args.s3_end_time):
+        # 시간 범위만 지정하면 그 범위를 포함하는 날짜의 로그만 나열
+        end_date = args.s3_end_time or datetime.now()
+        start_date = args.s3_start_time or end_date - timedelta(days=args.days)
     else:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=args.days)
@@ -1350,6 +469,8 @@ def main():
         user_pattern = args.user_pattern if args.user_pattern else None
         if user_pattern:
             print(f"🔍 사용자 ID 패턴 필터: '{user_pattern}'")
+        if args.s3_start_time or args.s3_end_time:
+            print(f"⏰ 시간 범위 필터 (UTC): {args.s3_start_time or '-'} ~ {args.s3_end_time or '-'}")
     print()
 
     # 서비스별 분기 처리
@@ -1367,7 +488,9 @@ def main():
 def analyze_bedrock(args, start_date: datetime, end_date: datetime, arn_pattern: str = None):
     """Bedrock 분석 실행"""
     # Tracker 초기화
-    tracker = BedrockAthenaTracker(region=args.region)
+    tracker = BedrockAthenaTracker(region=args.region, query_timeout=args.query_timeout,
+                                   use_cache=not args.no_cache, refresh_cache=args.refresh,
+                                   on_error=print_error, logger=logger)
 
     # 로깅 설정 확인
     print("🔍 Model Invocation Logging 설정 확인 중...")
@@ -1389,67 +512,57 @@ def analyze_bedrock(args, start_date: datetime, end_date: datetime, arn_pattern:
     print()
     print("📊 데이터 분석 중...\n")
 
-    # 데이터 수집
+    # 데이터 수집 (기본: 사용량 큐브 단일 스캔, --no-cube --concurrent면 개별 쿼리를 동시에 제출)
+    analysis_sections = {
+        'summary': 'summary', 'user': 'user', 'user-app': 'user_app',
+        'model': 'model', 'daily': 'daily', 'hourly': 'hourly'
+    }
+    sections = [s for a, s in analysis_sections.items() if args.analysis in ['all', a]]
+    if 'user' in sections and 'user_app' not in sections:
+        # 사용자별 비용은 사용자 x 모델 결과로 계산
+        sections.append('user_app')
+    if args.concurrent and not args.no_cube and len(sections) > 1:
+        print("⚠️ 사용량 큐브는 쿼리 하나로 실행되므로 --concurrent는 --no-cube와 함께 사용할 때만 적용됩니다.")
+        logger.warning("--concurrent has no effect without --no-cube")
+    fetched = dict(tracker.iter_dashboard_results(start_date, end_date, arn_pattern,
+                                                  sections=sections, concurrent=args.concurrent,
+                                                  use_cube=not args.no_cube))
+
     results = {}
 
     if args.analysis in ['all', 'summary']:
-        summary = tracker.get_total_summary(start_date, end_date, arn_pattern)
+        summary = fetched['summary']
         results['summary'] = summary
 
     if args.analysis in ['all', 'user']:
-        user_df = tracker.get_user_cost_analysis(start_date, end_date, arn_pattern)
-        if not user_df.empty:
-            # 숫자 변환 및 비용 계산
-            for col in ['call_count', 'total_input_tokens', 'total_output_tokens']:
-                if col in user_df.columns:
-                    user_df[col] = pd.to_numeric(user_df[col], errors='coerce').fillna(0)
-            # 리전별 가격으로 비용 계산 (사용자별 분석은 모델 정보가 없으므로 기본 Haiku 가격 사용)
-            costs = []
-            for _, row in user_df.iterrows():
-                input_tokens = int(row.get('total_input_tokens', 0)) if row.get('total_input_tokens') else 0
-                output_tokens = int(row.get('total_output_tokens', 0)) if row.get('total_output_tokens') else 0
-                # Claude 3 Haiku를 기본 모델로 사용
-                cost = get_model_cost('claude-3-haiku-20240307', input_tokens, output_tokens, args.region)
-                costs.append(cost)
-            user_df['estimated_cost_usd'] = costs
+        user_df = fetched['user']
+        if not user_df.empty and 'estimated_cost_usd' not in user_df.columns:
+            # 리전별 가격으로 비용 계산 (사용자 x 모델 결과의 모델별 비용을 사용자별로 합산)
+            user_app_df = fetched['user_app']
+            if not user_app_df.empty and 'estimated_cost_usd' not in user_app_df.columns:
+                user_app_df = calculate_cost_for_dataframe(user_app_df, region=args.region, logger=logger)
+            user_df = calculate_user_costs(user_df, user_app_df, region=args.region, logger=logger)
         results['user'] = user_df
 
     if args.analysis in ['all', 'user-app']:
-        user_app_df = tracker.get_user_app_detail_analysis(start_date, end_date, arn_pattern)
-        if not user_app_df.empty:
-            for col in ['call_count', 'total_input_tokens', 'total_output_tokens']:
-                if col in user_app_df.columns:
-                    user_app_df[col] = pd.to_numeric(user_app_df[col], errors='coerce').fillna(0)
-            user_app_df = calculate_cost_for_dataframe(user_app_df, region=args.region)
+        user_app_df = fetched['user_app']
+        if not user_app_df.empty and 'estimated_cost_usd' not in user_app_df.columns:
+            user_app_df = calculate_cost_for_dataframe(user_app_df, region=args.region, logger=logger)
         results['user_app'] = user_app_df
 
     if args.analysis in ['all', 'model']:
-        model_df = tracker.get_model_usage_stats(start_date, end_date, arn_pattern)
-        if not model_df.empty:
-            for col in ['call_count', 'avg_input_tokens', 'avg_output_tokens',
-                       'total_input_tokens', 'total_output_tokens']:
-                if col in model_df.columns:
-                    model_df[col] = pd.to_numeric(model_df[col], errors='coerce').fillna(0)
-            model_df = calculate_cost_for_dataframe(model_df, region=args.region)
-            # 총 비용 업데이트
-            if 'summary' in results:
-                results['summary']['total_cost_usd'] = model_df['estimated_cost_usd'].sum()
+        model_df = fetched['model']
+        # Athena 결과에 비용이 포함되지 않은 경우에만 계산
+        if not model_df.empty and 'estimated_cost_usd' not in model_df.columns:
+            model_df = calculate_cost_for_dataframe(model_df, region=args.region, logger=logger)
         results['model'] = model_df
 
     if args.analysis in ['all', 'daily']:
-        daily_df = tracker.get_daily_usage_pattern(start_date, end_date, arn_pattern)
-        if not daily_df.empty:
-            for col in ['call_count', 'total_input_tokens', 'total_output_tokens']:
-                if col in daily_df.columns:
-                    daily_df[col] = pd.to_numeric(daily_df[col], errors='coerce').fillna(0)
+        daily_df = fetched['daily']
         results['daily'] = daily_df
 
     if args.analysis in ['all', 'hourly']:
-        hourly_df = tracker.get_hourly_usage_pattern(start_date, end_date, arn_pattern)
-        if not hourly_df.empty:
-            for col in ['call_count', 'total_input_tokens', 'total_output_tokens']:
-                if col in hourly_df.columns:
-                    hourly_df[col] = pd.to_numeric(hourly_df[col], errors='coerce').fillna(0)
+        hourly_df = fetched['hourly']
         results['hourly'] = hourly_df
 
     # 출력 형식에 따라 결과 출력
@@ -1501,6 +614,27 @@ def analyze_bedrock(args, start_date: datetime, end_date: datetime, arn_pattern:
         save_to_json(json_data, filename)
 
 
+def parse_user_ids(value: Optional[str]) -> Optional[List[str]]:
+    """쉼표로 구분한 사용자 ID 목록 (지정하지 않으면 None)"""
+    if not value:
+        return None
+    return [user_id.strip() for user_id in value.split(',') if user_id.strip()]
+
+
+def parse_utc_time(value: str) -> datetime:
+    """ISO 8601 시각 (예: 2024-10-01T09:00, 2024-10-01 09:00:00Z) -> UTC 기준 datetime (시간대 정보 없음)
+
+    시간대가 없으면 UTC로 간주하고, 있으면 UTC로 변환합니다.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"잘못된 시각 형식: {value} (예: 2024-10-01T09:00)")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
 def analyze_qcli(args, start_date: datetime, end_date: datetime, user_pattern: str = None):
     """QCli 분석 실행"""
     print("📊 Amazon Q CLI 데이터 분석 중...\n")
@@ -1509,10 +643,21 @@ def analyze_qcli(args, start_date: datetime, end_date: datetime, user_pattern: s
     if args.data_source == 's3':
         # S3 로그 분석
         try:
-            s3_analyzer = QCliS3LogAnalyzer(region=args.region, logger=logger)
-
-            # S3 로그 분석 실행
-            stats = s3_analyzer.analyze_usage(start_date, end_date, user_pattern)
+            s3_analyzer = QCliS3LogAnalyzer(region=args.region, logger=logger,
+                                            max_workers=args.s3_workers, max_retries=args.s3_retries,
+                                            use_processes=args.s3_processes > 0,
+                                            max_processes=args.s3_processes or None,
+                                            use_checkpoint=not args.no_cache, refresh_checkpoint=args.refresh,
+                                            inventory_manifest=args.s3_inventory_manifest,
+                                            local_dir=args.s3_local_dir)
+
+            # S3 로그 분석 실행 (진행률은 stderr에 한 줄로 갱신)
+            stats = s3_analyzer.analyze_usage(start_date, end_date, user_pattern,
+                                              progress_callback=print_progress,
+                                              max_files=args.s3_max_files,
+                                              user_ids=parse_user_ids(args.s3_user_ids),
+                                              time_window=(args.s3_start_time, args.s3_end_time))
+            print(file=sys.stderr)
 
             # 결과 출력
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -1560,13 +705,22 @@ def analyze_qcli(args, start_date: datetime, end_date: datetime, user_pattern: s
 
     else:
         # 기존 Athena CSV 분석
-        tracker = QCliAthenaTracker(region=args.region)
+        tracker = QCliAthenaTracker(region=args.region, query_timeout=args.query_timeout,
+                                    use_cache=not args.no_cache, refresh_cache=args.refresh,
+                                    on_error=print_error, logger=logger)
+
+        # 데이터 수집 (--concurrent면 모든 쿼리를 동시에 제출)
+        sections = [s for s in tracker.REPORT_SECTIONS if args.analysis in ['all', s]]
+        if 'summary' in sections and 'daily' not in sections:
+            # 추세 분석에 일별 사용 패턴이 필요
+            sections.append('daily')
+        fetched = dict(tracker.iter_report_results(start_date, end_date, user_pattern,
+                                                   sections=sections, concurrent=args.concurrent))
 
-        # 데이터 수집
         results = {}
 
         if args.analysis in ['all', 'summary']:
-            summary = tracker.get_total_summary(start_date, end_date, user_pattern)
+            summary = fetched['summary']
             results['summary'] = summary
 
             # 토큰 추정
@@ -1583,49 +737,19 @@ def analyze_qcli(args, start_date: datetime, end_date: datetime, user_pattern: s
             # 리밋 체크 및 추세 분석 추가
             days_in_period = (end_date - start_date).days + 1
             results['limit_check'] = tracker.check_official_limits(summary, days_in_period)
-            results['trends'] = tracker.analyze_usage_trends(start_date, end_date, user_pattern)
+            results['trends'] = tracker.analyze_usage_trends(start_date, end_date, user_pattern,
+                                                             daily_df=fetched['daily'])
 
         if args.analysis in ['all', 'user']:
-            user_df = tracker.get_user_usage_analysis(start_date, end_date, user_pattern)
-            if not user_df.empty:
-                numeric_columns = [
-                    "total_chat_messages",
-                    "total_inline_suggestions",
-                    "total_inline_acceptances",
-                    "total_chat_code_lines",
-                    "total_inline_code_lines",
-                    "total_dev_events",
-                    "total_test_events",
-                    "total_doc_events",
-                    "active_days",
-                ]
-                for col in numeric_columns:
-                    if col in user_df.columns:
-                        user_df[col] = pd.to_numeric(user_df[col], errors='coerce').fillna(0)
+            user_df = fetched['user']
             results['user'] = user_df
 
         if args.analysis in ['all', 'feature']:
-            feature_df = tracker.get_feature_usage_stats(start_date, end_date, user_pattern)
-            if not feature_df.empty:
-                for col in ["total_count", "unique_users"]:
-                    if col in feature_df.columns:
-                        feature_df[col] = pd.to_numeric(feature_df[col], errors='coerce').fillna(0)
+            feature_df = fetched['feature']
             results['feature'] = feature_df
 
         if args.analysis in ['all', 'daily']:
-            daily_df = tracker.get_daily_usage_pattern(start_date, end_date, user_pattern)
-            if not daily_df.empty:
-                numeric_columns = [
-                    "total_chat_messages",
-                    "total_inline_suggestions",
-                    "total_inline_acceptances",
-                    "total_chat_code_lines",
-                    "total_inline_code_lines",
-                    "unique_users",
-                ]
-                for col in numeric_columns:
-                    if col in daily_df.columns:
-                        daily_df[col] = pd.to_numeric(daily_df[col], errors='coerce').fillna(0)
+            daily_df = fetched['daily']
             results['daily'] = daily_df
 
         # 출력 형식에 따라 결과 출력
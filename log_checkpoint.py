@@ -0,0 +1,115 @@
+"""
+Amazon Q Developer 프롬프트 로그 처리 체크포인트
+
+S3 프롬프트 로그 객체는 한 번 기록되면 바뀌지 않으므로, 파일별 부분 집계
+(사용자별로 나눈 타입/날짜/시간대별 요청 수와 토큰 수)를 로컬에 저장해 두고
+다음 분석에서는 새로 생긴 객체만 다운로드합니다.
+- 키: S3 키 + ETag + 토큰 계산 방식 (객체가 다시 쓰이거나 토크나이저가 바뀌면 새로 계산)
+- 저장 형식: SQLite (사용자 캐시 디렉토리, 기본 ~/.cache/bedrock_usage), 부분 집계는 JSON
+- 사용자 필터는 조회 시점에 적용하므로 패턴이 달라도 같은 체크포인트를 재사용
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from query_cache import DEFAULT_CACHE_DIR
+
+# 기본 체크포인트 위치 (쿼리 결과 캐시와 같은 사용자 캐시 디렉토리, path로 변경 가능)
+DEFAULT_CHECKPOINT_PATH = DEFAULT_CACHE_DIR / "qcli_log_checkpoint.sqlite3"
+
+# 부분 집계 형식이 바뀌면 올려서 이전 체크포인트를 무효화
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+class LogCheckpointStore:
+    """처리한 로그 파일의 부분 집계 저장소 (S3 키 + ETag 기준)"""
+
+    def __init__(self, path: Path = DEFAULT_CHECKPOINT_PATH, logger=None):
+        """
+        Args:
+            path: 체크포인트 SQLite 파일 경로
+            logger: 로거 인스턴스 (None이면 기본 로거 사용)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+        # 병렬 처리 중 여러 스레드에서 접근할 수 있음
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_stats (
+                s3_key TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                tokenizer TEXT NOT NULL,
+                format_version INTEGER NOT NULL,
+                stats TEXT NOT NULL,
+                PRIMARY KEY (s3_key, etag, tokenizer)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, s3_key: str, etag: str, tokenizer: str) -> Optional[Dict]:
+        """저장된 부분 집계 조회
+
+        Args:
+            s3_key: S3 키
+            etag: 객체 ETag (다르면 객체가 다시 쓰인 것으로 보고 None)
+            tokenizer: 토큰 계산 방식 식별자
+
+        Returns:
+            사용자별 부분 집계, 없으면 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stats FROM file_stats "
+                "WHERE s3_key = ? AND etag = ? AND tokenizer = ? AND format_version = ?",
+                (s3_key, etag, tokenizer, CHECKPOINT_FORMAT_VERSION),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            return json.loads(row[0])
+        except ValueError as e:
+            self.logger.warning(f"Invalid checkpoint entry for {s3_key}: {e}")
+            return None
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Dict]], tokenizer: str):
+        """부분 집계 저장 (같은 S3 키의 이전 ETag 항목은 교체)
+
+        Args:
+            entries: (S3 키, ETag, 사용자별 부분 집계) 목록
+            tokenizer: 토큰 계산 방식 식별자
+        """
+        rows = [
+            (s3_key, etag, tokenizer, CHECKPOINT_FORMAT_VERSION, json.dumps(stats))
+            for s3_key, etag, stats in entries
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM file_stats WHERE s3_key = ? AND tokenizer = ?",
+                [(row[0], tokenizer) for row in rows],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO file_stats VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+        self.logger.debug(f"Checkpointed {len(rows)} log files")
+
+    def clear(self):
+        """체크포인트 전체 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM file_stats")
+            self._conn.commit()
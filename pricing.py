@@ -0,0 +1,495 @@
+"""
+Bedrock 모델 가격 계산
+
+리전별 모델 가격과 단건/DataFrame 비용 계산 함수를 제공합니다.
+- 가격 카탈로그: pricing_catalog.json의 적용 시작일별 가격을 프로세스당 한 번 파싱해
+  NumPy 배열 테이블로 보관하고, 날짜가 있는 행은 해당 날짜의 가격을 적용
+- 모델 ID 해석: ModelPriceResolver가 ID를 정규화하고 가장 긴 가격 키와 일치시키며,
+  결과를 크기 제한 캐시에 저장 (같은 모델 재조회는 O(1))
+- calculate_cost_for_dataframe: 고유 모델마다 가격을 한 번만 찾고 NumPy 배열 연산으로 계산
+"""
+
+import json
+import logging
+import re
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 가격 카탈로그 기본 위치
+# 참고: 최신 가격은 https://aws.amazon.com/bedrock/pricing/ 에서 확인하세요
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "pricing_catalog.json"
+
+# (모델 번호, 날짜) 복합 정렬 키에서 모델 번호 간 간격 (일 단위, 날짜 범위보다 커야 함)
+_DAY_SPAN = 1 << 20
+
+
+class PricingCatalog:
+    """적용 시작일(effective_from)별 모델 가격 카탈로그
+
+    카탈로그 파일을 (리전, 모델 키)별 시작일/입력 가격/출력 가격 NumPy 배열로 변환해
+    보관합니다. 리전 항목은 모델 단위로 default 항목을 덮어씁니다.
+    """
+
+    def __init__(self, data: Dict):
+        """
+        Args:
+            data: 카탈로그 JSON 내용 (regions -> 리전 -> 모델 키 -> [{effective_from, input, output}])
+        """
+        self.default_model = data.get("default_model", "claude-3-haiku-20240307")
+        self.reference_model = data.get("reference_model", "claude-3-5-sonnet-20241022")
+
+        regions = data.get("regions", {})
+        default_models = regions.get("default", {})
+        self._tables = {}
+        for region, models in regions.items():
+            merged = dict(default_models)
+            merged.update(models)
+            self._tables[region] = {
+                key: self._compile_entries(entries) for key, entries in merged.items()
+            }
+        self._tables.setdefault("default", {})
+
+    @staticmethod
+    def _compile_entries(entries: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        entries = sorted(entries, key=lambda entry: entry["effective_from"])
+        return (
+            np.array([entry["effective_from"] for entry in entries], dtype="datetime64[D]"),
+            np.array([float(entry["input"]) for entry in entries], dtype=np.float64),
+            np.array([float(entry["output"]) for entry in entries], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_CATALOG_PATH) -> "PricingCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @property
+    def regions(self) -> List[str]:
+        return list(self._tables)
+
+    def table(self, region: str = "default") -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """리전별 (모델 키 -> 시작일/가격 배열) 테이블 (해당 리전이 없으면 default)"""
+        return self._tables.get(region, self._tables["default"])
+
+    def prices_on(self, region: str = "default", on=None) -> Dict[str, Dict[str, float]]:
+        """기준일에 적용되는 리전별 가격 테이블 ({모델 키: {"input", "output"}})
+
+        기준일이 첫 시작일보다 이르면 가장 이른 가격을 적용합니다.
+        """
+        day = np.datetime64(on or date.today(), "D")
+        prices = {}
+        for key, (dates, input_prices, output_prices) in self.table(region).items():
+            i = max(int(np.searchsorted(dates, day, side="right")) - 1, 0)
+            prices[key] = {"input": float(input_prices[i]), "output": float(output_prices[i])}
+        return prices
+
+    def lookup(
+        self, region: str, keys: List[str], codes: np.ndarray, days: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """행별 (모델 번호, 날짜)에 적용되는 가격 배열 조회 (구간 탐색, 행 단위 Python 루프 없음)
+
+        Args:
+            region: AWS 리전
+            keys: 모델 번호 -> 가격 키
+            codes: 행별 모델 번호 (keys 인덱스)
+            days: 행별 날짜 (datetime64[D])
+
+        Returns:
+            (행별 입력 가격, 행별 출력 가격) - 1000 토큰당 USD
+        """
+        table = self.table(region)
+
+        # 모델 번호 순서로 시작일을 이어 붙인 (모델 번호, 날짜) 복합 키 - 모델 내에서는 날짜순
+        offsets = np.empty(len(keys), dtype=np.int64)
+        composite, input_prices, output_prices = [], [], []
+        start = 0
+        for j, key in enumerate(keys):
+            dates, key_input, key_output = table[key]
+            offsets[j] = start
+            composite.append(j * _DAY_SPAN + dates.astype(np.int64))
+            input_prices.append(key_input)
+            output_prices.append(key_output)
+            start += len(dates)
+
+        row_keys = codes.astype(np.int64) * _DAY_SPAN + days.astype("datetime64[D]").astype(np.int64)
+        positions = np.searchsorted(np.concatenate(composite), row_keys, side="right") - 1
+        # 첫 시작일보다 이른 날짜는 해당 모델의 가장 이른 가격 적용
+        positions = np.maximum(positions, offsets[codes])
+
+        return np.concatenate(input_prices)[positions], np.concatenate(output_prices)[positions]
+
+
+@lru_cache(maxsize=None)
+def _load_pricing_catalog(path: str, mtime: float) -> PricingCatalog:
+    logging.getLogger(__name__).info(f"Loading pricing catalog: {path}")
+    return PricingCatalog.from_file(path)
+
+
+def get_pricing_catalog(path: Path = DEFAULT_CATALOG_PATH) -> PricingCatalog:
+    """가격 카탈로그 조회 (프로세스당 한 번 파싱, 파일이 바뀌면 다시 로드)
+
+    Streamlit 재실행(rerun)에서도 모듈 상태가 유지되므로 다시 파싱하지 않습니다.
+    """
+    path = Path(path)
+    return _load_pricing_catalog(str(path), path.stat().st_mtime)
+
+
+# 현재 적용 가격 테이블 (리전 -> 모델 키 -> {"input", "output"}, 1000 토큰당 USD)
+_catalog = get_pricing_catalog()
+MODEL_PRICING = {region: _catalog.prices_on(region) for region in _catalog.regions}
+
+# 가격 테이블에 없는 모델에 적용할 기본 가격 모델
+DEFAULT_PRICING_MODEL = _catalog.default_model
+
+# 직접 API 사용을 가정한 가상 비용(QCli 등) 기준 모델
+REFERENCE_PRICING_MODEL = _catalog.reference_model
+
+# 모델 ID 해석 결과 캐시 크기 ((모델 ID, 리전) 조합 수)
+DEFAULT_RESOLVER_CACHE_SIZE = 4096
+
+# 모델 ID 끝의 버전 접미사 (예: -v1:0, -v2, :0)
+_VERSION_SUFFIX = re.compile(r"(-v\d+(:\d+)?|:\d+)$")
+
+
+def _default_logger(logger):
+    return logger if logger else logging.getLogger(__name__)
+
+
+class ModelPriceResolver:
+    """모델 ID -> 가격 항목 해석기
+
+    - 정규화: ARN/경로, 추론 프로파일 접두사(us., eu., apac., global.), 제공자 접두사
+      (anthropic.), 버전 접미사(-v1:0)를 제거하고 소문자로 변환
+    - 일치: 리전별 가격 키를 길이 내림차순 정규식 하나로 컴파일해 가장 긴 키를 선택
+      (가격 테이블의 키 순서와 무관)
+    - 메모이제이션: (모델 ID, 리전)별 결과를 크기 제한 LRU 캐시에 저장
+    """
+
+    def __init__(
+        self,
+        pricing_table: Dict[str, Dict[str, Dict[str, float]]] = None,
+        cache_size: int = DEFAULT_RESOLVER_CACHE_SIZE,
+    ):
+        """
+        Args:
+            pricing_table: 리전 -> 모델 키 -> {"input", "output"} 가격 테이블 (None이면 MODEL_PRICING)
+            cache_size: 해석 결과 캐시 최대 항목 수
+        """
+        self.pricing_table = pricing_table if pricing_table is not None else MODEL_PRICING
+        self._patterns = {
+            region: self._compile(region_pricing)
+            for region, region_pricing in self.pricing_table.items()
+        }
+        # 소문자 키 -> 원래 가격 키
+        self._keys = {
+            region: {key.lower(): key for key in region_pricing}
+            for region, region_pricing in self.pricing_table.items()
+        }
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+
+    @staticmethod
+    def normalize(model_id: str) -> str:
+        """모델 ID 정규화
+
+        예: arn:aws:bedrock:us-east-1:123:inference-profile/apac.anthropic.claude-3-haiku-20240307-v1:0
+            -> claude-3-haiku-20240307
+        """
+        model_name = str(model_id).strip().lower()
+        model_name = model_name.rsplit("/", 1)[-1]
+        model_name = _VERSION_SUFFIX.sub("", model_name)
+        return model_name.rsplit(".", 1)[-1]
+
+    @staticmethod
+    def _compile(region_pricing: Dict[str, Dict[str, float]]):
+        keys = sorted(region_pricing, key=len, reverse=True)
+        if not keys:
+            return None
+        return re.compile("|".join(re.escape(key.lower()) for key in keys))
+
+    def key_pattern(self, region: str = "default") -> Optional[str]:
+        """리전별 가격 키 정규식 (소문자, 긴 키 우선) - SQL에서 같은 규칙으로 가격 키를 찾을 때 사용"""
+        if region not in self.pricing_table:
+            region = "default"
+        pattern = self._patterns.get(region)
+        return pattern.pattern if pattern is not None else None
+
+    def resolve(self, model_id: str, region: str = "default") -> Optional[Tuple[str, Dict]]:
+        """모델 ID에 해당하는 (가격 키, 가격 항목) 조회 (없으면 None)"""
+        return self._resolve(model_id, region)
+
+    def _resolve_uncached(self, model_id: str, region: str) -> Optional[Tuple[str, Dict]]:
+        # 리전별 가격 테이블 선택 (해당 리전이 없으면 default 사용)
+        if region not in self.pricing_table:
+            region = "default"
+
+        pattern = self._patterns.get(region)
+        if pattern is None:
+            return None
+
+        match = max(
+            (m.group(0) for m in pattern.finditer(self.normalize(model_id))),
+            key=len,
+            default=None,
+        )
+        if match is None:
+            return None
+
+        key = self._keys[region][match]
+        return key, self.pricing_table[region][key]
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중/실패 통계"""
+        info = self._resolve.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+
+    def clear_cache(self):
+        """해석 결과 캐시 초기화"""
+        self._resolve.cache_clear()
+
+
+# 모듈 기본 해석기 (MODEL_PRICING 기반)
+default_resolver = ModelPriceResolver()
+
+
+def find_model_pricing(model_id: str, region: str = "default") -> Optional[Dict]:
+    """모델 ID에 해당하는 가격 항목 조회 (리전별 가격 반영)
+
+    Args:
+        model_id: Bedrock 모델 ID 또는 ARN (예: us.anthropic.claude-3-haiku-20240307-v1:0)
+        region: AWS 리전 (예: us-east-1, ap-northeast-2)
+
+    Returns:
+        {"input": ..., "output": ...} (1000 토큰당 USD) 또는 None (가격 테이블에 없음)
+    """
+    resolved = default_resolver.resolve(model_id, region)
+    return resolved[1] if resolved else None
+
+
+def get_token_pricing(model_id: str = REFERENCE_PRICING_MODEL, region: str = "default") -> Dict[str, float]:
+    """토큰 1개당 가격 조회 (기본: 가상 비용 기준 모델)
+
+    Returns:
+        {"input": ..., "output": ...} (토큰당 USD)
+    """
+    pricing = find_model_pricing(model_id, region) or MODEL_PRICING["default"][DEFAULT_PRICING_MODEL]
+    return {"input": pricing["input"] / 1000, "output": pricing["output"] / 1000}
+
+
+def get_model_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    region: str = "default",
+    logger=None,
+    on: Optional[date] = None,
+) -> float:
+    """모델별 비용 계산 (리전별 가격 반영)
+
+    Args:
+        model_id: Bedrock 모델 ID (예: us.anthropic.claude-3-haiku-20240307-v1:0)
+        input_tokens: 입력 토큰 수
+        output_tokens: 출력 토큰 수
+        region: AWS 리전 (예: us-east-1, ap-northeast-2)
+        logger: 로거 인스턴스 (None이면 기본 로거 사용)
+        on: 사용 날짜 (None이면 현재 가격 적용)
+
+    Returns:
+        float: 계산된 비용 (USD)
+    """
+    logger = _default_logger(logger)
+    logger.debug(
+        f"Calculating cost for model: {model_id}, input: {input_tokens}, output: {output_tokens}, region: {region}"
+    )
+
+    resolved = default_resolver.resolve(model_id, region)
+    if resolved is None:
+        # 기본 가격 (Claude 3 Haiku)
+        logger.warning(f"Unknown model: {model_id}, using default pricing (Claude 3 Haiku)")
+        key = DEFAULT_PRICING_MODEL
+    else:
+        key = resolved[0]
+
+    if on is None:
+        pricing = resolved[1] if resolved else MODEL_PRICING["default"][DEFAULT_PRICING_MODEL]
+    else:
+        pricing = get_pricing_catalog().prices_on(region, on)[key]
+
+    # 가격은 1000 토큰당 가격이므로 1000으로 나눔
+    cost = (input_tokens * pricing["input"] / 1000) + (output_tokens * pricing["output"] / 1000)
+    logger.debug(f"Model: {model_id}, Region: {region}, Cost: ${cost:.6f}")
+    return cost
+
+
+def _token_array(df: pd.DataFrame, column: str) -> np.ndarray:
+    """토큰 컬럼을 int64 배열로 변환 (컬럼 없음/NULL/숫자 아님은 0)"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    return pd.to_numeric(df[column], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+
+def _partition_numbers(values: pd.Series) -> np.ndarray:
+    """파티션 문자열 컬럼('2025', '01' 등)을 숫자 배열로 변환 (고유값만 변환)"""
+    codes, uniques = pd.factorize(values)
+    numbers = pd.to_numeric(pd.Index(uniques).astype(str), errors="coerce").to_numpy(dtype=np.float64)
+    return np.where(codes >= 0, numbers[codes], np.nan)
+
+
+def _row_days(df: pd.DataFrame, date_col: Optional[str], as_of) -> np.ndarray:
+    """행별 사용 날짜 (date_col 또는 year/month/day 컬럼, 없으면 as_of) - datetime64[D] 배열"""
+    default_day = np.datetime64(as_of or date.today(), "D")
+
+    if date_col and date_col in df.columns:
+        days = pd.to_datetime(df[date_col], errors="coerce")
+    elif {"year", "month", "day"} <= set(df.columns):
+        days = pd.to_datetime(
+            pd.DataFrame({part: _partition_numbers(df[part]) for part in ["year", "month", "day"]}),
+            errors="coerce",
+        )
+    else:
+        return np.full(len(df), default_day)
+
+    return days.to_numpy(dtype="datetime64[D]", na_value=default_day)
+
+
+def calculate_cost_for_dataframe(
+    df: pd.DataFrame,
+    model_col: str = "model_name",
+    region: str = "default",
+    logger=None,
+    date_col: Optional[str] = None,
+    as_of: Optional[date] = None,
+) -> pd.DataFrame:
+    """DataFrame에 비용 컬럼 추가 (리전별, 사용 날짜별 가격 반영)
+
+    행마다 get_model_cost를 호출하는 대신 고유 모델별로 가격 키를 한 번만 찾고,
+    행별 (모델, 날짜)에 적용되는 가격을 카탈로그에서 구간 탐색으로 가져와
+    비용을 배열 연산으로 계산합니다.
+
+    Args:
+        df: 비용을 계산할 DataFrame
+        model_col: 모델명이 있는 컬럼명
+        region: AWS 리전 (예: us-east-1, ap-northeast-2)
+        logger: 로거 인스턴스 (None이면 기본 로거 사용)
+        date_col: 사용 날짜 컬럼명 (None이면 year/month/day 컬럼, 둘 다 없으면 as_of)
+        as_of: 날짜 정보가 없는 행에 적용할 기준일 (None이면 오늘)
+
+    Returns:
+        pd.DataFrame: 비용 컬럼이 추가된 DataFrame
+    """
+    logger = _default_logger(logger)
+    logger.info(f"Calculating cost for DataFrame with {len(df)} rows, region: {region}")
+
+    if df.empty:
+        return df
+
+    if model_col in df.columns:
+        models = df[model_col].astype(object).where(df[model_col].notna(), "")
+    else:
+        models = pd.Series("", index=df.index, dtype=object)
+
+    # 고유 모델별 가격 키 조회 (행 수와 무관하게 모델 수만큼만 탐색)
+    codes, unique_models = pd.factorize(models, sort=False)
+    keys = []
+    for model in unique_models:
+        resolved = default_resolver.resolve(str(model), region)
+        if resolved is None:
+            logger.warning(f"Unknown model: {model}, using default pricing (Claude 3 Haiku)")
+            keys.append(DEFAULT_PRICING_MODEL)
+        else:
+            keys.append(resolved[0])
+
+    logger.debug(f"Model price resolver stats: {default_resolver.stats()}")
+
+    # 행별 (모델, 날짜)에 적용되는 가격
+    input_prices, output_prices = get_pricing_catalog().lookup(
+        region, keys, codes, _row_days(df, date_col, as_of)
+    )
+
+    input_tokens = _token_array(df, "total_input_tokens")
+    output_tokens = _token_array(df, "total_output_tokens")
+
+    # 가격은 1000 토큰당 가격이므로 1000으로 나눔
+    costs = (input_tokens * input_prices / 1000) + (output_tokens * output_prices / 1000)
+
+    df["estimated_cost_usd"] = costs
+    logger.info(f"Total cost calculated for region {region}: ${costs.sum():.4f}")
+    return df
+
+
+def calculate_user_costs(
+    user_df: pd.DataFrame,
+    user_app_df: Optional[pd.DataFrame],
+    region: str = "default",
+    user_col: str = "user_or_app",
+    logger=None,
+) -> pd.DataFrame:
+    """사용자별 DataFrame에 실제 사용 모델 기준 비용 컬럼 추가
+
+    사용자별 결과에는 모델 정보가 없으므로, 이미 조회한 사용자 x 모델 결과
+    (get_user_app_detail_analysis)의 모델별 비용을 사용자별로 합산해 붙입니다.
+    같은 사용자명이 여러 행(ARN별)으로 나뉘어 있으면 기본 가격 기준 비용 비율로 나눕니다.
+    사용자 x 모델 결과가 없으면 기존처럼 기본 가격(Claude 3 Haiku)을 적용합니다.
+
+    Args:
+        user_df: 사용자별 DataFrame (user_col, total_input_tokens, total_output_tokens)
+        user_app_df: 사용자 x 모델 DataFrame (user_col, model_name, 토큰 컬럼, 선택적으로 estimated_cost_usd)
+        region: AWS 리전 (예: us-east-1, ap-northeast-2)
+        user_col: 사용자/애플리케이션 컬럼명
+        logger: 로거 인스턴스 (None이면 기본 로거 사용)
+
+    Returns:
+        pd.DataFrame: 비용 컬럼이 추가된 사용자별 DataFrame
+    """
+    logger = _default_logger(logger)
+
+    if user_df.empty:
+        return user_df
+
+    # 기본 가격(Claude 3 Haiku) 기준 비용 - 대체값 및 같은 사용자명 행 간 배분 비율
+    pricing = find_model_pricing(DEFAULT_PRICING_MODEL, region) or MODEL_PRICING["default"][DEFAULT_PRICING_MODEL]
+    baseline = (_token_array(user_df, "total_input_tokens") * pricing["input"] / 1000) + (
+        _token_array(user_df, "total_output_tokens") * pricing["output"] / 1000
+    )
+
+    if (
+        user_app_df is None
+        or user_app_df.empty
+        or user_col not in user_app_df.columns
+        or user_col not in user_df.columns
+    ):
+        logger.warning("No user/model breakdown, using default pricing (Claude 3 Haiku) for user costs")
+        user_df["estimated_cost_usd"] = baseline
+        return user_df
+
+    if "estimated_cost_usd" not in user_app_df.columns:
+        user_app_df = calculate_cost_for_dataframe(user_app_df.copy(), region=region, logger=logger)
+
+    exact_by_user = user_app_df.groupby(user_col, observed=True, sort=False)["estimated_cost_usd"].sum()
+
+    users = user_df[user_col].astype(object)
+    baseline = pd.Series(baseline, index=user_df.index)
+    baseline_total = baseline.groupby(users, sort=False).transform("sum")
+    share = (baseline / baseline_total.where(baseline_total > 0)).fillna(
+        1.0 / users.groupby(users, sort=False).transform("size")
+    )
+
+    exact = users.map(exact_by_user).astype(np.float64)
+    missing = exact.isna()
+    if missing.any():
+        logger.warning(
+            f"{int(missing.sum())} users missing from user/model breakdown, using default pricing"
+        )
+
+    user_df["estimated_cost_usd"] = (exact * share).where(~missing, baseline).to_numpy()
+    logger.info(f"User costs rolled up from {len(user_app_df)} user/model rows, region: {region}")
+    return user_df
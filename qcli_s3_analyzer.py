@@ -2,17 +2,56 @@
 Amazon Q Developer S3 로그 분석 모듈 (bedrock_tracker용)
 
 S3에 저장된 프롬프트 로그를 직접 분석하여 실제 토큰 사용량을 계산합니다.
+로그 파일은 스레드 풀에서 병렬로 다운로드/압축 해제/토큰 계산/집계하고(파일별 부분 집계),
+메인 스레드는 완료되는 순서대로 부분 집계를 합칩니다. 동시에 처리 중인 파일 수는
+제한되며(backpressure), 일시적인 다운로드 오류는 지수 백오프로 재시도합니다.
+파일별 부분 집계는 S3 키 + ETag로 체크포인트에 저장해 다음 분석에서는 새 파일만 읽습니다.
+로그 파일은 gzip 스트림에서 records 배열 원소를 하나씩 디코딩하므로, 파일 크기와 관계없이
+메모리 사용량이 일정하고 다운로드가 끝나기 전에 토큰 계산을 시작합니다.
+토큰 수는 레코드를 묶어 TokenCounter로 계산하며, 반복되는 텍스트는 LRU 캐시에서 가져오고
+Inline 제안의 컨텍스트는 같은 (사용자, 파일)의 직전 요청과 공유하는 접두사를 다시 인코딩하지 않습니다.
+사용자/시간 조건(RecordFilter)은 레코드를 디코딩한 직후 적용해, 맞지 않는 레코드는 토큰을 계산하지 않습니다.
+local_dir를 지정하면 S3 대신 같은 키 구조로 내려받은 로컬 미러(aws s3 sync)에서 메모리 매핑으로
+읽으므로, 네트워크 없이 같은 집계를 로컬 디스크 속도로 다시 계산할 수 있습니다.
+긴 기간을 분석할 때는 use_processes로 파일 처리를 프로세스 풀에 맡겨 여러 코어에서
+토큰을 계산할 수 있습니다 (프로세스마다 인코더를 한 번 로드하고 부분 집계만 돌려받음).
+
+기본은 기간 내 모든 로그 파일을 분석합니다. max_files로 샘플링하면 모든 집계
+(합계, 타입별, 사용자별, 날짜별, 시간대별)를 같은 비율로 스케일링하고,
+파일 단위 표본으로 계산한 오차 범위를 함께 반환합니다.
 """
 
 import boto3
+import csv
+import http.client
+import io
 import json
 import gzip
+import queue
+import threading
+import math
+import mmap
+import multiprocessing
+import os
+import random
+import statistics
+import time
+from contextlib import closing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 from collections import defaultdict
+from urllib.parse import unquote_plus
 import logging
 
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError, \
+    IncompleteReadError
+
+from log_checkpoint import LogCheckpointStore
+from token_counter import DEFAULT_TOKEN_CACHE_SIZE, TokenCounter
+
 try:
     import tiktoken
     TIKTOKEN_AVAILABLE = True
@@ -20,24 +59,401 @@ except ImportError:
     TIKTOKEN_AVAILABLE = False
     logging.warning("tiktoken not available, using fallback token estimation")
 
+# 로그 파일 병렬 처리 설정
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5  # 재시도 대기 (초), 시도마다 2배 + 지터
+RETRY_JITTER = 0.25  # 대기 시간의 ±25%
+
+# 스트리밍 JSON 디코딩 시 한 번에 읽는 문자 수
+JSON_READ_CHARS = 64 * 1024
+
+# 토큰 수를 한 번에 계산하는 레코드 수 (파일 안에서 묶는 단위)
+TOKEN_BATCH_SIZE = 256
+
+# 체크포인트에 한 번에 기록하는 파일 수
+CHECKPOINT_BATCH_SIZE = 200
+
+# 프로세스 풀 작업 하나로 묶어 보낼 로그 파일 수 (작업별 직렬화/전달 비용 분산)
+PROCESS_BATCH_FILES = 16
+
+# 샘플링 시 오차 범위 신뢰수준 (95%)
+SAMPLING_CONFIDENCE = 0.95
+SAMPLING_Z_SCORE = 1.96
+
+# 샘플링 오차를 추정하는 합계 항목
+SAMPLED_TOTALS = ('total_requests', 'total_input_tokens', 'total_output_tokens', 'total_tokens')
+
+# 시간 조건 비교용 타임스탬프 형식 (로그의 timeStamp는 UTC ISO 8601)
+TIMESTAMP_PREFIX_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# 다시 시도하면 성공할 수 있는 S3 오류 코드 (그 밖의 5xx 응답도 재시도)
+TRANSIENT_S3_ERRORS = ('Throttling', 'ThrottlingException', 'SlowDown', 'RequestTimeout',
+                       'InternalError', 'ServiceUnavailable', 'RequestLimitExceeded')
+
+# 다운로드/본문 읽기 중 연결 오류 (연결 실패, 읽기 시간 초과, 응답 도중 끊김)
+TRANSIENT_TRANSPORT_ERRORS = (BotoConnectionError, HTTPClientError, IncompleteReadError,
+                              http.client.IncompleteRead, ConnectionError, TimeoutError)
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """다시 시도하면 성공할 수 있는 전송 오류인지 여부 (파일 내용 디코딩 오류는 False)"""
+    if isinstance(error, ClientError):
+        response = error.response or {}
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return response.get('Error', {}).get('Code') in TRANSIENT_S3_ERRORS or status >= 500
+    return isinstance(error, TRANSIENT_TRANSPORT_ERRORS)
+
+
+def _usage_counter() -> Dict:
+    return {'requests': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+
+def _new_partial_stats() -> Dict:
+    """파일별 부분 집계 (analyze_usage 통계의 합산 대상 항목)"""
+    return {
+        'total_requests': 0,
+        'by_type': {
+            'chat': {'count': 0, 'input_tokens': 0, 'output_tokens': 0},
+            'inline': {'count': 0, 'input_tokens': 0, 'output_tokens': 0}
+        },
+        'by_user': defaultdict(_usage_counter),
+        'by_date': defaultdict(_usage_counter),
+        'by_hour': defaultdict(int)
+    }
+
+
+class RecordFilter:
+    """분석할 레코드 조건 (레코드를 디코딩한 직후, 토큰 계산 전에 적용)
+
+    사용자 ID가 없는 레코드는 사용자 조건과 관계없이 포함합니다. 시간 조건이 있으면
+    timeStamp가 없는 레코드는 제외합니다.
+    """
+
+    def __init__(self, user_pattern: Optional[str] = None, user_ids: Optional[Iterable[str]] = None,
+                 start_time: Optional[datetime] = None, end_time: Optional[datetime] = None):
+        """
+        Args:
+            user_pattern: 사용자 ID에 포함되어야 하는 문자열 (대소문자 무시)
+            user_ids: 정확히 일치해야 하는 사용자 ID 집합
+            start_time: 이 시각 이후 레코드만 (UTC, 포함)
+            end_time: 이 시각 이전 레코드만 (UTC, 제외)
+        """
+        self.user_pattern = user_pattern.lower() if user_pattern else None
+        self.user_ids = frozenset(user_ids) if user_ids is not None else None
+        # ISO 8601 문자열은 초 단위까지 잘라 사전순으로 비교하면 시각 순서와 같음
+        self.start = start_time.strftime(TIMESTAMP_PREFIX_FORMAT) if start_time else None
+        self.end = end_time.strftime(TIMESTAMP_PREFIX_FORMAT) if end_time else None
+
+    @property
+    def has_time_window(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    @property
+    def active(self) -> bool:
+        return self.user_pattern is not None or self.user_ids is not None or self.has_time_window
+
+    def matches_user(self, user_id: Optional[str]) -> bool:
+        if not user_id:
+            return True
+        if self.user_ids is not None and user_id not in self.user_ids:
+            return False
+        return self.user_pattern is None or self.user_pattern in user_id.lower()
+
+    def matches_time(self, timestamp: Optional[str]) -> bool:
+        if not self.has_time_window:
+            return True
+        if not timestamp:
+            return False
+        timestamp = timestamp[:19]
+        if self.start is not None and timestamp < self.start:
+            return False
+        return self.end is None or timestamp < self.end
+
+    def matches(self, record: Dict) -> bool:
+        """extract_record()/parse_record() 결과 레코드가 조건에 맞는지 여부"""
+        return self.matches_user(record.get('userId')) and self.matches_time(record.get('timestamp'))
+
+
+class _JsonStreamReader:
+    """텍스트 스트림 위의 버퍼 (필요한 만큼만 읽고, 소비한 앞부분은 버림)"""
+
+    _decoder = json.JSONDecoder()
+    _NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+    def __init__(self, stream, read_chars: int = JSON_READ_CHARS):
+        self.stream = stream
+        self.read_chars = read_chars
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_chars: int) -> bool:
+        """버퍼에 최소 min_chars만큼 더 읽기 (더 읽을 것이 없으면 False)"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+
+        target = len(self.buffer) + min_chars
+        while len(self.buffer) < target:
+            chunk = self.stream.read(max(self.read_chars, target - len(self.buffer)))
+            if not chunk:
+                self.eof = True
+                break
+            self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 문자 (끝이면 '')"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.read_chars):
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def decode_value(self):
+        """다음 JSON 값 하나를 디코딩
+
+        값이 버퍼 끝에 걸쳐 있으면 읽는 양을 두 배씩 늘리며 다시 시도합니다.
+        숫자는 버퍼 끝에서 잘려도 디코딩되므로 ('12.5' -> '12.') 뒤에 숫자가 아닌 문자가 올 때까지 읽습니다.
+        """
+        self.peek()
+        more = self.read_chars
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                if self.eof or (end < len(self.buffer) and self.buffer[end] not in self._NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(more)
+            more *= 2
+
+
+def iter_json_array(stream, key: str = 'records') -> Iterator:
+    """최상위 JSON 객체의 key 배열 원소를 하나씩 반환 (전체 문서를 메모리에 올리지 않음)
+
+    Args:
+        stream: read(n)으로 문자열을 반환하는 텍스트 스트림
+        key: 순회할 배열의 키 (없으면 아무것도 반환하지 않음)
+    """
+    reader = _JsonStreamReader(stream)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.decode_value()
+        reader.expect(':')
+
+        if name == key and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.decode_value()
+                    separator = reader.peek()
+                    reader.pos += 1
+                    if separator == ']':
+                        break
+                    if separator != ',':
+                        raise ValueError(f"Expected ',' or ']' in {key} array")
+        else:
+            reader.decode_value()
+
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError("Expected ',' or '}' in JSON object")
+
+
+def _parse_s3_uri(uri: str) -> Tuple[str, str]:
+    """s3://bucket/key -> (bucket, key)"""
+    bucket, _, key = uri.replace('s3://', '', 1).partition('/')
+    return bucket, key
+
+
+def _read_inventory_csv(body: bytes, schema: List[str]) -> Iterator[Tuple[str, str]]:
+    """S3 Inventory CSV(gzip, 헤더 없음)에서 (키, ETag) 순회 (CSV의 키는 URL 인코딩됨)"""
+    key_index = schema.index('Key')
+    etag_index = schema.index('ETag') if 'ETag' in schema else None
+
+    text = io.TextIOWrapper(gzip.GzipFile(fileobj=io.BytesIO(body)), encoding='utf-8')
+    for row in csv.reader(text):
+        etag = row[etag_index] if etag_index is not None else ''
+        yield unquote_plus(row[key_index]), etag
+
+
+def _read_inventory_parquet(body: bytes) -> Iterator[Tuple[str, str]]:
+    """S3 Inventory Parquet에서 (키, ETag) 순회"""
+    import pandas as pd
+
+    df = pd.read_parquet(io.BytesIO(body))
+    etags = df['e_tag'] if 'e_tag' in df.columns else [''] * len(df)
+    return zip(df['key'], etags)
+
+
+class LogObjectStream:
+    """백그라운드 스레드에서 채워지는 로그 파일(S3 객체) 스트림
+
+    각 생산자(prefix 나열, Inventory 파일 읽기)는 emit(객체 목록)으로 결과를 넘기고,
+    순회하는 쪽은 도착하는 순서대로 객체를 받습니다. 생산자는 소비 속도와 관계없이
+    끝까지 실행되므로 found/done으로 전체 파일 수를 일찍 알 수 있습니다.
+    실패한 생산자는 로그를 남기고 건너뜁니다.
+    """
+
+    _PRODUCER_DONE = object()
+
+    def __init__(self, producers: List[Callable], max_workers: int, logger=None):
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self.found = 0
+        self.done = not producers
+        self._running = len(producers)
+        self._remaining = len(producers)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._executor = None
+
+        if producers:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, min(max_workers, len(producers))), thread_name_prefix='qcli-list'
+            )
+            for producer in producers:
+                self._executor.submit(self._run, producer)
+
+    def _emit(self, objects: List[Dict]):
+        if objects:
+            with self._lock:
+                self.found += len(objects)
+            self._queue.put(objects)
+
+    def _run(self, producer: Callable):
+        try:
+            producer(self._emit)
+        except Exception as e:
+            self.logger.error(f"Error listing log files: {e}")
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.done = self._running == 0
+            self._queue.put(self._PRODUCER_DONE)
+
+    def __iter__(self) -> Iterator[Dict]:
+        try:
+            while self._remaining:
+                item = self._queue.get()
+                if item is self._PRODUCER_DONE:
+                    self._remaining -= 1
+                    continue
+                yield from item
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 프로세스 풀 워커마다 하나씩 만드는 분석기 (인코더/S3 클라이언트를 워커 수명 동안 재사용)
+_worker_analyzer = None
+
+
+def _init_process_worker(region: str, account_id: str, max_retries: int, token_cache_size: int,
+                         local_dir: Optional[str]):
+    global _worker_analyzer
+    _worker_analyzer = QCliS3LogAnalyzer(
+        region=region, max_workers=1, max_retries=max_retries, use_checkpoint=False,
+        token_cache_size=token_cache_size, account_id=account_id, local_dir=local_dir
+    )
+
+
+def _process_log_files_in_worker(
+    s3_keys: List[str],
+    record_filter: Optional[RecordFilter]
+) -> Tuple[List[Optional[Dict[str, Dict]]], Dict]:
+    """워커 프로세스에서 로그 파일 묶음 처리
+
+    Returns:
+        (파일별 사용자별 부분 집계 또는 실패 시 None, 이 묶음의 토큰 계산 통계)
+    """
+    before = _worker_analyzer.token_counter.stats()
+    file_stats = [_worker_analyzer.process_log_file(s3_key, record_filter) for s3_key in s3_keys]
+    return file_stats, TokenCounter.stats_delta(before, _worker_analyzer.token_counter.stats())
+
 
 class QCliS3LogAnalyzer:
     """Amazon Q Developer S3 프롬프트 로그 분석기"""
 
-    def __init__(self, region='us-east-1', logger=None):
+    def __init__(self, region='us-east-1', logger=None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_retries: int = DEFAULT_MAX_RETRIES, max_in_flight: Optional[int] = None,
+                 use_checkpoint: bool = True, refresh_checkpoint: bool = False,
+                 inventory_manifest: Optional[str] = None,
+                 token_cache_size: int = DEFAULT_TOKEN_CACHE_SIZE, use_processes: bool = False,
+                 max_processes: Optional[int] = None, account_id: Optional[str] = None,
+                 local_dir: Optional[str] = None):
         """
         Args:
             region: AWS 리전
             logger: 로거 인스턴스 (None이면 기본 로거 사용)
+            max_workers: 로그 파일을 동시에 다운로드/파싱할 스레드 수
+            max_retries: 로그 파일 다운로드 실패 시 재시도 횟수
+            max_in_flight: 스레드 풀에 동시에 제출해 둘 최대 파일 수 (None이면 max_workers의 2배,
+                프로세스 풀은 PROCESS_BATCH_FILES개씩 묶어 max_processes의 2배 묶음까지 제출)
+            use_checkpoint: 처리한 파일의 부분 집계를 저장/재사용할지 여부
+            refresh_checkpoint: 저장된 부분 집계를 읽지 않고 다시 계산해 덮어쓸지 여부
+            inventory_manifest: 로그 버킷의 S3 Inventory manifest.json URI
+                (s3://bucket/.../manifest.json, 지정하면 나열 대신 Inventory에서 키를 읽음)
+            token_cache_size: 토큰 수를 기억해 둘 최대 텍스트 수 (0이면 캐시 사용 안 함)
+            use_processes: 로그 파일 다운로드/파싱/토큰 계산을 프로세스 풀에서 실행할지 여부
+                (CPU를 많이 쓰는 긴 기간 분석용, 체크포인트 조회와 합산은 이 프로세스에서 처리)
+            max_processes: 프로세스 풀 크기 (None이면 CPU 코어 수)
+            account_id: 로그 버킷의 AWS 계정 ID (None이면 STS로 조회, local_dir면 미러의 AWSLogs 아래 디렉토리)
+            local_dir: 로그 버킷을 내려받은 로컬 디렉토리
+                (aws s3 sync s3://amazonq-developer-reports-<계정 ID> <디렉토리>, 지정하면 S3에 접근하지 않음)
         """
         self.region = region
-        self.s3 = boto3.client('s3', region_name=region)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(0, max_retries)
+        self.token_cache_size = token_cache_size
+        self.max_processes = max(1, max_processes or os.cpu_count() or 1) if use_processes else 0
+        self.max_in_flight = max(self.max_workers, max_in_flight or self.max_workers * 2)
+        self.log_prefix = 'prompt_logging/AWSLogs'
+        self.local_dir = Path(local_dir) if local_dir else None
 
-        # 계정 ID 가져오기
-        sts = boto3.client('sts', region_name=region)
-        self.account_id = sts.get_caller_identity()['Account']
+        if self.local_dir is not None:
+            if inventory_manifest:
+                raise ValueError("inventory_manifest cannot be used with local_dir")
+            if not self.local_dir.is_dir():
+                raise ValueError(f"Local log directory not found: {self.local_dir}")
+            self.s3 = None
+            if account_id is None:
+                account_id = self._local_account_id()
+        else:
+            # 스레드마다 연결을 쓸 수 있도록 연결 풀 확장 (스로틀링은 botocore가 재시도)
+            self.s3 = boto3.client('s3', region_name=region, config=Config(
+                max_pool_connections=max(10, self.max_workers),
+                retries={'max_attempts': self.max_retries + 1, 'mode': 'standard'}
+            ))
+
+            # 계정 ID 가져오기
+            if account_id is None:
+                sts = boto3.client('sts', region_name=region)
+                account_id = sts.get_caller_identity()['Account']
+
+        self.account_id = account_id
         self.bucket_name = f'amazonq-developer-reports-{self.account_id}'
-        self.log_prefix = 'prompt_logging/AWSLogs'
+        self.inventory_manifest = inventory_manifest
 
         # 로거 설정
         self.logger = logger if logger else logging.getLogger(__name__)
@@ -46,25 +462,25 @@ class QCliS3LogAnalyzer:
         if TIKTOKEN_AVAILABLE:
             try:
                 self.encoding = tiktoken.get_encoding("cl100k_base")
-            except:
+            except Exception as e:
+                # 오프라인 등으로 인코딩 파일을 받지 못하면 글자 수 기반 추정 사용
                 self.encoding = None
-                self.logger.warning("Failed to load tiktoken encoder")
+                self.logger.warning(f"Failed to load tiktoken encoder, estimating tokens from length: {e}")
         else:
             self.encoding = None
 
+        self.token_counter = TokenCounter(self.encoding, cache_size=token_cache_size, logger=self.logger)
+
+        # 처리한 파일 체크포인트 (토큰 계산 방식이 다르면 다른 항목으로 저장)
+        self.tokenizer = 'tiktoken:cl100k_base' if self.encoding else 'chars/3'
+        self.checkpoint = LogCheckpointStore(logger=self.logger) if use_checkpoint else None
+        self.refresh_checkpoint = refresh_checkpoint
+
     def estimate_tokens(self, text: str) -> int:
         """텍스트의 토큰 수 추정"""
         if not text:
             return 0
-
-        if self.encoding:
-            try:
-                return len(self.encoding.encode(text))
-            except:
-                pass
-
-        # Fallback: 대략적인 추정 (1토큰 ≈ 3글자)
-        return len(text) // 3
+        return self.token_counter.count(text)
 
     def list_log_files(
         self,
@@ -83,126 +499,620 @@ class QCliS3LogAnalyzer:
         Returns:
             S3 키 리스트
         """
+        return [obj['key'] for obj in self.list_log_objects(start_date, end_date, log_type)]
+
+    def list_log_objects(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        log_type: str = None
+    ) -> List[Dict]:
+        """
+        S3에서 날짜 범위에 해당하는 로그 파일 목록을 ETag와 함께 가져오기
+
+        Returns:
+            [{'key': S3 키, 'etag': ETag}, ...]
+        """
+        log_files = list(self.iter_log_objects(start_date, end_date, log_type))
+        self.logger.info(f"Found {len(log_files)} log files")
+        return log_files
+
+    def iter_log_objects(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        log_type: str = None
+    ) -> 'LogObjectStream':
+        """
+        날짜 범위의 로그 파일을 찾는 대로 반환하는 스트림
+
+        inventory_manifest가 설정되어 있으면 S3 Inventory 파일에서, 아니면 일자/로그 타입별
+        prefix를 스레드 풀에서 병렬로 나열합니다. 나열은 백그라운드에서 진행되므로
+        첫 페이지가 도착하는 즉시 파싱을 시작할 수 있습니다.
+
+        Returns:
+            {'key': S3 키, 'etag': ETag}를 순회하는 LogObjectStream
+        """
         self.logger.info(f"Listing log files from {start_date} to {end_date}")
+        prefixes = self._day_prefixes(start_date, end_date, log_type)
 
-        log_files = []
+        if self.inventory_manifest:
+            producers = self._inventory_producers(prefixes)
+        else:
+            producers = [
+                lambda emit, prefix=prefix: self._list_prefix(prefix, emit)
+                for prefix in prefixes
+            ]
 
-        try:
-            # 날짜 범위 생성
-            current_date = start_date
-            while current_date <= end_date:
-                year = current_date.strftime('%Y')
-                month = current_date.strftime('%m')
-                day = current_date.strftime('%d')
+        return LogObjectStream(producers, self.max_workers, self.logger)
 
-                # 로그 타입별로 검색
-                log_types = [log_type] if log_type else ['GenerateAssistantResponse', 'GenerateCompletions']
+    def _day_prefixes(self, start_date: datetime, end_date: datetime, log_type: str = None) -> List[str]:
+        """일자 x 로그 타입별 S3 prefix 목록"""
+        log_types = [log_type] if log_type else ['GenerateAssistantResponse', 'GenerateCompletions']
+        prefixes = []
 
-                for lt in log_types:
-                    prefix = f"{self.log_prefix}/{self.account_id}/QDeveloperLogs/{lt}/us-east-1/{year}/{month}/{day}/"
+        current_date = start_date
+        while current_date <= end_date:
+            year = current_date.strftime('%Y')
+            month = current_date.strftime('%m')
+            day = current_date.strftime('%d')
 
-                    # S3 객체 나열
-                    paginator = self.s3.get_paginator('list_objects_v2')
-                    pages = paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for lt in log_types:
+                prefixes.append(
+                    f"{self.log_prefix}/{self.account_id}/QDeveloperLogs/{lt}/us-east-1/{year}/{month}/{day}/"
+                )
 
-                    for page in pages:
-                        if 'Contents' in page:
-                            for obj in page['Contents']:
-                                if obj['Key'].endswith('.json.gz'):
-                                    log_files.append(obj['Key'])
+            current_date += timedelta(days=1)
 
-                current_date += timedelta(days=1)
+        return prefixes
 
-            self.logger.info(f"Found {len(log_files)} log files")
-            return log_files
+    def _local_account_id(self) -> str:
+        """로컬 미러의 AWSLogs 아래 계정 ID 디렉토리 (하나일 때만)"""
+        logs_dir = self.local_dir / self.log_prefix
+        accounts = sorted(entry.name for entry in logs_dir.iterdir() if entry.is_dir()) if logs_dir.is_dir() else []
+        if len(accounts) != 1:
+            raise ValueError(
+                f"Cannot determine account ID from {logs_dir} (found: {accounts or 'none'}), pass account_id"
+            )
+        return accounts[0]
 
-        except Exception as e:
-            self.logger.error(f"Error listing log files: {e}")
+    def _list_prefix(self, prefix: str, emit: Callable[[List[Dict]], None]):
+        """prefix 하나를 나열하며 페이지마다 로그 파일 목록 전달"""
+        if self.local_dir is not None:
+            self._list_local_prefix(prefix, emit)
+            return
+
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            emit([
+                {'key': obj['Key'], 'etag': obj.get('ETag', '').strip('"')}
+                for obj in page.get('Contents', [])
+                if obj['Key'].endswith('.json.gz')
+            ])
+
+    def _list_local_prefix(self, prefix: str, emit: Callable[[List[Dict]], None]):
+        """로컬 미러에서 prefix(일자 디렉토리) 하나의 로그 파일 목록 전달
+
+        aws s3 sync는 ETag를 보존하지 않으므로 크기와 수정 시각으로 체크포인트 키를 만듭니다.
+        """
+        directory = self.local_dir / prefix
+        if not directory.is_dir():
+            return
+
+        with os.scandir(directory) as entries:
+            objects = []
+            for entry in entries:
+                if entry.name.endswith('.json.gz') and entry.is_file():
+                    stat = entry.stat()
+                    objects.append({
+                        'key': prefix + entry.name,
+                        'etag': f"local-{stat.st_size}-{stat.st_mtime_ns}"
+                    })
+        emit(sorted(objects, key=lambda obj: obj['key']))
+
+    def _inventory_producers(self, prefixes: List[str]) -> List[Callable]:
+        """S3 Inventory manifest의 데이터 파일별 로그 파일 목록 생산자
+
+        manifest.json의 fileFormat이 CSV(gzip)면 fileSchema 순서로 Key/ETag를 읽고,
+        Parquet이면 key/e_tag 컬럼을 읽습니다 (pyarrow 필요).
+        날짜 범위는 키의 일자 prefix로 거릅니다.
+        """
+        inventory_bucket, manifest_key = _parse_s3_uri(self.inventory_manifest)
+        manifest = json.loads(
+            self.s3.get_object(Bucket=inventory_bucket, Key=manifest_key)['Body'].read()
+        )
+
+        if manifest.get('sourceBucket') not in (None, self.bucket_name):
+            self.logger.warning(
+                f"Inventory source bucket {manifest['sourceBucket']} differs from {self.bucket_name}"
+            )
+
+        file_format = manifest.get('fileFormat', 'CSV').upper()
+        if file_format not in ('CSV', 'PARQUET'):
+            raise ValueError(f"Unsupported S3 Inventory format: {file_format}")
+
+        schema = [column.strip() for column in manifest.get('fileSchema', '').split(',')]
+        wanted_prefixes = set(prefixes)
+        self.logger.info(
+            f"Reading S3 Inventory ({file_format}, {len(manifest['files'])} files) from {self.inventory_manifest}"
+        )
+
+        def read_inventory_file(data_key: str, emit: Callable[[List[Dict]], None]):
+            body = self.s3.get_object(Bucket=inventory_bucket, Key=data_key)['Body'].read()
+            if file_format == 'CSV':
+                rows = _read_inventory_csv(body, schema)
+            else:
+                rows = _read_inventory_parquet(body)
+
+            emit([
+                {'key': key, 'etag': etag}
+                for key, etag in rows
+                if key.endswith('.json.gz') and key.rsplit('/', 1)[0] + '/' in wanted_prefixes
+            ])
+
+        return [
+            lambda emit, data_key=data_file['key']: read_inventory_file(data_key, emit)
+            for data_file in manifest['files']
+        ]
+
+    def _with_retries(self, s3_key: str, func: Callable[[], object]):
+        """func()를 실행하고, 전송 오류(스로틀링/5xx, 연결 실패, 읽기 중 끊김)면
+        지수 백오프(+지터)로 max_retries번까지 재시도
+
+        객체가 없거나 권한이 없는 오류, 잘리거나 형식이 잘못된 파일의 gzip/JSON 디코딩 오류,
+        토큰 계산 오류는 다시 시도해도 같으므로 바로 올립니다. 시도마다 토큰 계산 통계를
+        따로 모아 실패한 시도의 통계는 되돌립니다.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.token_counter.attempt():
+                    return func()
+            except Exception as e:
+                # 로컬 미러는 다시 읽어도 결과가 같음
+                if not _is_transient_error(e) or self.local_dir is not None or attempt >= self.max_retries:
+                    raise
+
+                delay = RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(1 - RETRY_JITTER, 1 + RETRY_JITTER)
+                self.logger.debug(f"Retrying {s3_key} in {delay:.2f}s (attempt {attempt + 1}): {e}")
+                time.sleep(delay)
+
+    def download_log_file(self, s3_key: str) -> bytes:
+        """S3에서 로그 파일(gzip) 전체 다운로드 (일시적인 오류는 재시도)"""
+        if self.local_dir is not None:
+            return (self.local_dir / s3_key).read_bytes()
+        return self._with_retries(
+            s3_key,
+            lambda: self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)['Body'].read()
+        )
+
+    def iter_log_records(self, fileobj, record_filter: Optional[RecordFilter] = None) -> Iterator[Dict]:
+        """gzip 로그 스트림에서 레코드를 하나씩 디코딩해 변환 (토큰 수 계산 포함)
+
+        Args:
+            fileobj: gzip 압축된 로그 파일 바이너리 스트림 (S3 StreamingBody 등)
+            record_filter: 레코드 조건 (맞지 않는 레코드는 토큰을 계산하지 않고 건너뜀)
+        """
+        if record_filter is not None and not record_filter.active:
+            record_filter = None
+
+        batch = []
+        with gzip.GzipFile(fileobj=fileobj) as gzipfile:
+            text = io.TextIOWrapper(gzipfile, encoding='utf-8')
+            for record in iter_json_array(text, 'records'):
+                extracted = self.extract_record(record)
+                if extracted is None:
+                    continue
+                if record_filter is not None and not record_filter.matches(extracted[0]):
+                    continue
+                batch.append(extracted)
+                if len(batch) >= TOKEN_BATCH_SIZE:
+                    yield from self._count_batch_tokens(batch)
+                    batch = []
+        yield from self._count_batch_tokens(batch)
+
+    def _count_batch_tokens(self, batch: List[Tuple[Dict, str, str, Optional[Tuple]]]) -> List[Dict]:
+        """extract_record() 결과 묶음의 입력/출력 토큰 수를 한 번에 계산
+
+        파일 처리 워커 스레드에서는 차례로 인코딩하고, 메인 스레드(parse_log_file 직접 호출,
+        프로세스 풀 워커)에서는 encode_batch로 max_workers개 스레드에 나눠 인코딩합니다.
+        """
+        if not batch:
             return []
 
+        texts = []
+        contexts = []
+        for _, input_text, output_text, context in batch:
+            texts.extend((input_text, output_text))
+            contexts.extend((context, None))
+        num_threads = self.max_workers if threading.current_thread() is threading.main_thread() else 1
+        counts = self.token_counter.count_many(texts, contexts, num_threads=num_threads)
+
+        for i, (parsed, _, _, _) in enumerate(batch):
+            parsed['input_tokens'] = counts[2 * i]
+            parsed['output_tokens'] = counts[2 * i + 1]
+        return [parsed for parsed, _, _, _ in batch]
+
     def parse_log_file(self, s3_key: str) -> List[Dict]:
         """S3에서 로그 파일 다운로드 및 파싱"""
-        results = []
-
         try:
-            # S3에서 객체 가져오기
-            response = self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)
-
-            # gzip 압축 해제 및 JSON 파싱
-            with gzip.GzipFile(fileobj=response['Body']) as gzipfile:
-                content = gzipfile.read().decode('utf-8')
-                data = json.loads(content)
-
-            for record in data.get('records', []):
-                # Chat 로그 (GenerateAssistantResponse)
-                if 'generateAssistantResponseEventRequest' in record:
-                    request = record['generateAssistantResponseEventRequest']
-                    response_data = record.get('generateAssistantResponseEventResponse', {})
-
-                    prompt = request.get('prompt', '')
-                    assistant_response = response_data.get('assistantResponse', '')
-
-                    results.append({
-                        'type': 'chat',
-                        'input_tokens': self.estimate_tokens(prompt),
-                        'output_tokens': self.estimate_tokens(assistant_response),
-                        'timestamp': request.get('timeStamp'),
-                        'userId': request.get('userId'),
-                        'conversationId': response_data.get('messageMetadata', {}).get('conversationId')
-                    })
+            return self._with_retries(
+                s3_key,
+                lambda: list(self._iter_file_records(s3_key))
+            )
+        except Exception as e:
+            self.logger.debug(f"Error parsing log file {s3_key}: {e}")
+            return []
 
-                # Inline 제안 로그 (GenerateCompletions)
-                elif 'generateCompletionsEventRequest' in record:
-                    request = record['generateCompletionsEventRequest']
-                    response_data = record.get('generateCompletionsEventResponse', {})
-
-                    left_context = request.get('leftContext', '')
-                    right_context = request.get('rightContext', '')
-                    completions = response_data.get('completions', [])
-
-                    completion_text = '\n'.join([
-                        c.get('content', '') for c in completions
-                    ])
-
-                    results.append({
-                        'type': 'inline',
-                        'input_tokens': self.estimate_tokens(left_context + right_context),
-                        'output_tokens': self.estimate_tokens(completion_text),
-                        'timestamp': request.get('timeStamp'),
-                        'userId': request.get('userId'),
-                        'fileName': request.get('fileName')
-                    })
+    def parse_log_content(self, raw: bytes) -> List[Dict]:
+        """gzip 압축된 로그 파일 내용을 레코드 목록으로 변환 (토큰 수 계산 포함)"""
+        return list(self.iter_log_records(io.BytesIO(raw)))
+
+    def _open_log_file(self, s3_key: str):
+        """로그 파일 본문 스트림 (S3는 읽는 만큼만 다운로드, 로컬 미러는 메모리 매핑)"""
+        if self.local_dir is None:
+            return self.s3.get_object(Bucket=self.bucket_name, Key=s3_key)['Body']
+
+        with open(self.local_dir / s3_key, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return io.BytesIO()
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _iter_file_records(self, s3_key: str, record_filter: Optional[RecordFilter] = None) -> Iterator[Dict]:
+        """로그 파일 하나의 레코드 (다 읽으면 본문 스트림/메모리 매핑을 닫음)"""
+        with closing(self._open_log_file(s3_key)) as body:
+            yield from self.iter_log_records(body, record_filter)
+
+    def parse_record(self, record: Dict) -> Optional[Dict]:
+        """로그 레코드 하나를 분석용 레코드로 변환 (Chat/Inline이 아니면 None)"""
+        extracted = self.extract_record(record)
+        if extracted is None:
+            return None
+        return self._count_batch_tokens([extracted])[0]
+
+    @staticmethod
+    def extract_record(record: Dict) -> Optional[Tuple[Dict, str, str, Optional[Tuple]]]:
+        """로그 레코드에서 분석용 필드와 토큰 계산 대상 텍스트 추출
+
+        Returns:
+            (분석용 레코드(토큰 수 0), 입력 텍스트, 출력 텍스트, 입력 텍스트의 증분 계산 컨텍스트),
+            Chat/Inline이 아니면 None. 컨텍스트는 Inline 제안의 (사용자 ID, 파일명)이며 Chat은 None
+        """
+        # Chat 로그 (GenerateAssistantResponse)
+        if 'generateAssistantResponseEventRequest' in record:
+            request = record['generateAssistantResponseEventRequest']
+            response_data = record.get('generateAssistantResponseEventResponse', {})
+
+            prompt = request.get('prompt', '')
+            assistant_response = response_data.get('assistantResponse', '')
+
+            return {
+                'type': 'chat',
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'timestamp': request.get('timeStamp'),
+                'userId': request.get('userId'),
+                'conversationId': response_data.get('messageMetadata', {}).get('conversationId')
+            }, prompt, assistant_response, None
+
+        # Inline 제안 로그 (GenerateCompletions)
+        elif 'generateCompletionsEventRequest' in record:
+            request = record['generateCompletionsEventRequest']
+            response_data = record.get('generateCompletionsEventResponse', {})
+
+            left_context = request.get('leftContext', '')
+            right_context = request.get('rightContext', '')
+            completions = response_data.get('completions', [])
+
+            completion_text = '\n'.join([
+                c.get('content', '') for c in completions
+            ])
+
+            return {
+                'type': 'inline',
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'timestamp': request.get('timeStamp'),
+                'userId': request.get('userId'),
+                'fileName': request.get('fileName')
+            }, left_context + right_context, completion_text, (request.get('userId'), request.get('fileName'))
+
+        return None
 
+    def aggregate_records(self, records: Iterable[Dict], user_pattern: str = None) -> Dict:
+        """레코드 목록을 부분 집계로 요약 (사용자 필터 적용)"""
+        partial = _new_partial_stats()
+
+        for record in records:
+            # 사용자 필터 적용
+            if user_pattern and record.get('userId'):
+                if user_pattern.lower() not in record['userId'].lower():
+                    continue
+            self._add_record(partial, record)
+
+        return partial
+
+    @staticmethod
+    def _add_record(partial: Dict, record: Dict):
+        """부분 집계에 레코드 하나 반영"""
+        log_type = record['type']
+        user_id = record.get('userId') or 'unknown'
+        timestamp = record.get('timestamp', '')
+
+        # 기본 통계
+        partial['total_requests'] += 1
+        partial['by_type'][log_type]['count'] += 1
+        partial['by_type'][log_type]['input_tokens'] += record['input_tokens']
+        partial['by_type'][log_type]['output_tokens'] += record['output_tokens']
+
+        # 사용자별 통계
+        partial['by_user'][user_id]['requests'] += 1
+        partial['by_user'][user_id]['input_tokens'] += record['input_tokens']
+        partial['by_user'][user_id]['output_tokens'] += record['output_tokens']
+
+        # 날짜별 통계
+        if timestamp:
+            try:
+                date_str = timestamp.split('T')[0]
+                partial['by_date'][date_str]['requests'] += 1
+                partial['by_date'][date_str]['input_tokens'] += record['input_tokens']
+                partial['by_date'][date_str]['output_tokens'] += record['output_tokens']
+
+                # 시간대별 통계
+                hour = timestamp.split('T')[1].split(':')[0]
+                partial['by_hour'][hour] += 1
+            except (AttributeError, IndexError) as e:
+                # ISO 8601 형식이 아닌 timeStamp - 날짜/시간대 집계에서만 제외
+                logging.getLogger(__name__).debug(f"Unexpected timestamp {timestamp!r}: {e}")
+
+    def aggregate_records_by_user(self, records: Iterable[Dict]) -> Dict[str, Dict]:
+        """레코드 목록을 사용자별 부분 집계로 요약 (체크포인트 저장 단위)
+
+        레코드를 모아 두지 않고 하나씩 반영하므로 스트림을 그대로 넘길 수 있습니다.
+        사용자 ID가 없는 레코드는 '' 키로 묶으며, 사용자 필터와 관계없이 항상 포함됩니다.
+        """
+        partials = defaultdict(_new_partial_stats)
+        for record in records:
+            self._add_record(partials[record.get('userId') or ''], record)
+        return dict(partials)
+
+    def process_log_file(self, s3_key: str, record_filter: Optional[RecordFilter] = None) -> Optional[Dict[str, Dict]]:
+        """로그 파일 하나를 스트리밍으로 파싱해 사용자별 부분 집계 반환 (워커 스레드에서 실행)
+
+        중간에 연결이 끊기면 파일 단위로 처음부터 다시 집계합니다.
+
+        Args:
+            s3_key: 로그 파일 S3 키
+            record_filter: 레코드 조건 (지정하면 맞는 레코드만 집계)
+
+        Returns:
+            {사용자 ID: 부분 집계}, 다운로드/파싱에 실패하면 None
+        """
+        try:
+            return self._with_retries(
+                s3_key,
+                lambda: self.aggregate_records_by_user(self._iter_file_records(s3_key, record_filter))
+            )
         except Exception as e:
             self.logger.debug(f"Error parsing log file {s3_key}: {e}")
+            return None
+
+    def process_log_object(
+        self,
+        obj: Dict,
+        record_filter: Optional[RecordFilter] = None
+    ) -> Tuple[Optional[Dict[str, Dict]], bool]:
+        """체크포인트에 같은 ETag의 부분 집계가 있으면 사용하고, 없으면 다운로드해 계산
+
+        Args:
+            obj: 로그 파일 객체 (key, etag)
+            record_filter: 레코드 조건 (다운로드해 계산할 때 토큰 계산 전에 적용)
+
+        Returns:
+            (사용자별 부분 집계 또는 실패 시 None, 체크포인트 사용 여부)
+        """
+        file_stats = self._checkpointed_stats(obj, record_filter)
+        if file_stats is not None:
+            return file_stats, True
+        return self.process_log_file(obj['key'], record_filter), False
+
+    def _checkpointed_stats(
+        self,
+        obj: Dict,
+        record_filter: Optional[RecordFilter] = None
+    ) -> Optional[Dict[str, Dict]]:
+        """체크포인트에 저장된 같은 ETag의 부분 집계 (없거나 쓸 수 없으면 None)
+
+        체크포인트의 부분 집계는 파일 전체를 사용자별로 나눈 것이므로 사용자 조건은 합산할 때
+        적용할 수 있지만, 시간 조건이 있으면 체크포인트를 읽지 않고 다시 계산합니다.
+        """
+        use_checkpoint = record_filter is None or not record_filter.has_time_window
+        if self.checkpoint is None or self.refresh_checkpoint or not use_checkpoint:
+            return None
+        return self.checkpoint.get(obj['key'], obj['etag'], self.tokenizer)
+
+    def iter_file_stats(
+        self,
+        objects: Iterable[Dict],
+        record_filter: Optional[RecordFilter] = None
+    ) -> Iterator[Tuple[Dict, Optional[Dict], bool]]:
+        """로그 파일별 부분 집계를 스레드 풀(use_processes면 프로세스 풀)에서 계산해 완료되는 순서대로 반환
+
+        objects는 스트림이어도 되며(나열 중인 LogObjectStream), 제출할 때마다 하나씩 꺼냅니다.
+        record_filter를 지정하면 새로 계산하는 파일은 조건에 맞는 레코드만 집계합니다.
 
-        return results
+        Yields:
+            (로그 파일 객체, 사용자별 부분 집계 또는 None, 체크포인트 사용 여부)
+
+        동시에 제출해 두는 파일은 max_in_flight개로 제한하고, 하나가 끝날 때마다
+        다음 파일을 제출하므로 파일 수가 많아도 대기 작업과 결과가 쌓이지 않습니다.
+        """
+        if not self.max_processes:
+            yield from self._iter_file_stats(objects, record_filter)
+            return
+
+        # spawn: 나열 스레드가 도는 중에 fork하면 boto3 내부 잠금이 복사될 수 있음
+        with ProcessPoolExecutor(
+            max_workers=self.max_processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_process_worker,
+            initargs=(self.region, self.account_id, self.max_retries, self.token_cache_size,
+                      str(self.local_dir) if self.local_dir is not None else None)
+        ) as pool:
+            self.logger.info(f"Processing log files in {self.max_processes} processes")
+            yield from self._iter_file_stats_in_pool(objects, pool, record_filter)
+
+    def _iter_file_stats_in_pool(
+        self,
+        objects: Iterable[Dict],
+        pool: ProcessPoolExecutor,
+        record_filter: Optional[RecordFilter] = None
+    ) -> Iterator[Tuple[Dict, Optional[Dict], bool]]:
+        """체크포인트는 이 프로세스에서 조회하고, 나머지 파일은 PROCESS_BATCH_FILES개씩 묶어
+        프로세스 풀 작업 하나로 제출 (동시에 max_processes의 2배 묶음까지)"""
+        objects = iter(objects)
+        max_batches = self.max_processes * 2
+        pending = {}
+
+        def submit_next() -> Iterator[Tuple[Dict, Optional[Dict], bool]]:
+            # 체크포인트에 있는 파일은 바로 반환하며 다음 묶음을 채움
+            batch = []
+            for obj in objects:
+                file_stats = self._checkpointed_stats(obj, record_filter)
+                if file_stats is not None:
+                    yield obj, file_stats, True
+                    continue
+                batch.append(obj)
+                if len(batch) >= PROCESS_BATCH_FILES:
+                    break
+            if batch:
+                keys = [obj['key'] for obj in batch]
+                pending[pool.submit(_process_log_files_in_worker, keys, record_filter)] = batch
+
+        while len(pending) < max_batches:
+            submitted = len(pending)
+            yield from submit_next()
+            if len(pending) == submitted:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                yield from submit_next()
+                file_stats, token_stats = future.result()
+                self.token_counter.add_stats(token_stats)
+                for obj, stats in zip(batch, file_stats):
+                    yield obj, stats, False
+
+    def _iter_file_stats(
+        self,
+        objects: Iterable[Dict],
+        record_filter: Optional[RecordFilter] = None
+    ) -> Iterator[Tuple[Dict, Optional[Dict], bool]]:
+        objects = iter(objects)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='qcli-s3') as executor:
+            pending = {}
+
+            def submit_next() -> bool:
+                obj = next(objects, None)
+                if obj is None:
+                    return False
+                pending[executor.submit(self.process_log_object, obj, record_filter)] = obj
+                return True
+
+            while len(pending) < self.max_in_flight and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    obj = pending.pop(future)
+                    submit_next()
+                    file_stats, checkpointed = future.result()
+                    yield obj, file_stats, checkpointed
+
+    def _merge_file_stats(
+        self,
+        stats: Dict,
+        file_stats: Dict[str, Dict],
+        record_filter: Optional[RecordFilter] = None
+    ) -> Dict:
+        """파일의 사용자별 부분 집계 중 조건에 맞는 사용자만 전체 통계에 합산
+
+        Returns:
+            이 파일에서 합산한 합계 항목 (샘플링 오차 추정용)
+        """
+        totals = dict.fromkeys(SAMPLED_TOTALS, 0)
+
+        for user_id, partial in file_stats.items():
+            # 사용자 조건 적용 (체크포인트에서 읽은 파일 전체 집계용, 사용자 ID가 없는 레코드는 항상 포함)
+            if record_filter is not None and not record_filter.matches_user(user_id):
+                continue
+
+            self._merge_partial_stats(stats, partial)
+            for key, value in self._partial_totals(partial).items():
+                totals[key] += value
+
+        return totals
+
+    @staticmethod
+    def _merge_partial_stats(stats: Dict, partial: Dict):
+        """부분 집계를 전체 통계에 합산"""
+        stats['total_requests'] += partial['total_requests']
+
+        for type_name, counts in partial['by_type'].items():
+            for field, value in counts.items():
+                stats['by_type'][type_name][field] += value
+
+        for section in ('by_user', 'by_date'):
+            for key, counts in partial[section].items():
+                for field, value in counts.items():
+                    stats[section][key][field] += value
+
+        for hour, count in partial['by_hour'].items():
+            stats['by_hour'][hour] += count
 
     def analyze_usage(
         self,
         start_date: datetime,
         end_date: datetime,
-        user_pattern: str = None
+        user_pattern: str = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        max_files: Optional[int] = None,
+        user_ids: Optional[Iterable[str]] = None,
+        time_window: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None
     ) -> Dict:
         """
         지정된 기간의 사용량 분석
 
+        사용자/시간 조건은 레코드를 디코딩한 직후 적용해 맞지 않는 레코드의 토큰은 계산하지
+        않습니다. 조건을 적용해 새로 계산한 파일은 일부만 집계했으므로 체크포인트에 저장하지 않습니다.
+
         Args:
             start_date: 시작 날짜
             end_date: 종료 날짜
             user_pattern: 사용자 ID 필터 패턴
+            progress_callback: 파일 하나를 처리할 때마다 (처리한 파일 수, 전체 파일 수)로 호출
+                (전체 파일 수는 목록 나열이 끝나기 전에는 None)
+            max_files: 분석할 최대 파일 수 (None이면 전체 파일 분석, 넘으면 균등 간격 샘플링)
+            user_ids: 정확히 일치하는 사용자 ID 집합 (user_pattern과 함께 지정하면 둘 다 만족)
+            time_window: timeStamp 조건 (시작 포함, 종료 제외, UTC, None이면 제한 없음)
 
         Returns:
-            사용량 통계 딕셔너리
+            사용량 통계 딕셔너리 (샘플링한 경우 'sampling'에 스케일 비율과 오차 범위,
+            'tokenization'에 이번 분석의 토큰 캐시 적중률과 인코딩 처리량 포함)
         """
         self.logger.info(f"Analyzing usage from {start_date} to {end_date}")
+        token_stats_before = self.token_counter.stats()
 
-        # 로그 파일 목록 가져오기
-        log_files = self.list_log_files(start_date, end_date)
+        start_time, end_time = time_window or (None, None)
+        record_filter = RecordFilter(user_pattern, user_ids, start_time, end_time)
+        if not record_filter.active:
+            record_filter = None
 
-        if not log_files:
-            self.logger.warning("No log files found")
-            return self._empty_stats()
+        # 로그 파일 목록 (백그라운드에서 나열하며, 찾는 대로 분석 시작)
+        log_stream = self.iter_log_objects(start_date, end_date)
 
         # 통계 초기화
         stats = {
@@ -211,74 +1121,90 @@ class QCliS3LogAnalyzer:
                 'end': end_date.isoformat(),
                 'days': (end_date - start_date).days + 1
             },
-            'total_log_files': len(log_files),
+            'total_log_files': 0,
             'total_requests': 0,
             'by_type': {
                 'chat': {'count': 0, 'input_tokens': 0, 'output_tokens': 0},
                 'inline': {'count': 0, 'input_tokens': 0, 'output_tokens': 0}
             },
-            'by_user': defaultdict(lambda: {
-                'requests': 0,
-                'input_tokens': 0,
-                'output_tokens': 0
-            }),
-            'by_date': defaultdict(lambda: {
-                'requests': 0,
-                'input_tokens': 0,
-                'output_tokens': 0
-            }),
+            'by_user': defaultdict(_usage_counter),
+            'by_date': defaultdict(_usage_counter),
             'by_hour': defaultdict(int),
             'total_input_tokens': 0,
             'total_output_tokens': 0,
-            'total_tokens': 0
+            'total_tokens': 0,
+            'checkpointed_files': 0,
+            'sampling': None,
+            'tokenization': None
         }
 
-        # 로그 파일 분석 (샘플링: 너무 많으면 일부만)
-        max_files = 500  # 최대 500개 파일만 분석
-        sample_files = log_files if len(log_files) <= max_files else log_files[::len(log_files)//max_files]
-
-        self.logger.info(f"Processing {len(sample_files)} log files (total: {len(log_files)})")
-
-        for i, log_file in enumerate(sample_files):
-            if i % 50 == 0:
-                self.logger.info(f"Processing file {i+1}/{len(sample_files)}")
-
-            records = self.parse_log_file(log_file)
-
-            for record in records:
-                # 사용자 필터 적용
-                if user_pattern and record.get('userId'):
-                    if user_pattern.lower() not in record['userId'].lower():
-                        continue
-
-                log_type = record['type']
-                user_id = record.get('userId', 'unknown')
-                timestamp = record.get('timestamp', '')
-
-                # 기본 통계
-                stats['total_requests'] += 1
-                stats['by_type'][log_type]['count'] += 1
-                stats['by_type'][log_type]['input_tokens'] += record['input_tokens']
-                stats['by_type'][log_type]['output_tokens'] += record['output_tokens']
-
-                # 사용자별 통계
-                stats['by_user'][user_id]['requests'] += 1
-                stats['by_user'][user_id]['input_tokens'] += record['input_tokens']
-                stats['by_user'][user_id]['output_tokens'] += record['output_tokens']
-
-                # 날짜별 통계
-                if timestamp:
-                    try:
-                        date_str = timestamp.split('T')[0]
-                        stats['by_date'][date_str]['requests'] += 1
-                        stats['by_date'][date_str]['input_tokens'] += record['input_tokens']
-                        stats['by_date'][date_str]['output_tokens'] += record['output_tokens']
-
-                        # 시간대별 통계
-                        hour = timestamp.split('T')[1].split(':')[0]
-                        stats['by_hour'][hour] += 1
-                    except:
-                        pass
+        # 로그 파일 분석 (max_files를 지정한 경우에만 샘플링 - 전체 목록을 받은 뒤 시작)
+        if max_files:
+            log_files = list(log_stream)
+            sample_files = self._sample_files(log_files, max_files)
+            sampled = len(sample_files) < len(log_files)
+            stats['total_log_files'] = len(log_files)
+
+            def total_files():
+                return len(sample_files)
+        else:
+            sample_files = log_stream
+            sampled = False
+
+            def total_files():
+                return log_stream.found if log_stream.done else None
+
+        file_totals = []
+        processed = 0
+
+        self.logger.info(f"Processing log files (sampled: {sampled}, workers: {self.max_workers}, "
+                         f"processes: {self.max_processes})")
+
+        # 체크포인트에 같은 ETag로 저장된 파일은 다운로드하지 않고 저장된 부분 집계 사용
+        new_entries = []
+        try:
+            for obj, file_stats, checkpointed in self.iter_file_stats(sample_files, record_filter):
+                processed += 1
+                if checkpointed:
+                    stats['checkpointed_files'] += 1
+                elif file_stats is None:
+                    # 실패한 파일은 체크포인트에 남기지 않아 다음 분석에서 다시 시도
+                    file_stats = {}
+                elif self.checkpoint is not None and record_filter is None:
+                    new_entries.append((obj['key'], obj['etag'], file_stats))
+                    if len(new_entries) >= CHECKPOINT_BATCH_SIZE:
+                        self.checkpoint.put_many(new_entries, self.tokenizer)
+                        new_entries = []
+
+                totals = self._merge_file_stats(stats, file_stats, record_filter)
+                if sampled:
+                    file_totals.append(totals)
+
+                if processed % 50 == 0:
+                    self.logger.info(f"Processed {processed}/{total_files() or '?'} files")
+                if progress_callback:
+                    progress_callback(processed, total_files())
+        finally:
+            # 중단되더라도 처리한 파일까지는 저장
+            if new_entries:
+                self.checkpoint.put_many(new_entries, self.tokenizer)
+
+        if not sampled:
+            stats['total_log_files'] = processed
+
+        if not stats['total_log_files']:
+            self.logger.warning("No log files found")
+            return self._empty_stats()
+
+        self.logger.info(f"Processed {processed} log files (total: {stats['total_log_files']}, "
+                         f"checkpointed: {stats['checkpointed_files']})")
+
+        stats['tokenization'] = TokenCounter.stats_delta(token_stats_before, self.token_counter.stats())
+        self.logger.info(f"Token cache hit rate: {stats['tokenization']['cache_hit_rate']:.1%} "
+                         f"({stats['tokenization']['cache_hits']}/{stats['tokenization']['lookups']}), "
+                         f"incremental: {stats['tokenization']['incremental_counts']} "
+                         f"({stats['tokenization']['reused_chars']:,} chars reused), "
+                         f"{stats['tokenization']['tokens_per_second']:,.0f} tokens/s")
 
         # 총합 계산
         for type_stats in stats['by_type'].values():
@@ -292,22 +1218,78 @@ class QCliS3LogAnalyzer:
         stats['by_date'] = dict(sorted(stats['by_date'].items()))
         stats['by_hour'] = dict(sorted(stats['by_hour'].items()))
 
-        # 샘플링 비율 적산 (전체 파일 수에 맞게 스케일링)
-        if len(sample_files) < len(log_files):
-            scale_factor = len(log_files) / len(sample_files)
-            self.logger.info(f"Scaling results by factor: {scale_factor:.2f}")
+        # 샘플링 비율 적산 (전체 파일 수에 맞게 모든 집계를 같은 비율로 스케일링)
+        if sampled:
+            stats['sampling'] = self._sampling_error(file_totals, stats['total_log_files'])
+            self.logger.info(f"Scaling results by factor: {stats['sampling']['scale_factor']:.2f}")
+            self._scale_stats(stats, stats['sampling']['scale_factor'])
 
-            stats['total_requests'] = int(stats['total_requests'] * scale_factor)
-            stats['total_input_tokens'] = int(stats['total_input_tokens'] * scale_factor)
-            stats['total_output_tokens'] = int(stats['total_output_tokens'] * scale_factor)
-            stats['total_tokens'] = int(stats['total_tokens'] * scale_factor)
+        return stats
 
-            for type_name in stats['by_type']:
-                stats['by_type'][type_name]['count'] = int(stats['by_type'][type_name]['count'] * scale_factor)
-                stats['by_type'][type_name]['input_tokens'] = int(stats['by_type'][type_name]['input_tokens'] * scale_factor)
-                stats['by_type'][type_name]['output_tokens'] = int(stats['by_type'][type_name]['output_tokens'] * scale_factor)
+    @staticmethod
+    def _sample_files(log_files: List[Dict], max_files: Optional[int]) -> List[Dict]:
+        """균등 간격으로 최대 max_files개 선택 (None이거나 파일이 적으면 전체)"""
+        if not max_files or len(log_files) <= max_files:
+            return log_files
+        return [log_files[i * len(log_files) // max_files] for i in range(max_files)]
 
-        return stats
+    @staticmethod
+    def _partial_totals(partial: Dict) -> Dict:
+        """파일별 부분 집계의 합계 항목 (샘플링 오차 추정용)"""
+        input_tokens = sum(t['input_tokens'] for t in partial['by_type'].values())
+        output_tokens = sum(t['output_tokens'] for t in partial['by_type'].values())
+        return {
+            'total_requests': partial['total_requests'],
+            'total_input_tokens': input_tokens,
+            'total_output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens
+        }
+
+    @staticmethod
+    def _sampling_error(file_totals: List[Dict], total_files: int) -> Dict:
+        """파일 단위 표본으로 합계 추정치의 오차 범위 계산
+
+        파일을 표본 단위로 보고 합계 = 전체 파일 수 x 파일당 평균으로 추정하며,
+        표준오차 = N * sqrt((1 - n/N) * s² / n) (유한 모집단 보정 포함)입니다.
+        """
+        sampled_files = len(file_totals)
+        finite_correction = 1 - sampled_files / total_files
+        margin_of_error = {}
+        for key in SAMPLED_TOTALS:
+            values = [totals[key] for totals in file_totals]
+            variance = statistics.variance(values) if sampled_files > 1 else 0.0
+            standard_error = total_files * math.sqrt(finite_correction * variance / sampled_files)
+            margin_of_error[key] = int(round(SAMPLING_Z_SCORE * standard_error))
+
+        return {
+            'sampled_files': sampled_files,
+            'total_files': total_files,
+            'scale_factor': total_files / sampled_files,
+            'confidence': SAMPLING_CONFIDENCE,
+            'margin_of_error': margin_of_error
+        }
+
+    @staticmethod
+    def _scale_stats(stats: Dict, scale_factor: float):
+        """합계와 모든 세부 집계(타입/사용자/날짜/시간대별)를 같은 비율로 스케일링"""
+        def scale(value):
+            return int(round(value * scale_factor))
+
+        for counts in stats['by_type'].values():
+            for field in counts:
+                counts[field] = scale(counts[field])
+
+        for section in ('by_user', 'by_date'):
+            for counts in stats[section].values():
+                for field in counts:
+                    counts[field] = scale(counts[field])
+
+        stats['by_hour'] = {hour: scale(count) for hour, count in stats['by_hour'].items()}
+
+        stats['total_requests'] = scale(stats['total_requests'])
+        stats['total_input_tokens'] = scale(stats['total_input_tokens'])
+        stats['total_output_tokens'] = scale(stats['total_output_tokens'])
+        stats['total_tokens'] = stats['total_input_tokens'] + stats['total_output_tokens']
 
     def _empty_stats(self) -> Dict:
         """빈 통계 딕셔너리 반환"""
@@ -324,5 +1306,8 @@ class QCliS3LogAnalyzer:
             'by_hour': {},
             'total_input_tokens': 0,
             'total_output_tokens': 0,
-            'total_tokens': 0
+            'total_tokens': 0,
+            'checkpointed_files': 0,
+            'sampling': None,
+            'tokenization': None
         }
@@ -0,0 +1,225 @@
+"""
+Athena 쿼리 조건절 / 가격 CTE 빌더
+
+파티션 컬럼을 함수로 감싼 조건(CAST(CONCAT(year, ...)) BETWEEN ...)은 Athena가
+파티션 프루닝에 사용하지 못해 조회 기간과 관계없이 테이블 전체 파티션을 나열/스캔할 수
+있습니다. 여기의 함수들은 컬럼을 그대로 비교하는 조건(IN 목록, 월 단위 OR)을 만들어
+필요한 파티션만 읽도록 하고, 정확한 날짜 조건은 잔여 필터로 함께 붙입니다.
+
+Bedrock 쿼리는 가격 카탈로그를 VALUES CTE로 인라인해 모델/날짜별 가격과 조인하므로,
+비용이 Athena 결과에 바로 포함됩니다. 조인 키는 pricing.ModelPriceResolver와 같은
+정규화/가장 긴 키 일치 규칙으로 계산하므로 Athena와 pandas 비용 계산 결과가 같습니다.
+"""
+
+import calendar
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Iterator, List
+
+import numpy as np
+
+from pricing import DEFAULT_PRICING_MODEL, default_resolver, get_pricing_catalog
+
+# QCli Date 컬럼 IN 목록 최대 일수 (넘으면 parse_datetime 범위 조건 사용)
+MAX_DATE_IN_LIST = 400
+
+# Bedrock 로그 행의 날짜 (year/month/day 파티션 값)
+BEDROCK_LOG_DATE_SQL = "CAST(CONCAT(year, '-', LPAD(month, 2, '0'), '-', LPAD(day, 2, '0')) AS DATE)"
+
+# 정규화한 모델 ID (pricing.ModelPriceResolver.normalize와 같은 규칙)
+# 예: arn:...:inference-profile/us.anthropic.claude-3-haiku-20240307-v1:0 -> claude-3-haiku-20240307
+BEDROCK_NORMALIZED_MODEL_SQL = (
+    "regexp_extract(regexp_replace(regexp_extract(lower(trim(modelId)), '[^/]+$'), "
+    "'(-v[0-9]+(:[0-9]+)?|:[0-9]+)$', ''), '[^.]+$')"
+)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def iter_dates(start_date, end_date) -> Iterator[date]:
+    """start_date ~ end_date (양 끝 포함) 날짜 순회"""
+    current, end = _as_date(start_date), _as_date(end_date)
+    while current <= end:
+        yield current
+        current += timedelta(days=1)
+
+
+def _partition_values(numbers: List[int]) -> List[str]:
+    # 파티션 값은 보통 2자리('01')지만, 기존 LPAD 정규화와 같이 한 자리('1')도 허용
+    values = []
+    for number in numbers:
+        values.append(f"{number:02d}")
+        if number < 10:
+            values.append(str(number))
+    return values
+
+
+def _in_list(column: str, values: List[str]) -> str:
+    quoted = ", ".join(f"'{value}'" for value in values)
+    return f"{column} IN ({quoted})"
+
+
+def bedrock_partition_predicate(start_date, end_date) -> str:
+    """Bedrock 로그(year/month/day 파티션) 날짜 조건 생성
+
+    월 전체가 포함되면 월 단위로, 일부만 포함되면 일 단위로 파티션 조건을 만들고
+    (연도 전체가 포함되면 연 단위), 기존과 같은 정확한 날짜 조건을 AND로 붙입니다.
+
+    Args:
+        start_date: 조회 시작 날짜 (date 또는 datetime)
+        end_date: 조회 종료 날짜 (date 또는 datetime, 포함)
+
+    Returns:
+        WHERE 절에 그대로 넣을 수 있는 SQL 조건식
+    """
+    start, end = _as_date(start_date), _as_date(end_date)
+    exact_filter = (
+        f"{BEDROCK_LOG_DATE_SQL}\n"
+        f"            BETWEEN DATE '{start.strftime('%Y-%m-%d')}' AND DATE '{end.strftime('%Y-%m-%d')}'"
+    )
+
+    # (연, 월) -> 포함된 일 목록
+    days_by_month = OrderedDict()
+    for day in iter_dates(start, end):
+        days_by_month.setdefault((day.year, day.month), []).append(day.day)
+
+    if not days_by_month:
+        return exact_filter
+
+    # 연도별로 전체 포함된 월과 일부만 포함된 월을 나눔
+    terms = []
+    years = OrderedDict()
+    for (year, month), days in days_by_month.items():
+        full = len(days) == calendar.monthrange(year, month)[1]
+        years.setdefault(year, {"full": [], "partial": []})
+        if full:
+            years[year]["full"].append(month)
+        else:
+            years[year]["partial"].append((month, days))
+
+    for year, months in years.items():
+        if len(months["full"]) == 12:
+            terms.append(f"year = '{year}'")
+            continue
+        if months["full"]:
+            terms.append(
+                f"(year = '{year}' AND {_in_list('month', _partition_values(months['full']))})"
+            )
+        for month, days in months["partial"]:
+            terms.append(
+                f"(year = '{year}' AND {_in_list('month', _partition_values([month]))}"
+                f" AND {_in_list('day', _partition_values(days))})"
+            )
+
+    partition_filter = "\n            OR ".join(terms)
+    return f"({partition_filter})\n            AND {exact_filter}"
+
+
+def qcli_date_predicate(start_date, end_date, column: str = "Date") -> str:
+    """QCli 리포트(Date 컬럼, 'MM-dd-yyyy' 문자열) 날짜 조건 생성
+
+    행마다 parse_datetime을 호출하는 대신 날짜 문자열 IN 목록으로 비교합니다.
+    기간이 MAX_DATE_IN_LIST일을 넘으면 기존 parse_datetime 범위 조건을 사용합니다.
+
+    Args:
+        start_date: 조회 시작 날짜 (date 또는 datetime)
+        end_date: 조회 종료 날짜 (date 또는 datetime, 포함)
+        column: 날짜 컬럼명
+
+    Returns:
+        WHERE 절에 그대로 넣을 수 있는 SQL 조건식
+    """
+    dates = [day.strftime("%m-%d-%Y") for day in iter_dates(start_date, end_date)]
+
+    if not dates or len(dates) > MAX_DATE_IN_LIST:
+        start, end = _as_date(start_date), _as_date(end_date)
+        return (
+            f"parse_datetime({column}, 'MM-dd-yyyy') BETWEEN parse_datetime('{start.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')\n"
+            f"            AND parse_datetime('{end.strftime('%m-%d-%Y')}', 'MM-dd-yyyy')"
+        )
+
+    return _in_list(column, dates)
+
+
+def bedrock_model_key_sql(region: str = "default") -> str:
+    """행별 가격 키 SQL 식 (pricing.ModelPriceResolver.resolve와 같은 규칙)
+
+    정규화한 모델 ID에서 리전 가격 키 정규식(긴 키 우선)과 일치하는 부분을 모두 찾아
+    가장 긴 키를 고르고, 일치하는 키가 없으면 기본 가격 모델(Claude 3 Haiku) 키를 사용합니다.
+    예: us.anthropic.claude-3-haiku-20240307-v1:0:200k -> claude-3-haiku-20240307
+
+    Args:
+        region: AWS 리전 (카탈로그에 없으면 default)
+
+    Returns:
+        prices.model_key와 비교할 SQL 식
+    """
+    default_key = DEFAULT_PRICING_MODEL.lower()
+    pattern = default_resolver.key_pattern(region)
+    if pattern is None:
+        return f"'{default_key}'"
+
+    pattern = pattern.replace("'", "''")
+    return (
+        f"COALESCE(reduce(regexp_extract_all({BEDROCK_NORMALIZED_MODEL_SQL}, '{pattern}'), "
+        "CAST(NULL AS VARCHAR), "
+        "(longest, key) -> IF(longest IS NULL OR length(key) > length(longest), key, longest), "
+        f"longest -> longest), '{default_key}')"
+    )
+
+
+def bedrock_price_join(region: str = "default") -> str:
+    """가격 CTE 조인 절 (로그 날짜에 적용되던 가격 한 행과 매칭, bedrock_price_cte 필요)"""
+    return (
+        f"LEFT JOIN prices ON prices.model_key = {bedrock_model_key_sql(region)}\n"
+        f"            AND {BEDROCK_LOG_DATE_SQL} BETWEEN prices.effective_from AND prices.effective_to"
+    )
+
+
+def bedrock_price_cte(region: str = "default") -> str:
+    """리전별 가격 카탈로그를 VALUES CTE로 변환
+
+    각 가격 항목의 적용 기간(effective_from ~ effective_to)을 포함하므로 조인만으로
+    로그 날짜에 맞는 가격이 선택됩니다. 첫 항목은 그 이전 날짜에도 적용합니다.
+
+    Args:
+        region: AWS 리전 (카탈로그에 없으면 default)
+
+    Returns:
+        SELECT 앞에 붙일 "WITH prices (...) AS (VALUES ...)" 절
+    """
+    rows = []
+    for key, (dates, input_prices, output_prices) in get_pricing_catalog().table(region).items():
+        for i in range(len(dates)):
+            effective_from = "1970-01-01" if i == 0 else str(dates[i])
+            effective_to = (
+                str(dates[i + 1] - np.timedelta64(1, "D")) if i + 1 < len(dates) else "9999-12-31"
+            )
+            rows.append(
+                f"('{key.lower()}', DATE '{effective_from}', DATE '{effective_to}', "
+                f"{float(input_prices[i])!r}, {float(output_prices[i])!r})"
+            )
+
+    values = ",\n            ".join(rows)
+    return (
+        "WITH prices (model_key, effective_from, effective_to, input_price, output_price) AS (\n"
+        f"            VALUES\n            {values}\n"
+        "        )"
+    )
+
+
+def bedrock_cost_expression(region: str = "default") -> str:
+    """행별 비용(USD) SQL 식 (bedrock_price_join 필요)
+
+    가격 테이블에 없는 모델은 조인 키가 기본 가격 모델(Claude 3 Haiku)이 되어 그날의 가격이
+    적용되며, 조인되는 가격 행이 없을 때만 기본 가격 모델의 현재 가격을 적용합니다.
+    """
+    default_pricing = get_pricing_catalog().prices_on(region)[DEFAULT_PRICING_MODEL]
+    return (
+        f"CAST(COALESCE(input.inputTokenCount, 0) AS DOUBLE)"
+        f" * CAST(COALESCE(prices.input_price, {default_pricing['input']!r}) AS DOUBLE) / 1000"
+        f" + CAST(COALESCE(output.outputTokenCount, 0) AS DOUBLE)"
+        f" * CAST(COALESCE(prices.output_price, {default_pricing['output']!r}) AS DOUBLE) / 1000"
+    )
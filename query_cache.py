@@ -0,0 +1,240 @@
+"""
+Athena 쿼리 결과 디스크 캐시
+
+같은 SQL을 다시 실행할 때 Athena 스캔 없이 로컬에 저장된 결과를 반환합니다.
+- 키: 정규화된 SQL + 데이터베이스 + 리전 + 계정 ID
+- 위치: $XDG_CACHE_HOME/bedrock_usage (기본 ~/.cache/bedrock_usage)
+- 저장 형식: Parquet (pyarrow 설치 시) 또는 gzip 압축 pickle
+- 만료: 닫힌 기간(오늘 이전 종료)은 긴 TTL, 오늘을 포함하는 기간은 짧은 TTL
+- 용량 제한: 전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+def user_cache_dir(app_name: str = "bedrock_usage") -> Path:
+    """사용자 캐시 디렉토리 ($XDG_CACHE_HOME/<app_name>, 없으면 ~/.cache/<app_name>)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / app_name
+
+
+# 기본 캐시 위치 (저장소 체크아웃이 아닌 사용자 캐시 디렉토리, cache_dir로 변경 가능)
+DEFAULT_CACHE_DIR = user_cache_dir()
+
+# 캐시 전체 용량 상한 (바이트)
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# 닫힌 기간(데이터가 더 이상 바뀌지 않음)의 TTL: 30일
+CLOSED_RANGE_TTL = 30 * 24 * 3600
+
+# 오늘을 포함하는 기간(로그가 계속 쌓임)의 TTL: 5분
+OPEN_RANGE_TTL = 5 * 60
+
+# 결과 DataFrame 형식(컬럼 타입 등)이 바뀌면 올려서 이전 캐시 항목을 무효화
+CACHE_FORMAT_VERSION = 3
+
+
+def cache_ttl_for_range(end_date) -> float:
+    """조회 기간의 종료일로 캐시 TTL 결정
+
+    Args:
+        end_date: 조회 종료 날짜 (date 또는 datetime)
+
+    Returns:
+        TTL (초) - 종료일이 오늘(UTC) 이전이면 CLOSED_RANGE_TTL, 아니면 OPEN_RANGE_TTL
+    """
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+
+    today = datetime.utcnow().date()
+    if isinstance(end_date, date) and end_date < today:
+        return CLOSED_RANGE_TTL
+    return OPEN_RANGE_TTL
+
+
+def normalize_sql(query: str) -> str:
+    """캐시 키용 SQL 정규화 (주석 제거, 공백 압축)
+
+    f-string 들여쓰기나 줄바꿈 차이로 같은 쿼리가 다른 키를 갖지 않도록 합니다.
+    문자열 리터럴의 대소문자는 의미가 있으므로 그대로 둡니다.
+    """
+    query = re.sub(r"--[^\n]*", " ", query)
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+class QueryResultCache:
+    """크기 제한(LRU)과 TTL을 갖는 Athena 쿼리 결과 디스크 캐시
+
+    결과 파일은 cache_dir 아래에 저장되고, 키/크기/만료/최근 사용 시각은
+    cache_dir/index.sqlite3 에 기록됩니다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        logger=None,
+    ):
+        """
+        Args:
+            cache_dir: 캐시 디렉토리
+            max_bytes: 캐시 전체 용량 상한 (바이트)
+            logger: 로거 인스턴스 (None이면 기본 로거 사용)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self.suffix = ".parquet" if PARQUET_AVAILABLE else ".pkl.gz"
+
+        # 동시 실행 쿼리가 여러 스레드에서 캐시에 접근할 수 있음
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "index.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, database: str, region: str, account_id: str) -> str:
+        """정규화된 SQL, 데이터베이스, 리전, 계정 ID로 캐시 키 생성"""
+        raw = "\x1f".join(
+            [
+                str(CACHE_FORMAT_VERSION),
+                normalize_sql(query),
+                database,
+                region,
+                str(account_id),
+            ]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """캐시된 결과 조회 (없거나 만료되었으면 None)"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            filename, expires_at = row
+            if expires_at <= now:
+                self._remove(key, filename)
+                self._conn.commit()
+                return None
+
+            try:
+                df = self._read(self.cache_dir / filename)
+            except Exception as e:
+                self.logger.warning(f"Failed to read cache entry {key[:12]}: {e}")
+                self._remove(key, filename)
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, ttl: float):
+        """결과 저장 후 용량 상한을 넘으면 LRU 순으로 삭제"""
+        now = time.time()
+        filename = f"{key}{self.suffix}"
+        path = self.cache_dir / filename
+
+        with self._lock:
+            try:
+                self._write(df, path)
+            except Exception as e:
+                self.logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+                return
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, filename, path.stat().st_size, now, now + ttl, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            for key, filename in self._conn.execute(
+                "SELECT key, filename FROM entries"
+            ).fetchall():
+                self._remove(key, filename)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """만료된 항목 삭제 후, 용량 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        for key, filename in self._conn.execute(
+            "SELECT key, filename FROM entries WHERE expires_at <= ?", (now,)
+        ).fetchall():
+            self._remove(key, filename)
+
+        total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0) FROM entries"
+        ).fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        for key, filename, size_bytes in self._conn.execute(
+            "SELECT key, filename, size_bytes FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(key, filename)
+            total_bytes -= size_bytes
+            self.logger.debug(f"Evicted cache entry {key[:12]} ({size_bytes} bytes)")
+
+    def _remove(self, key: str, filename: str):
+        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            (self.cache_dir / filename).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _write(self, df: pd.DataFrame, path: Path):
+        if PARQUET_AVAILABLE:
+            df.to_parquet(path, index=False)
+        else:
+            df.to_pickle(path, compression="gzip")
+
+    def _read(self, path: Path) -> pd.DataFrame:
+        if PARQUET_AVAILABLE:
+            return pd.read_parquet(path)
+        return pd.read_pickle(path, compression="gzip")
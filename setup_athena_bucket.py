@@ -2,9 +2,11 @@
 """Athena 분석 환경 통합 설정 스크립트"""
 
 import boto3
-import time
 from datetime import datetime
 
+from athena_utils import wait_for_query_completion
+from query_builder import bedrock_partition_predicate
+
 REGIONS = {
     "us-east-1": "US East (N. Virginia)",
     "us-west-2": "US West (Oregon)",
@@ -14,6 +16,33 @@ REGIONS = {
     "ap-southeast-1": "Asia Pacific (Singapore)"
 }
 
+# 파티션 프로젝션 연도 범위 (Bedrock Model Invocation Logging 출시 연도부터)
+PROJECTION_YEAR_RANGE = "2023,2099"
+
+def build_partition_projection(log_root, account_id, region):
+    """bedrock_invocation_logs 파티션 프로젝션 테이블 속성 생성
+
+    Athena가 year/month/day 파티션 값과 S3 경로를 직접 계산하므로
+    ALTER TABLE ADD PARTITION 없이 과거 날짜 로그도 조회되고, 쿼리 계획 시
+    Glue 파티션 메타데이터 조회도 필요 없습니다.
+    """
+    return {
+        'projection.enabled': 'true',
+        'projection.year.type': 'integer',
+        'projection.year.range': PROJECTION_YEAR_RANGE,
+        'projection.year.digits': '4',
+        'projection.month.type': 'integer',
+        'projection.month.range': '1,12',
+        'projection.month.digits': '2',
+        'projection.day.type': 'integer',
+        'projection.day.range': '1,31',
+        'projection.day.digits': '2',
+        'storage.location.template': (
+            f'{log_root}AWSLogs/{account_id}/BedrockModelInvocationLogs/{region}/'
+            '${year}/${month}/${day}/'
+        )
+    }
+
 def get_account_id():
     return boto3.client('sts').get_caller_identity()['Account']
 
@@ -35,8 +64,11 @@ def create_bucket_if_not_exists(s3_client, bucket_name, region):
             print(f"❌ 버킷 생성 실패: {e}")
             raise
 
-def create_glue_resource(glue_client, resource_type, name, config):
-    """Glue 리소스 생성 (데이터베이스 또는 테이블)"""
+def create_glue_resource(glue_client, resource_type, name, config, update_existing=False):
+    """Glue 리소스 생성 (데이터베이스 또는 테이블)
+
+    update_existing이 True면 이미 존재하는 테이블을 config로 갱신합니다.
+    """
     try:
         if resource_type == 'database':
             glue_client.create_database(DatabaseInput=config)
@@ -45,7 +77,15 @@ def create_glue_resource(glue_client, resource_type, name, config):
         print(f"✅ Glue {resource_type} 생성: {name}")
     except Exception as e:
         if "AlreadyExistsException" in str(e):
-            print(f"ℹ️  {resource_type} 존재: {name}")
+            if update_existing and resource_type == 'table':
+                try:
+                    glue_client.update_table(**config)
+                    print(f"✅ Glue {resource_type} 갱신: {name}")
+                except Exception as update_error:
+                    # 예: glue:UpdateTable 권한 없음 - 기존 테이블은 그대로 두고 계속 진행
+                    print(f"❌ {resource_type} 갱신 실패: {update_error}")
+            else:
+                print(f"ℹ️  {resource_type} 존재: {name}")
         else:
             print(f"❌ {resource_type} 생성 실패: {e}")
 
@@ -59,14 +99,8 @@ def execute_athena_query(athena_client, query, database, output_location):
     return response['QueryExecutionId']
 
 def wait_for_query(athena_client, query_id, timeout=30):
-    """Athena 쿼리 완료 대기"""
-    for _ in range(timeout):
-        result = athena_client.get_query_execution(QueryExecutionId=query_id)
-        status = result['QueryExecution']['Status']['State']
-        if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-            return status
-        time.sleep(1)
-    return 'TIMEOUT'
+    """Athena 쿼리 완료 대기 (적응형 백오프, 마감 초과 시 'TIMEOUT')"""
+    return wait_for_query_completion(athena_client, query_id, timeout=timeout)['state']
 
 def setup_region(region, account_id):
     """단일 리전 설정"""
@@ -98,12 +132,17 @@ def setup_region(region, account_id):
         if s3_config:
             log_bucket = s3_config.get('bucketName')
             log_prefix = s3_config.get('keyPrefix', 'bedrock-logs/')
+            if log_prefix and not log_prefix.endswith('/'):
+                log_prefix += '/'
+            log_root = f"s3://{log_bucket}/{log_prefix}"
             
-            # Glue 테이블 생성
+            # Glue 테이블 생성 (파티션 프로젝션 사용, 기존 테이블도 갱신)
             create_glue_resource(glue, 'table', 'bedrock_invocation_logs', {
                 'DatabaseName': 'bedrock_analytics',
                 'TableInput': {
                     'Name': 'bedrock_invocation_logs',
+                    'TableType': 'EXTERNAL_TABLE',
+                    'Parameters': build_partition_projection(log_root, account_id, region),
                     'StorageDescriptor': {
                         'Columns': [
                             {'Name': 'timestamp', 'Type': 'string'},
@@ -114,7 +153,7 @@ def setup_region(region, account_id):
                             {'Name': 'input', 'Type': 'struct<inputTokenCount:int>'},
                             {'Name': 'output', 'Type': 'struct<outputTokenCount:int>'}
                         ],
-                        'Location': f's3://{log_bucket}/{log_prefix}',
+                        'Location': log_root,
                         'InputFormat': 'org.apache.hadoop.mapred.TextInputFormat',
                         'OutputFormat': 'org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat',
                         'SerdeInfo': {'SerializationLibrary': 'org.openx.data.jsonserde.JsonSerDe'}
@@ -125,27 +164,17 @@ def setup_region(region, account_id):
                         {'Name': 'day', 'Type': 'string'}
                     ]
                 }
-            })
-            
-            # 4. 파티션 추가
-            today = datetime.now()
-            year, month, day = today.strftime('%Y'), today.strftime('%m'), today.strftime('%d')
+            }, update_existing=True)
             
-            partition_query = f"""
-            ALTER TABLE bedrock_analytics.bedrock_invocation_logs 
-            ADD IF NOT EXISTS PARTITION (year='{year}', month='{month}', day='{day}')
-            LOCATION 's3://{log_bucket}/AWSLogs/{account_id}/BedrockModelInvocationLogs/{region}/{year}/{month}/{day}/'
-            """
-            
-            query_id = execute_athena_query(athena, partition_query, 'bedrock_analytics', 
-                                          f's3://{analytics_bucket}/query-results/')
-            print(f"✅ 파티션 추가: {year}/{month}/{day}")
+            # 4. 파티션 프로젝션 확인 (파티션을 따로 추가할 필요 없음)
+            print(f"✅ 파티션 프로젝션: year {PROJECTION_YEAR_RANGE.replace(',', '~')}, "
+                  f"{log_root}AWSLogs/{account_id}/BedrockModelInvocationLogs/{region}/yyyy/MM/dd/")
             
-            # 5. 데이터 테스트
+            # 5. 데이터 테스트 (오늘(UTC) 파티션만 조회)
             test_query = f"""
             SELECT COUNT(*) as total_records
-            FROM bedrock_analytics.bedrock_invocation_logs 
-            WHERE year='{year}' AND month='{month}' AND day='{day}'
+            FROM bedrock_analytics.bedrock_invocation_logs
+            WHERE {bedrock_partition_predicate(datetime.utcnow(), datetime.utcnow())}
             """
             
             query_id = execute_athena_query(athena, test_query, 'bedrock_analytics',
@@ -10,10 +10,11 @@ Amazon Q CLI 사용량 추적을 위한 설정 스크립트
 
 import boto3
 import json
-import time
 from datetime import datetime
 import sys
 
+from athena_utils import wait_for_query_completion
+
 
 def setup_qcli_analytics(region="us-east-1", recreate_table=False, create_sample_data=False):
     """Amazon Q CLI 분석 환경 설정
@@ -133,19 +134,14 @@ def setup_qcli_analytics(region="us-east-1", recreate_table=False, create_sample
             query_execution_id = response['QueryExecutionId']
 
             # 쿼리 완료 대기
-            for i in range(30):
-                result = athena.get_query_execution(QueryExecutionId=query_execution_id)
-                status = result['QueryExecution']['Status']['State']
-
-                if status == 'SUCCEEDED':
-                    print(f"  ✅ 기존 테이블 삭제 완료")
-                    break
-                elif status in ['FAILED', 'CANCELLED']:
-                    error_msg = result['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-                    print(f"  ⚠️  테이블 삭제 실패: {error_msg}")
-                    break
+            result = wait_for_query_completion(athena, query_execution_id, timeout=30)
+            status = result['state']
 
-                time.sleep(1)
+            if status == 'SUCCEEDED':
+                print(f"  ✅ 기존 테이블 삭제 완료")
+            elif status in ['FAILED', 'CANCELLED']:
+                error_msg = result['reason'] or 'Unknown error'
+                print(f"  ⚠️  테이블 삭제 실패: {error_msg}")
 
         except Exception as e:
             print(f"  ⚠️  테이블 삭제 실패: {str(e)}")
@@ -223,20 +219,14 @@ def setup_qcli_analytics(region="us-east-1", recreate_table=False, create_sample
         print(f"  ⏳ Athena 쿼리 실행 중... (ID: {query_execution_id})")
 
         # 쿼리 완료 대기 (최대 60초)
-        max_wait = 60
-        for i in range(max_wait):
-            result = athena.get_query_execution(QueryExecutionId=query_execution_id)
-            status = result['QueryExecution']['Status']['State']
-
-            if status == 'SUCCEEDED':
-                print(f"  ✅ CSV 리포트 테이블 생성 완료")
-                break
-            elif status in ['FAILED', 'CANCELLED']:
-                error_msg = result['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-                print(f"  ❌ 테이블 생성 실패: {error_msg}")
-                break
+        result = wait_for_query_completion(athena, query_execution_id, timeout=60)
+        status = result['state']
 
-            time.sleep(1)
+        if status == 'SUCCEEDED':
+            print(f"  ✅ CSV 리포트 테이블 생성 완료")
+        elif status in ['FAILED', 'CANCELLED']:
+            error_msg = result['reason'] or 'Unknown error'
+            print(f"  ❌ 테이블 생성 실패: {error_msg}")
 
     except Exception as e:
         print(f"❌ CSV 테이블 생성 실패: {str(e)}")
@@ -257,25 +247,20 @@ def setup_qcli_analytics(region="us-east-1", recreate_table=False, create_sample
         query_execution_id = response['QueryExecutionId']
 
         # 쿼리 완료 대기
-        for i in range(30):
-            result = athena.get_query_execution(QueryExecutionId=query_execution_id)
-            status = result['QueryExecution']['Status']['State']
-
-            if status == 'SUCCEEDED':
-                # 결과 가져오기
-                results = athena.get_query_results(QueryExecutionId=query_execution_id)
-                if len(results['ResultSet']['Rows']) > 1:
-                    row_count = results['ResultSet']['Rows'][1]['Data'][0].get('VarCharValue', '0')
-                    print(f"  ✅ 테이블 검증 완료 - 현재 데이터: {row_count}행")
-                else:
-                    print(f"  ✅ 테이블 검증 완료 - 데이터 없음")
-                break
-            elif status in ['FAILED', 'CANCELLED']:
-                error_msg = result['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-                print(f"  ⚠️  테이블 검증 실패: {error_msg}")
-                break
-
-            time.sleep(1)
+        result = wait_for_query_completion(athena, query_execution_id, timeout=30)
+        status = result['state']
+
+        if status == 'SUCCEEDED':
+            # 결과 가져오기
+            results = athena.get_query_results(QueryExecutionId=query_execution_id)
+            if len(results['ResultSet']['Rows']) > 1:
+                row_count = results['ResultSet']['Rows'][1]['Data'][0].get('VarCharValue', '0')
+                print(f"  ✅ 테이블 검증 완료 - 현재 데이터: {row_count}행")
+            else:
+                print(f"  ✅ 테이블 검증 완료 - 데이터 없음")
+        elif status in ['FAILED', 'CANCELLED']:
+            error_msg = result['reason'] or 'Unknown error'
+            print(f"  ⚠️  테이블 검증 실패: {error_msg}")
 
     except Exception as e:
         print(f"  ⚠️  테이블 검증 실패: {str(e)}")
@@ -0,0 +1,284 @@
+"""
+테스트 공용 픽스처 - AWS 호출 없이 boto3 클라이언트를 흉내 내는 스텁
+
+StubAthena는 start_query_execution / get_query_execution / get_query_results /
+get_paginator("get_query_results")를, StubS3는 get_object / list_objects_v2(페이지네이터 포함)를,
+StubSts는 get_caller_identity를 제공합니다. 결과 페이지는 실제 API처럼 첫 페이지에
+헤더 행을 포함하고 페이지당 최대 1000행이며 NextToken으로 이어집니다.
+log_file / chat_record / inline_record는 QCli 프롬프트 로그 파일을 만들고,
+toy_encoding은 cl100k_base를 내려받지 않고 쓰는 작은 tiktoken 인코딩입니다.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 스크립트 모듈(athena_utils 등)을 import할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ACCOUNT_ID = "123456789012"
+
+# get_query_results 한 페이지 최대 행 수 (API 상한)
+MAX_PAGE_ROWS = 1000
+
+
+def athena_csv(columns, rows) -> bytes:
+    """Athena 결과 CSV 형식 (모든 값을 따옴표로 감싸고 NULL은 빈 값)"""
+    out = io.StringIO()
+    writer = csv.writer(out, quoting=csv.QUOTE_ALL, lineterminator="\n")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    return out.getvalue().encode("utf-8")
+
+
+class StubAthena:
+    """Athena 클라이언트 스텁 - 쿼리 SQL별로 미리 등록한 결과를 반환"""
+
+    def __init__(self, s3=None, bucket="results-bucket"):
+        self.s3 = s3
+        self.bucket = bucket
+        self.results = {}
+        self.failures = {}
+        self.executions = {}
+        self.calls = []
+
+    def add_result(self, query, columns, rows, types=None):
+        """query를 실행하면 반환할 결과 등록 (rows 값은 문자열, NULL은 None)"""
+        types = types or ["varchar"] * len(columns)
+        self.results[query] = (columns, types, rows)
+
+    def fail(self, query, reason="boom"):
+        """query 실행이 FAILED로 끝나도록 등록"""
+        self.failures[query] = reason
+
+    def start_query_execution(self, QueryString, QueryExecutionContext, ResultConfiguration):
+        self.calls.append(("start_query_execution", QueryExecutionContext["Database"]))
+        query_id = f"q{len(self.executions) + 1}"
+        output_location = ResultConfiguration["OutputLocation"].rstrip("/") + f"/{query_id}.csv"
+        self.executions[query_id] = (QueryString, output_location)
+
+        if QueryString in self.results and self.s3 is not None:
+            columns, _, rows = self.results[QueryString]
+            bucket, _, key = output_location[len("s3://"):].partition("/")
+            self.s3.put(bucket, key, athena_csv(columns, rows))
+        return {"QueryExecutionId": query_id}
+
+    def get_query_execution(self, QueryExecutionId):
+        self.calls.append(("get_query_execution", QueryExecutionId))
+        query, output_location = self.executions[QueryExecutionId]
+        if query in self.failures:
+            status = {"State": "FAILED", "StateChangeReason": self.failures[query]}
+        else:
+            status = {"State": "SUCCEEDED"}
+        return {
+            "QueryExecution": {
+                "Status": status,
+                "Statistics": {"DataScannedInBytes": 0},
+                "ResultConfiguration": {"OutputLocation": output_location},
+            }
+        }
+
+    def stop_query_execution(self, QueryExecutionId):
+        self.calls.append(("stop_query_execution", QueryExecutionId))
+
+    def _page(self, query_id, max_results, next_token):
+        query, _ = self.executions[query_id]
+        columns, types, rows = self.results[query]
+        # 실제 API와 같이 헤더 행이 결과의 첫 행
+        all_rows = [columns] + list(rows)
+        start = int(next_token or 0)
+        end = start + min(max_results, MAX_PAGE_ROWS)
+
+        page = {
+            "ResultSet": {
+                "ResultSetMetadata": {
+                    "ColumnInfo": [
+                        {"Label": column, "Name": column, "Type": athena_type}
+                        for column, athena_type in zip(columns, types)
+                    ]
+                },
+                "Rows": [
+                    {
+                        "Data": [
+                            {} if value is None else {"VarCharValue": value}
+                            for value in row
+                        ]
+                    }
+                    for row in all_rows[start:end]
+                ],
+            }
+        }
+        if end < len(all_rows):
+            page["NextToken"] = str(end)
+        return page
+
+    def get_query_results(self, QueryExecutionId, MaxResults=MAX_PAGE_ROWS, NextToken=None):
+        self.calls.append(("get_query_results", QueryExecutionId))
+        return self._page(QueryExecutionId, MaxResults, NextToken)
+
+    def get_paginator(self, operation):
+        assert operation == "get_query_results"
+        return _StubPaginator(self)
+
+    def count(self, operation):
+        """operation 호출 횟수"""
+        return sum(1 for call in self.calls if call[0] == operation)
+
+
+class _StubPaginator:
+    def __init__(self, athena):
+        self.athena = athena
+
+    def paginate(self, QueryExecutionId, PaginationConfig):
+        token = PaginationConfig.get("StartingToken")
+        page_size = PaginationConfig.get("PageSize", MAX_PAGE_ROWS)
+        while True:
+            page = self.athena.get_query_results(
+                QueryExecutionId=QueryExecutionId, MaxResults=page_size, NextToken=token
+            )
+            yield page
+            token = page.get("NextToken")
+            if not token:
+                return
+
+
+class StubS3:
+    """S3 클라이언트 스텁 - 메모리에 객체 저장"""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def put(self, bucket, key, data: bytes, etag=None):
+        self.objects[(bucket, key)] = (data, etag or f'"{hash(data) & 0xFFFFFFFF:x}"')
+
+    def get_object(self, Bucket, Key):
+        self.calls.append(("get_object", Key))
+        data, etag = self.objects[(Bucket, Key)]
+        return {"Body": io.BytesIO(data), "ETag": etag, "ContentLength": len(data)}
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return _StubListPaginator(self)
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None, **kwargs):
+        self.calls.append(("list_objects_v2", Prefix))
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        return {
+            "Contents": [
+                {"Key": key, "Size": len(self.objects[(Bucket, key)][0]), "ETag": self.objects[(Bucket, key)][1]}
+                for key in keys
+            ],
+            "IsTruncated": False,
+        }
+
+
+class _StubListPaginator:
+    def __init__(self, s3):
+        self.s3 = s3
+
+    def paginate(self, Bucket, Prefix=""):
+        yield self.s3.list_objects_v2(Bucket=Bucket, Prefix=Prefix)
+
+
+class StubSts:
+    def get_caller_identity(self):
+        return {"Account": ACCOUNT_ID}
+
+
+@pytest.fixture
+def s3():
+    return StubS3()
+
+
+@pytest.fixture
+def athena(s3):
+    return StubAthena(s3=s3)
+
+
+@pytest.fixture
+def stub_boto3(monkeypatch, athena, s3):
+    """boto3.client(...)가 스텁 클라이언트를 반환하도록 교체"""
+    import boto3
+
+    clients = {"athena": athena, "s3": s3, "sts": StubSts()}
+
+    def client(service_name, *args, **kwargs):
+        return clients[service_name]
+
+    monkeypatch.setattr(boto3, "client", client)
+    return clients
+
+
+def log_file(records) -> bytes:
+    """Amazon Q Developer 프롬프트 로그 파일 형식 (gzip JSON, records 배열)"""
+    return gzip.compress(json.dumps({"records": records}).encode("utf-8"))
+
+
+def chat_record(user_id, prompt, response, timestamp="2024-10-01T10:00:00Z"):
+    return {
+        "generateAssistantResponseEventRequest": {
+            "prompt": prompt,
+            "timeStamp": timestamp,
+            "userId": user_id,
+        },
+        "generateAssistantResponseEventResponse": {
+            "assistantResponse": response,
+            "messageMetadata": {"conversationId": "c1"},
+        },
+    }
+
+
+def inline_record(user_id, file_name, left, right, completion, timestamp="2024-10-01T10:00:00Z"):
+    return {
+        "generateCompletionsEventRequest": {
+            "leftContext": left,
+            "rightContext": right,
+            "fileName": file_name,
+            "timeStamp": timestamp,
+            "userId": user_id,
+        },
+        "generateCompletionsEventResponse": {"completions": [{"content": completion}]},
+    }
+
+
+# cl100k_base와 같은 사전 토큰화 규칙
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|"""
+    r"""\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+
+
+@pytest.fixture(scope="session")
+def toy_encoding():
+    """네트워크 없이 쓰는 작은 BPE 인코딩 (cl100k_base 사전 토큰화 규칙 + 바이트/일부 병합 토큰)"""
+    tiktoken = pytest.importorskip("tiktoken")
+
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in ["def", " def", "return", " return", "self", " self", "in", "the", " the",
+                 "    ", "\n    ", "()", "):", " =", "print", "value", " value", "user"]:
+        token = word.encode("utf-8")
+        # BPE 병합이 성립하도록 접두사도 토큰으로 등록
+        for end in range(2, len(token) + 1):
+            ranks.setdefault(token[:end], len(ranks))
+    return tiktoken.Encoding(
+        "cl100k_base",
+        pat_str=CL100K_PATTERN,
+        mergeable_ranks=ranks,
+        special_tokens={"<|endoftext|>": len(ranks)},
+    )
+
+
+@pytest.fixture
+def offline_tiktoken(monkeypatch, toy_encoding):
+    """tiktoken.get_encoding이 내려받지 않고 toy_encoding을 반환하도록 교체"""
+    import tiktoken
+
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: toy_encoding)
+    return toy_encoding
@@ -0,0 +1,185 @@
+"""analytics_core 트래커 테스트 (스텁 boto3 클라이언트)"""
+
+import re
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from analytics_core import AthenaTracker, BedrockAthenaTracker, QCliAthenaTracker
+from conftest import ACCOUNT_ID
+from query_cache import QueryResultCache
+
+
+@pytest.fixture
+def make_tracker(stub_boto3, tmp_path):
+    def make(tracker_class, **kwargs):
+        tracker = tracker_class(region="us-west-2", use_cache=False, **kwargs)
+        tracker.cache = QueryResultCache(cache_dir=tmp_path / "cache")
+        return tracker
+
+    return make
+
+
+@pytest.mark.parametrize(
+    "tracker_class, database, bucket",
+    [
+        (BedrockAthenaTracker, "bedrock_analytics", f"bedrock-analytics-{ACCOUNT_ID}-us-west-2"),
+        (QCliAthenaTracker, "qcli_analytics", f"amazonq-developer-reports-{ACCOUNT_ID}"),
+    ],
+)
+def test_trackers_share_execution_with_own_database_and_bucket(
+    make_tracker, athena, tracker_class, database, bucket
+):
+    tracker = make_tracker(tracker_class)
+    athena.add_result("SELECT 1", ["n"], [["1"]], ["bigint"])
+
+    df = tracker.execute_athena_query("SELECT 1")
+
+    assert isinstance(tracker, AthenaTracker)
+    assert tracker.results_bucket == bucket
+    assert df["n"].tolist() == [1]
+    assert athena.calls[0] == ("start_query_execution", database)
+    query, output_location = athena.executions["q1"]
+    assert output_location.startswith(f"s3://{bucket}/query-results/")
+
+
+def test_execute_athena_query_uses_cache(make_tracker, athena):
+    tracker = make_tracker(BedrockAthenaTracker)
+    athena.add_result("SELECT 1", ["n"], [["1"]], ["bigint"])
+
+    first = tracker.execute_athena_query("SELECT 1")
+    second = tracker.execute_athena_query("  SELECT 1  ")
+
+    assert athena.count("start_query_execution") == 1
+    assert second["n"].tolist() == first["n"].tolist()
+
+
+def test_refresh_cache_reruns_query(make_tracker, athena):
+    tracker = make_tracker(QCliAthenaTracker)
+    athena.add_result("SELECT 1", ["n"], [["1"]], ["bigint"])
+    tracker.execute_athena_query("SELECT 1")
+
+    tracker.refresh_cache = True
+    tracker.execute_athena_query("SELECT 1")
+
+    assert athena.count("start_query_execution") == 2
+
+
+def test_failed_query_reports_error_and_returns_empty(make_tracker, athena):
+    errors = []
+    tracker = make_tracker(BedrockAthenaTracker, on_error=errors.append)
+    athena.add_result("SELECT 1", ["n"], [["1"]])
+    athena.fail("SELECT 1", "table not found")
+
+    df = tracker.execute_athena_query("SELECT 1")
+
+    assert df.empty
+    assert len(errors) == 1
+    assert "table not found" in errors[0]
+
+
+def test_concurrent_queries_return_every_name(make_tracker, athena):
+    errors = []
+    tracker = make_tracker(QCliAthenaTracker, on_error=errors.append)
+    athena.add_result("SELECT 1", ["n"], [["1"]], ["bigint"])
+    athena.add_result("SELECT 2", ["n"], [["2"]], ["bigint"])
+    athena.add_result("SELECT 3", ["n"], [["3"]], ["bigint"])
+    athena.fail("SELECT 3")
+
+    results = dict(
+        tracker.execute_athena_queries_concurrently(
+            {"one": "SELECT 1", "two": "SELECT 2", "three": "SELECT 3"}
+        )
+    )
+
+    assert results["one"]["n"].tolist() == [1]
+    assert results["two"]["n"].tolist() == [2]
+    assert results["three"].empty
+    assert len(errors) == 1
+    assert {call[1] for call in athena.calls if call[0] == "start_query_execution"} == {
+        "qcli_analytics"
+    }
+
+
+def test_iter_athena_query_chunks(make_tracker, athena):
+    tracker = make_tracker(BedrockAthenaTracker)
+    athena.add_result("SELECT 1", ["n"], [[str(i)] for i in range(10)], ["bigint"])
+
+    chunks = list(tracker.iter_athena_query_chunks("SELECT 1", chunk_rows=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+
+
+def test_dashboard_sections_run_concurrently_without_cube(make_tracker, athena):
+    tracker = make_tracker(BedrockAthenaTracker)
+    start, end = datetime(2024, 9, 1), datetime(2024, 9, 30)
+    athena.add_result(
+        tracker.build_total_summary_query(start, end),
+        ["total_calls", "total_input_tokens", "total_output_tokens", "total_cost_usd"],
+        [["3", "30", "6", "0.5"]],
+        ["bigint", "bigint", "bigint", "double"],
+    )
+    athena.add_result(
+        tracker.build_model_usage_query(start, end), ["model_name", "call_count"], [["haiku", "3"]]
+    )
+
+    results = dict(
+        tracker.iter_dashboard_results(
+            start, end, sections=["summary", "model"], concurrent=True, use_cube=False
+        )
+    )
+
+    assert results["summary"]["total_calls"] == 3
+    assert results["model"]["model_name"].tolist() == ["haiku"]
+    assert athena.count("start_query_execution") == 2
+
+
+def test_dashboard_cube_runs_single_query_even_when_concurrent(make_tracker, athena):
+    tracker = make_tracker(BedrockAthenaTracker)
+    start, end = datetime(2024, 9, 1), datetime(2024, 9, 30)
+    athena.add_result(
+        tracker.build_usage_cube_query(start, end),
+        ["year", "month", "day", "hour", "user_or_app", "model_name",
+         "call_count", "total_input_tokens", "total_output_tokens", "estimated_cost_usd"],
+        [["2024", "9", "1", "10", "alice", "haiku", "3", "30", "6", "0.5"]],
+        ["varchar"] * 6 + ["bigint", "bigint", "bigint", "double"],
+    )
+
+    results = dict(
+        tracker.iter_dashboard_results(start, end, sections=["summary", "user"], concurrent=True)
+    )
+
+    assert results["summary"]["total_calls"] == 3
+    assert results["user"]["user_or_app"].tolist() == ["alice"]
+    assert athena.count("start_query_execution") == 1
+
+
+def test_usage_trends_fill_null_sums_per_column(make_tracker):
+    tracker = make_tracker(QCliAthenaTracker)
+    daily_df = pd.DataFrame(
+        {
+            "total_chat_messages": pd.array([5, None, 2], dtype="Int64"),
+            "total_inline_suggestions": pd.array([None, 3, 4], dtype="Int64"),
+        }
+    )
+
+    trends = tracker.analyze_usage_trends(
+        datetime(2024, 10, 1), datetime(2024, 10, 3), daily_df=daily_df
+    )
+
+    assert trends["daily_max"] == 6.0
+    assert trends["daily_min"] == 3.0
+    assert trends["daily_avg"] == pytest.approx(14 / 3)
+
+
+@pytest.mark.parametrize("tracker_class", [BedrockAthenaTracker, QCliAthenaTracker])
+def test_sum_columns_are_coalesced_to_zero(make_tracker, tracker_class):
+    tracker = make_tracker(tracker_class)
+    builders = [name for name in dir(tracker) if name.startswith("build_") and name.endswith("_query")]
+
+    assert builders
+    for name in builders:
+        query = getattr(tracker, name)(datetime(2024, 10, 1), datetime(2024, 10, 3))
+        sums = re.findall(r"(\w*\()?SUM\(", query)
+        assert sums and all(prefix == "COALESCE(" for prefix in sums), name
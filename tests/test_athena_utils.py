@@ -0,0 +1,204 @@
+"""athena_utils 결과 조회 테스트 (스텁 Athena/S3 클라이언트)"""
+
+import pandas as pd
+
+from athena_utils import (
+    RESULT_READER_API,
+    RESULT_READER_S3,
+    decode_column,
+    fetch_query_results,
+    iter_query_result_chunks,
+    iter_query_result_pages,
+    start_query,
+)
+
+
+def _run(athena, query, columns, rows, types=None):
+    athena.add_result(query, columns, rows, types)
+    handle = start_query(athena, query, "db", "s3://results-bucket/query-results/")
+    assert handle.wait(timeout=5)["state"] == "SUCCEEDED"
+    return handle.query_id
+
+
+def _rows(n):
+    return [[f"user{i}", str(i)] for i in range(n)]
+
+
+def test_pages_follow_next_token_past_1000_rows(athena):
+    query_id = _run(athena, "SELECT 1", ["user", "calls"], _rows(2500))
+
+    pages = list(iter_query_result_pages(athena, query_id))
+
+    # 헤더 포함 2501행 -> 1000 / 1000 / 501 (첫 페이지 헤더 제외)
+    assert [len(rows) for _, rows in pages] == [999, 1000, 501]
+    assert pages[0][1][0] == ["user0", "0"]
+    assert pages[-1][1][-1] == ["user2499", "2499"]
+
+
+def test_fetch_query_results_reads_all_pages_via_api(athena):
+    query_id = _run(
+        athena, "SELECT 1", ["user", "calls"], _rows(2500), ["varchar", "bigint"]
+    )
+
+    df = fetch_query_results(athena, query_id, reader=RESULT_READER_API)
+
+    assert len(df) == 2500
+    assert list(df.columns) == ["user", "calls"]
+    assert df["calls"].sum() == sum(range(2500))
+    assert athena.count("get_query_results") == 3
+
+
+def test_fetch_query_results_keeps_duplicate_labels(athena):
+    query_id = _run(athena, "SELECT 1", ["a", "a"], [["x", "y"]])
+
+    df = fetch_query_results(athena, query_id, reader=RESULT_READER_API)
+
+    assert list(df.columns) == ["a", "a"]
+    assert df.iloc[0].tolist() == ["x", "y"]
+
+
+def test_fetch_query_results_empty_result_keeps_columns(athena):
+    query_id = _run(athena, "SELECT 1", ["user", "calls"], [])
+
+    df = fetch_query_results(athena, query_id, reader=RESULT_READER_API)
+
+    assert df.empty
+    assert list(df.columns) == ["user", "calls"]
+
+
+def test_chunks_cover_all_rows_in_order(athena):
+    query_id = _run(
+        athena, "SELECT 1", ["user", "calls"], _rows(2500), ["varchar", "bigint"]
+    )
+
+    chunks = list(
+        iter_query_result_chunks(athena, query_id, chunk_rows=700, reader=RESULT_READER_API)
+    )
+
+    assert [len(chunk) for chunk in chunks] == [700, 700, 700, 400]
+    combined = pd.concat(chunks, ignore_index=True)
+    assert combined["calls"].tolist() == list(range(2500))
+
+
+def test_chunks_of_empty_result_yield_one_empty_frame(athena):
+    query_id = _run(athena, "SELECT 1", ["user"], [])
+
+    chunks = list(iter_query_result_chunks(athena, query_id, reader=RESULT_READER_API))
+
+    assert len(chunks) == 1
+    assert chunks[0].empty
+    assert list(chunks[0].columns) == ["user"]
+
+
+def test_auto_reader_downloads_csv_past_first_page(athena, s3):
+    query_id = _run(
+        athena, "SELECT 1", ["user", "calls"], _rows(2500), ["varchar", "bigint"]
+    )
+
+    df = fetch_query_results(athena, query_id, s3_client=s3)
+
+    assert len(df) == 2500
+    assert df["calls"].tolist() == list(range(2500))
+    # 첫 페이지로 1000행 초과를 확인한 뒤 나머지는 CSV 한 번으로
+    assert athena.count("get_query_results") == 1
+    assert len(s3.calls) == 1
+
+
+def test_auto_reader_stays_on_api_for_single_page(athena, s3):
+    query_id = _run(athena, "SELECT 1", ["user", "calls"], _rows(10))
+
+    df = fetch_query_results(athena, query_id, s3_client=s3)
+
+    assert len(df) == 10
+    assert s3.calls == []
+
+
+def test_s3_reader_matches_api_reader(athena, s3):
+    rows = [["a", "1", "1.5"], ["b", None, None], ["a", "3", "2.5"]]
+    query_id = _run(
+        athena, "SELECT 1", ["name", "n", "x"], rows, ["varchar", "bigint", "double"]
+    )
+
+    via_api = fetch_query_results(athena, query_id, reader=RESULT_READER_API)
+    via_s3 = fetch_query_results(athena, query_id, s3_client=s3, reader=RESULT_READER_S3)
+
+    pd.testing.assert_frame_equal(via_api, via_s3)
+
+
+def test_s3_reader_without_client_falls_back_to_api(athena):
+    query_id = _run(athena, "SELECT 1", ["user", "calls"], _rows(1500))
+
+    df = fetch_query_results(athena, query_id, s3_client=None, reader=RESULT_READER_S3)
+    chunks = list(
+        iter_query_result_chunks(athena, query_id, s3_client=None, reader=RESULT_READER_S3)
+    )
+
+    assert len(df) == 1500
+    assert sum(len(chunk) for chunk in chunks) == 1500
+
+
+def test_s3_chunks_cover_all_rows(athena, s3):
+    query_id = _run(
+        athena, "SELECT 1", ["user", "calls"], _rows(2500), ["varchar", "bigint"]
+    )
+
+    chunks = list(iter_query_result_chunks(athena, query_id, chunk_rows=1000, s3_client=s3))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert pd.concat(chunks)["calls"].tolist() == list(range(2500))
+
+
+def test_chunk_dtypes_are_consistent(athena, s3):
+    # 첫 청크는 값이 반복되고 두 번째 청크는 모두 고유 - 청크마다 타입이 같아야 함
+    rows = [["same", str(i)] for i in range(1000)] + [[f"u{i}", str(i)] for i in range(1000)]
+    query_id = _run(athena, "SELECT 1", ["user", "calls"], rows, ["varchar", "bigint"])
+
+    for kwargs in ({"reader": RESULT_READER_API}, {"s3_client": s3}):
+        chunks = list(iter_query_result_chunks(athena, query_id, chunk_rows=1000, **kwargs))
+        assert len({str(chunk["user"].dtype) for chunk in chunks}) == 1
+        assert chunks[0]["user"].dtype != "category"
+
+
+def test_decode_column_numeric_nulls_stay_missing():
+    ints = decode_column(["1", "", "9007199254740993"], "bigint")
+    floats = decode_column(["1.5", "", "2"], "decimal(10,2)")
+
+    assert str(ints.dtype) == "Int64"
+    assert ints.isna().tolist() == [False, True, False]
+    # float을 거치지 않아 큰 bigint도 정확히 유지
+    assert ints[2] == 9007199254740993
+    assert str(floats.dtype) == "Float64"
+    assert floats.isna().tolist() == [False, True, False]
+    assert floats.sum() == 3.5
+
+
+def test_decode_column_other_types():
+    dates = decode_column(["2024-10-01", ""], "date")
+    flags = decode_column(["true", "false"], "boolean")
+
+    assert dates.isna().tolist() == [False, True]
+    assert flags.tolist() == [True, False]
+    assert decode_column(["a", "a", "a", "b"], "varchar").dtype == "category"
+    assert decode_column(["a", "b"], "varchar").dtype == object
+    assert decode_column(["a", "a", "a"], "varchar", categorize=False).dtype == object
+
+
+def test_summary_fills_null_sums_with_zero(stub_boto3, athena):
+    from analytics_core import BedrockAthenaTracker
+
+    tracker = BedrockAthenaTracker(use_cache=False)
+    athena.add_result(
+        "SELECT 1",
+        ["total_calls", "total_input_tokens", "total_output_tokens", "total_cost_usd"],
+        [["0", None, None, None]],
+        ["bigint", "bigint", "bigint", "double"],
+    )
+
+    summary = tracker._summary_from_dataframe(tracker.execute_athena_query("SELECT 1"))
+
+    assert summary == {
+        "total_calls": 0,
+        "total_input_tokens": 0,
+        "total_output_tokens": 0,
+        "total_cost_usd": 0.0,
+    }
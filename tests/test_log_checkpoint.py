@@ -0,0 +1,90 @@
+"""LogCheckpointStore / 체크포인트를 사용하는 QCli 분석 테스트"""
+
+from datetime import datetime
+
+import pytest
+
+import log_checkpoint
+from conftest import ACCOUNT_ID, chat_record, log_file
+from log_checkpoint import LogCheckpointStore
+from qcli_s3_analyzer import QCliS3LogAnalyzer
+
+BUCKET = f"amazonq-developer-reports-{ACCOUNT_ID}"
+DAY_PREFIX = (
+    f"prompt_logging/AWSLogs/{ACCOUNT_ID}/QDeveloperLogs/GenerateAssistantResponse/us-east-1/2024/10/01/"
+)
+
+
+def test_default_path_is_in_user_cache_dir():
+    from query_cache import DEFAULT_CACHE_DIR
+
+    assert log_checkpoint.DEFAULT_CHECKPOINT_PATH.parent == DEFAULT_CACHE_DIR
+
+
+def test_get_requires_same_etag_and_tokenizer(tmp_path):
+    store = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+    store.put_many([("k", "etag1", {"alice": {"total_requests": 1}})], "tok")
+
+    assert store.get("k", "etag1", "tok") == {"alice": {"total_requests": 1}}
+    assert store.get("k", "etag2", "tok") is None
+    assert store.get("k", "etag1", "other") is None
+
+
+def test_put_replaces_previous_etag(tmp_path):
+    store = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+    store.put_many([("k", "etag1", {"a": 1})], "tok")
+    store.put_many([("k", "etag2", {"a": 2})], "tok")
+
+    assert store.get("k", "etag1", "tok") is None
+    assert store.get("k", "etag2", "tok") == {"a": 2}
+    rows = store._conn.execute("SELECT COUNT(*) FROM file_stats").fetchone()[0]
+    assert rows == 1
+
+
+def test_format_version_change_invalidates(tmp_path, monkeypatch):
+    store = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+    store.put_many([("k", "etag1", {"a": 1})], "tok")
+
+    monkeypatch.setattr(log_checkpoint, "CHECKPOINT_FORMAT_VERSION", 99)
+
+    assert store.get("k", "etag1", "tok") is None
+
+
+@pytest.fixture
+def analyzer(stub_boto3, offline_tiktoken, tmp_path):
+    analyzer = QCliS3LogAnalyzer(max_workers=2, use_checkpoint=False)
+    analyzer.checkpoint = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+    return analyzer
+
+
+def _analyze(analyzer):
+    day = datetime(2024, 10, 1)
+    return analyzer.analyze_usage(day, day)
+
+
+def test_analysis_reuses_checkpoint_until_etag_changes(analyzer, s3):
+    s3.put(BUCKET, DAY_PREFIX + "a.json.gz", log_file([chat_record("alice", "hello", "hi there")]))
+    s3.put(BUCKET, DAY_PREFIX + "b.json.gz", log_file([chat_record("bob", "question", "answer")]))
+
+    first = _analyze(analyzer)
+    downloads = len([call for call in s3.calls if call[0] == "get_object"])
+
+    second = _analyze(analyzer)
+
+    assert first["checkpointed_files"] == 0
+    assert second["checkpointed_files"] == 2
+    assert second["total_tokens"] == first["total_tokens"]
+    assert second["by_user"] == first["by_user"]
+    assert len([call for call in s3.calls if call[0] == "get_object"]) == downloads
+
+    # 객체가 다시 쓰이면(ETag 변경) 해당 파일만 다시 계산
+    s3.put(
+        BUCKET,
+        DAY_PREFIX + "b.json.gz",
+        log_file([chat_record("bob", "question", "answer"), chat_record("bob", "more", "text")]),
+    )
+    third = _analyze(analyzer)
+
+    assert third["checkpointed_files"] == 1
+    assert third["total_requests"] == 3
+    assert third["by_user"]["bob"]["requests"] == 2
@@ -0,0 +1,168 @@
+"""pricing 가격 카탈로그 / 모델 가격 해석기 테스트
+
+카탈로그 조회(lookup/prices_on)가 적용 시작일(effective_from) 경계에서 바뀌는지,
+리전 항목이 default를 모델 단위로 덮어쓰는지, ModelPriceResolver가 키 순서와 관계없이
+가장 긴 가격 키를 고르는지 확인합니다.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pricing import ModelPriceResolver, PricingCatalog, calculate_cost_for_dataframe
+
+CATALOG = {
+    "default_model": "base",
+    "regions": {
+        "default": {
+            "base": [{"effective_from": "2024-01-01", "input": 1.0, "output": 2.0}],
+            # 순서가 섞여 있어도 시작일 순으로 정렬
+            "tiered": [
+                {"effective_from": "2024-06-01", "input": 20.0, "output": 40.0},
+                {"effective_from": "2024-03-01", "input": 10.0, "output": 30.0},
+            ],
+        },
+        "ap-northeast-2": {
+            "tiered": [{"effective_from": "2024-03-01", "input": 11.0, "output": 33.0}],
+        },
+    },
+}
+
+
+@pytest.fixture
+def catalog():
+    return PricingCatalog(CATALOG)
+
+
+def _lookup(catalog, region, keys, rows):
+    codes = np.array([keys.index(key) for key, _ in rows])
+    days = np.array([day for _, day in rows], dtype="datetime64[D]")
+    input_prices, output_prices = catalog.lookup(region, keys, codes, days)
+    return input_prices.tolist(), output_prices.tolist()
+
+
+@pytest.mark.parametrize(
+    "day, expected_input",
+    [
+        ("2024-01-15", 10.0),  # 첫 시작일 이전 - 가장 이른 가격
+        ("2024-02-29", 10.0),
+        ("2024-03-01", 10.0),  # 시작일 당일부터 적용
+        ("2024-05-31", 10.0),  # 다음 시작일 전날까지
+        ("2024-06-01", 20.0),
+        ("2030-01-01", 20.0),
+    ],
+)
+def test_lookup_at_effective_from_boundaries(catalog, day, expected_input):
+    input_prices, _ = _lookup(catalog, "default", ["tiered"], [("tiered", day)])
+
+    assert input_prices == [expected_input]
+    assert catalog.prices_on("default", date.fromisoformat(day))["tiered"]["input"] == expected_input
+
+
+def test_lookup_keeps_models_separate(catalog):
+    # 모델 번호가 다른 행은 서로의 가격 구간을 침범하지 않음
+    rows = [
+        ("tiered", "2024-06-01"),
+        ("base", "2024-06-01"),
+        ("tiered", "2023-01-01"),
+        ("base", "2023-01-01"),
+    ]
+
+    input_prices, output_prices = _lookup(catalog, "default", ["base", "tiered"], rows)
+
+    assert input_prices == [20.0, 1.0, 10.0, 1.0]
+    assert output_prices == [40.0, 2.0, 30.0, 2.0]
+
+
+def test_region_overrides_default_per_model(catalog):
+    prices = catalog.prices_on("ap-northeast-2", date(2024, 7, 1))
+
+    assert prices["tiered"] == {"input": 11.0, "output": 33.0}
+    assert prices["base"] == {"input": 1.0, "output": 2.0}
+    # 카탈로그에 없는 리전은 default
+    assert catalog.table("eu-west-9") is catalog.table("default")
+
+
+def test_dataframe_cost_uses_row_date_prices():
+    df = pd.DataFrame(
+        {
+            "model_name": ["anthropic.claude-3-haiku-20240307-v1:0"] * 2,
+            "year": ["2024", "2024"],
+            "month": ["01", "06"],
+            "day": ["01", "01"],
+            "total_input_tokens": [1000, 1000],
+            "total_output_tokens": [0, 0],
+        }
+    )
+
+    result = calculate_cost_for_dataframe(df)
+
+    # 첫 시작일(2024-03-13) 이전 날짜도 가장 이른 가격 적용
+    assert result["estimated_cost_usd"].tolist() == [0.00025, 0.00025]
+
+
+RESOLVER_TABLE = {
+    "default": {
+        # 짧은 키가 먼저 와도 가장 긴 키 선택
+        "claude-3-5-sonnet": {"input": 1.0, "output": 1.0},
+        "claude-3-5-sonnet-20241022": {"input": 2.0, "output": 2.0},
+        "claude-3-haiku-20240307": {"input": 3.0, "output": 3.0},
+        "Nova-Pro": {"input": 4.0, "output": 4.0},
+    },
+    "ap-northeast-2": {
+        "claude-3-haiku-20240307": {"input": 5.0, "output": 5.0},
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "model_id, expected",
+    [
+        ("claude-3-5-sonnet-20241022", "claude-3-5-sonnet-20241022"),
+        ("us.anthropic.claude-3-5-sonnet-20241022-v2:0", "claude-3-5-sonnet-20241022"),
+        ("anthropic.claude-3-5-sonnet-20240620-v1:0", "claude-3-5-sonnet"),
+        (
+            "arn:aws:bedrock:us-east-1:123456789012:inference-profile/apac.anthropic.claude-3-haiku-20240307-v1:0",
+            "claude-3-haiku-20240307",
+        ),
+        ("us.anthropic.claude-3-haiku-20240307-v1:0:200k", "claude-3-haiku-20240307"),
+        ("  ANTHROPIC.CLAUDE-3-HAIKU-20240307-V1:0 ", "claude-3-haiku-20240307"),
+        # 원래 대소문자의 가격 키 반환
+        ("amazon.nova-pro-v1:0", "Nova-Pro"),
+        ("amazon.titan-text-express-v1", None),
+        ("", None),
+    ],
+)
+def test_resolver_picks_longest_key(model_id, expected):
+    resolved = ModelPriceResolver(RESOLVER_TABLE).resolve(model_id)
+
+    assert (resolved[0] if resolved else None) == expected
+
+
+def test_resolver_uses_region_table_with_default_fallback():
+    resolver = ModelPriceResolver(RESOLVER_TABLE)
+
+    assert resolver.resolve("claude-3-haiku-20240307", "ap-northeast-2")[1]["input"] == 5.0
+    # 리전 테이블에 있으면 default 키는 보지 않음
+    assert resolver.resolve("claude-3-5-sonnet-20241022", "ap-northeast-2") is None
+    assert resolver.resolve("claude-3-haiku-20240307", "eu-west-9")[1]["input"] == 3.0
+    assert resolver.key_pattern("eu-west-9") == resolver.key_pattern("default")
+
+
+def test_resolver_caches_results():
+    resolver = ModelPriceResolver(RESOLVER_TABLE, cache_size=2)
+
+    for _ in range(3):
+        resolver.resolve("anthropic.claude-3-haiku-20240307-v1:0")
+
+    assert resolver.stats()["misses"] == 1
+    assert resolver.stats()["hits"] == 2
+
+    resolver.resolve("a")
+    resolver.resolve("b")
+    assert resolver.stats()["size"] == 2
+
+    resolver.clear_cache()
+    assert resolver.stats()["size"] == 0
@@ -0,0 +1,354 @@
+"""QCliS3LogAnalyzer 테스트
+
+- 로그 파일 처리: 로컬 미러 디렉토리를 스레드 풀/프로세스 풀로 분석
+- iter_json_array / _JsonStreamReader: 조금씩 읽히는 스트림에서도 값이 버퍼 경계에 걸쳐
+  잘리지 않고 json.loads와 같은 결과를 내는지 확인
+"""
+
+import gzip
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+from botocore.exceptions import IncompleteReadError
+
+import qcli_s3_analyzer
+from conftest import ACCOUNT_ID, chat_record, log_file
+from log_checkpoint import LogCheckpointStore
+from qcli_s3_analyzer import QCliS3LogAnalyzer, _JsonStreamReader, iter_json_array
+
+DAY_PREFIX = (
+    f"prompt_logging/AWSLogs/{ACCOUNT_ID}/QDeveloperLogs/GenerateAssistantResponse/us-east-1/2024/10/01/"
+)
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    # 스폰한 워커 프로세스도 같은 결과를 내도록 tiktoken 다운로드를 막음 (환경 변수는 상속됨)
+    monkeypatch.setenv("HTTPS_PROXY", "http://127.0.0.1:9")
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path / "tiktoken"))
+
+    day_dir = tmp_path / "mirror" / DAY_PREFIX
+    day_dir.mkdir(parents=True)
+    for i in range(7):
+        records = [chat_record(f"user{i % 3}", f"question {i} {j}", "answer " * (i + j)) for j in range(i + 1)]
+        (day_dir / f"{i}.json.gz").write_bytes(log_file(records))
+    return tmp_path / "mirror"
+
+
+class RecordingPool(ProcessPoolExecutor):
+    submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(args[0])
+        return super().submit(fn, *args, **kwargs)
+
+
+def _analyze(analyzer):
+    day = datetime(2024, 10, 1)
+    stats = analyzer.analyze_usage(day, day)
+    return {key: value for key, value in stats.items() if key != "tokenization"}
+
+
+def test_process_pool_batches_match_thread_pool(mirror, tmp_path, monkeypatch):
+    # 7개 파일을 3개씩 묶어 프로세스 풀 작업 3개로 제출
+    monkeypatch.setattr(qcli_s3_analyzer, "PROCESS_BATCH_FILES", 3)
+    monkeypatch.setattr(qcli_s3_analyzer, "ProcessPoolExecutor", RecordingPool)
+    RecordingPool.submitted = []
+    threads = QCliS3LogAnalyzer(max_workers=2, use_checkpoint=False, local_dir=str(mirror))
+    processes = QCliS3LogAnalyzer(
+        max_workers=2, use_checkpoint=False, local_dir=str(mirror), use_processes=True, max_processes=2
+    )
+    processes.checkpoint = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+
+    expected = _analyze(threads)
+    first = _analyze(processes)
+
+    assert expected["total_requests"] == 28
+    assert first == expected
+    assert sorted(len(keys) for keys in RecordingPool.submitted) == [1, 3, 3]
+    assert sorted(key for keys in RecordingPool.submitted for key in keys) == sorted(
+        DAY_PREFIX + f"{i}.json.gz" for i in range(7)
+    )
+
+    # 두 번째 분석은 모두 체크포인트에서 (프로세스 풀에 제출하지 않음)
+    RecordingPool.submitted = []
+    second = _analyze(processes)
+    assert second["checkpointed_files"] == 7
+    assert {key: value for key, value in second.items() if key != "checkpointed_files"} == {
+        key: value for key, value in expected.items() if key != "checkpointed_files"
+    }
+    assert RecordingPool.submitted == []
+
+
+def test_encoder_load_failure_is_logged(stub_boto3, monkeypatch, caplog):
+    tiktoken = pytest.importorskip("tiktoken")
+
+    def offline(name):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(tiktoken, "get_encoding", offline)
+
+    analyzer = QCliS3LogAnalyzer(max_workers=1, use_checkpoint=False)
+
+    assert analyzer.encoding is None
+    assert analyzer.tokenizer == "chars/3"
+    assert "no network" in caplog.text
+
+
+@pytest.mark.parametrize("timestamp", ["2024-10-01", 1727776800])
+def test_unexpected_timestamp_skips_hour_only(timestamp, caplog):
+    partial = qcli_s3_analyzer._new_partial_stats()
+    record = {"type": "chat", "userId": "alice", "timestamp": timestamp, "input_tokens": 3, "output_tokens": 4}
+
+    with caplog.at_level("DEBUG", logger="qcli_s3_analyzer"):
+        QCliS3LogAnalyzer._add_record(partial, record)
+
+    assert partial["total_requests"] == 1
+    assert partial["by_user"]["alice"]["input_tokens"] == 3
+    assert dict(partial["by_hour"]) == {}
+    assert "Unexpected timestamp" in caplog.text
+
+
+class ShortReadStream:
+    """read(n)이 최대 size글자만 반환하는 스트림 (네트워크 스트림처럼)"""
+
+    def __init__(self, text, size):
+        self.text = text
+        self.size = size
+        self.offset = 0
+
+    def read(self, n=-1):
+        chunk = self.text[self.offset:self.offset + min(n, self.size)]
+        self.offset += len(chunk)
+        return chunk
+
+
+DOCUMENT = {
+    "version": "1.0",
+    "meta": {"records": "not this one", "list": [1, [2, {"x": "]"}]]},
+    "records": [
+        {"prompt": "def f(x):\n    return {'a': [1, 2]}", "n": 1234567890123},
+        {"prompt": "한글 😀 \"quoted\" \\ back, slash", "float": -12.5e-3, "zero": 0},
+        {"nested": {"a": [True, False, None]}, "empty": {}, "list": []},
+        98765.4321,
+        "plain string, with ] and }",
+    ],
+    "trailer": [0.5, 1e10],
+}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_array_matches_json_loads(size, indent):
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent)
+
+    assert list(iter_json_array(ShortReadStream(text, size))) == DOCUMENT["records"]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{}', '{"records": []}', '{ "other": [1, 2] }', '{"records": "text"}', ' { "records" : [ ] } '],
+)
+def test_iter_json_array_without_records(text):
+    assert list(iter_json_array(io.StringIO(text))) == []
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['[1, 2]', '{"records": [1 2]}', '{"records": [1, 2}', '{"records": [1] "x": 1}', '{"records": [{"a": 1}'],
+)
+def test_iter_json_array_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(ShortReadStream(text, 2)))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12345678 ", 12345678),
+    ("12345678", 12345678),  # 스트림 끝의 숫자
+    ("-1.25e+10,", -1.25e10),
+    ("3.14159]", 3.14159),
+])
+@pytest.mark.parametrize("read_chars", [1, 2, 3])
+def test_number_split_at_buffer_edge(text, expected, read_chars):
+    # '12.5'가 '12.'에서 잘려도 '12'로 끝내지 않고 숫자가 끝날 때까지 읽음
+    reader = _JsonStreamReader(io.StringIO(text), read_chars=read_chars)
+
+    assert reader.decode_value() == expected
+
+
+def test_reader_drops_consumed_prefix():
+    values = list(range(1000))
+    reader = _JsonStreamReader(io.StringIO(" ".join(map(str, values)) + " "), read_chars=16)
+
+    decoded = []
+    max_buffer = 0
+    while reader.peek():
+        decoded.append(reader.decode_value())
+        max_buffer = max(max_buffer, len(reader.buffer))
+
+    assert decoded == values
+    assert max_buffer <= 64
+
+
+@pytest.mark.parametrize(
+    "kwargs, user_id, expected",
+    [
+        ({}, "alice", True),
+        ({"user_pattern": "LIC"}, "Alice", True),
+        ({"user_pattern": "bob"}, "alice", False),
+        ({"user_ids": ["alice"]}, "alice", True),
+        ({"user_ids": ["alice"]}, "alicia", False),
+        ({"user_pattern": "al", "user_ids": ["alicia"]}, "alicia", True),
+        ({"user_pattern": "x", "user_ids": ["alicia"]}, "alicia", False),
+        # 사용자 ID가 없는 레코드는 항상 포함
+        ({"user_ids": []}, None, True),
+        ({"user_pattern": "bob"}, "", True),
+    ],
+)
+def test_record_filter_matches_user(kwargs, user_id, expected):
+    assert qcli_s3_analyzer.RecordFilter(**kwargs).matches_user(user_id) is expected
+
+
+@pytest.mark.parametrize(
+    "timestamp, expected",
+    [
+        ("2024-10-01T09:59:59Z", False),
+        ("2024-10-01T10:00:00Z", True),  # 시작 포함
+        ("2024-10-01T10:00:00.123456Z", True),
+        ("2024-10-01T11:59:59.999Z", True),
+        ("2024-10-01T12:00:00Z", False),  # 종료 제외
+        (None, False),
+        ("", False),
+    ],
+)
+def test_record_filter_time_window(timestamp, expected):
+    record_filter = qcli_s3_analyzer.RecordFilter(
+        start_time=datetime(2024, 10, 1, 10), end_time=datetime(2024, 10, 1, 12)
+    )
+
+    assert record_filter.has_time_window and record_filter.active
+    assert record_filter.matches({"userId": "alice", "timestamp": timestamp}) is expected
+
+
+def test_record_filter_open_ended_window():
+    record_filter = qcli_s3_analyzer.RecordFilter(start_time=datetime(2024, 10, 1, 10))
+
+    assert record_filter.matches_time("2030-01-01T00:00:00Z")
+    assert not record_filter.matches_time("2024-10-01T09:00:00Z")
+    assert not qcli_s3_analyzer.RecordFilter().active
+    assert qcli_s3_analyzer.RecordFilter().matches({"userId": None, "timestamp": None})
+
+
+@pytest.fixture
+def s3_analyzer(stub_boto3, offline_tiktoken, tmp_path):
+    analyzer = QCliS3LogAnalyzer(max_workers=2, use_checkpoint=False)
+    analyzer.checkpoint = LogCheckpointStore(tmp_path / "checkpoint.sqlite3")
+    return analyzer
+
+
+def test_filters_skip_tokenizing_and_checkpointing(s3_analyzer, s3):
+    bucket = f"amazonq-developer-reports-{ACCOUNT_ID}"
+    s3.put(bucket, DAY_PREFIX + "a.json.gz", log_file([
+        chat_record("alice", "hello", "hi there", "2024-10-01T09:00:00Z"),
+        chat_record("alice", "print the value", "value", "2024-10-01T10:30:00Z"),
+        chat_record("bob", "question", "answer", "2024-10-01T10:45:00Z"),
+    ]))
+    day = datetime(2024, 10, 1)
+
+    stats = s3_analyzer.analyze_usage(
+        day, day, user_ids=["alice"], time_window=(datetime(2024, 10, 1, 10), None)
+    )
+
+    assert stats["total_requests"] == 1
+    assert set(stats["by_user"]) == {"alice"}
+    # 조건에 맞는 레코드 하나의 입력/출력만 토큰 계산
+    assert stats["tokenization"]["lookups"] == 2
+    # 일부만 집계한 파일은 체크포인트에 저장하지 않음
+    assert s3_analyzer.checkpoint._conn.execute("SELECT COUNT(*) FROM file_stats").fetchone()[0] == 0
+
+    # 사용자 조건만 있으면 체크포인트에 저장한 파일 전체 집계를 합산할 때 걸러 냄
+    full = s3_analyzer.analyze_usage(day, day)
+    by_user = s3_analyzer.analyze_usage(day, day, user_pattern="BO")
+    assert full["total_requests"] == 3
+    assert by_user["checkpointed_files"] == 1
+    assert by_user["total_requests"] == 1
+    assert set(by_user["by_user"]) == {"bob"}
+
+
+class FlakyBody:
+    """처음 한 번은 본문 일부를 준 뒤 연결이 끊기는 S3 본문"""
+
+    def __init__(self, data, fail):
+        self.stream = io.BytesIO(data)
+        self.cut = len(data) * 2 // 3 if fail else None
+
+    def read(self, n=-1):
+        if self.cut is not None and self.stream.tell() >= self.cut:
+            raise IncompleteReadError(actual_bytes=self.cut, expected_bytes=len(self.stream.getvalue()))
+        if self.cut is not None:
+            n = self.cut - self.stream.tell() if n is None or n < 0 else min(n, self.cut - self.stream.tell())
+        return self.stream.read(n)
+
+    def close(self):
+        pass
+
+
+def _many_records(count):
+    return [chat_record(f"user{i % 5}", f"question {i} about the value", f"answer {i * 7919}") for i in range(count)]
+
+
+def test_transport_error_retries_without_double_counting_tokens(s3_analyzer, s3, monkeypatch):
+    monkeypatch.setattr(qcli_s3_analyzer, "RETRY_BASE_DELAY", 0)
+    bucket = f"amazonq-developer-reports-{ACCOUNT_ID}"
+    key = DAY_PREFIX + "big.json.gz"
+    s3.put(bucket, key, log_file(_many_records(3000)))
+    get_object = s3.get_object
+    attempts = []
+
+    def flaky_get_object(Bucket, Key):
+        response = get_object(Bucket=Bucket, Key=Key)
+        attempts.append(Key)
+        response["Body"] = FlakyBody(response["Body"].read(), fail=len(attempts) == 1)
+        return response
+
+    monkeypatch.setattr(s3, "get_object", flaky_get_object)
+    before = s3_analyzer.token_counter.stats()
+
+    file_stats = s3_analyzer.process_log_file(key)
+
+    assert len(attempts) == 2
+    assert sum(partial["total_requests"] for partial in file_stats.values()) == 3000
+    # 끊기기 전에 계산한 레코드가 통계에 두 번 잡히지 않음
+    assert s3_analyzer.token_counter.stats()["lookups"] - before["lookups"] == 6000
+
+
+@pytest.mark.parametrize("data", [
+    log_file(_many_records(10))[:-20],  # 잘린 gzip
+    gzip.compress(b'{"records": [{"a": 1} {"b": 2}]}'),  # 잘못된 JSON
+    b"not gzip",
+])
+def test_malformed_file_fails_fast(s3_analyzer, s3, monkeypatch, data):
+    monkeypatch.setattr(qcli_s3_analyzer, "RETRY_BASE_DELAY", 60)  # 재시도하면 테스트가 멈춤
+    bucket = f"amazonq-developer-reports-{ACCOUNT_ID}"
+    s3.put(bucket, DAY_PREFIX + "bad.json.gz", data)
+
+    assert s3_analyzer.process_log_file(DAY_PREFIX + "bad.json.gz") is None
+    assert [call for call in s3.calls if call[0] == "get_object"] == [("get_object", DAY_PREFIX + "bad.json.gz")]
+    assert s3_analyzer.token_counter.stats()["lookups"] == 0
+
+
+@pytest.mark.parametrize("error, expected", [
+    (qcli_s3_analyzer.ClientError({"Error": {"Code": "SlowDown"}}, "GetObject"), True),
+    (qcli_s3_analyzer.ClientError({"Error": {"Code": "X"}, "ResponseMetadata": {"HTTPStatusCode": 503}}, "GetObject"), True),
+    (qcli_s3_analyzer.ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject"), False),
+    (qcli_s3_analyzer.ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject"), False),
+    (ConnectionResetError("reset"), True),
+    (EOFError("Compressed file ended before the end-of-stream marker was reached"), False),
+    (json.JSONDecodeError("Expecting ','", "{}", 1), False),
+    (ValueError("Expected ',' or ']' in records array"), False),
+])
+def test_is_transient_error(error, expected):
+    assert qcli_s3_analyzer._is_transient_error(error) is expected
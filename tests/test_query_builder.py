@@ -0,0 +1,169 @@
+"""query_builder 날짜 조건 / 가격 키 테스트
+
+파티션 조건 부분을 SQLite로 평가해, 기간 안의 날짜 파티션은 모두 포함하고
+밖의 파티션은 하나도 포함하지 않는지 확인합니다. 가격 키 SQL 식은 Athena 함수
+(regexp_extract_all + reduce)를 Python으로 흉내 내 ModelPriceResolver와 같은 키를
+고르는지 확인합니다.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from pricing import DEFAULT_PRICING_MODEL, default_resolver
+from query_builder import (
+    BEDROCK_LOG_DATE_SQL,
+    BEDROCK_NORMALIZED_MODEL_SQL,
+    MAX_DATE_IN_LIST,
+    bedrock_model_key_sql,
+    bedrock_partition_predicate,
+    bedrock_price_cte,
+    bedrock_price_join,
+    iter_dates,
+    qcli_date_predicate,
+)
+
+
+def _partition_filter(predicate: str) -> str:
+    partition_filter, _, exact = predicate.partition(f"AND {BEDROCK_LOG_DATE_SQL}")
+    assert exact, "exact date filter must follow the partition filter"
+    return partition_filter.strip()
+
+
+def _selected_days(predicate: str, around: date, span: int = 800):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE logs (year TEXT, month TEXT, day TEXT, d TEXT)")
+    rows = []
+    for offset in range(-span, span):
+        day = around + timedelta(days=offset)
+        # 파티션 값은 2자리('01')와 한 자리('1') 모두 있을 수 있음
+        rows.append((str(day.year), f"{day.month:02d}", f"{day.day:02d}", day.isoformat()))
+        rows.append((str(day.year), str(day.month), str(day.day), day.isoformat()))
+    conn.executemany("INSERT INTO logs VALUES (?, ?, ?, ?)", rows)
+    selected = conn.execute(
+        f"SELECT d, COUNT(*) FROM logs WHERE {_partition_filter(predicate)} GROUP BY d"
+    ).fetchall()
+    return dict(selected)
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        (date(2024, 1, 30), date(2024, 2, 2)),  # 월 경계
+        (date(2023, 12, 31), date(2024, 1, 1)),  # 연 경계
+        (date(2023, 11, 15), date(2024, 3, 10)),  # 전체 월 + 부분 월, 연도 걸침
+        (date(2024, 1, 1), date(2024, 12, 31)),  # 연도 전체
+        (date(2023, 6, 5), date(2025, 2, 3)),  # 전체 연도를 포함하는 긴 기간
+        (date(2024, 2, 1), date(2024, 2, 29)),  # 윤년 2월 전체
+        (date(2024, 5, 7), date(2024, 5, 7)),  # 하루
+    ],
+)
+def test_bedrock_partition_predicate_selects_exact_days(start, end):
+    predicate = bedrock_partition_predicate(start, end)
+
+    selected = _selected_days(predicate, start)
+
+    expected = {day.isoformat() for day in iter_dates(start, end)}
+    assert set(selected) == expected
+    # 2자리 / 한 자리 파티션 값 모두 포함
+    assert all(count == 2 for count in selected.values())
+
+
+def test_bedrock_partition_predicate_uses_month_and_year_terms():
+    predicate = bedrock_partition_predicate(date(2023, 11, 15), date(2025, 2, 3))
+
+    assert "year = '2024'\n" in predicate
+    assert "(year = '2023' AND month IN ('12'))" in predicate
+    assert "BETWEEN DATE '2023-11-15' AND DATE '2025-02-03'" in predicate
+
+
+def test_bedrock_partition_predicate_accepts_datetime():
+    assert bedrock_partition_predicate(
+        datetime(2024, 1, 30, 15), datetime(2024, 2, 2, 1)
+    ) == bedrock_partition_predicate(date(2024, 1, 30), date(2024, 2, 2))
+
+
+def test_qcli_date_predicate_lists_days_across_year():
+    predicate = qcli_date_predicate(date(2023, 12, 30), date(2024, 1, 2))
+
+    assert predicate == "Date IN ('12-30-2023', '12-31-2023', '01-01-2024', '01-02-2024')"
+
+
+def test_qcli_date_predicate_falls_back_to_range_for_long_periods():
+    start = date(2022, 1, 1)
+    end = start + timedelta(days=MAX_DATE_IN_LIST)
+
+    predicate = qcli_date_predicate(start, end, column="report_date")
+
+    assert predicate.startswith("parse_datetime(report_date, 'MM-dd-yyyy') BETWEEN")
+    assert "parse_datetime('01-01-2022', 'MM-dd-yyyy')" in predicate
+    assert end.strftime("'%m-%d-%Y'") in predicate
+
+
+def _regexp_extract(value, pattern):
+    match = re.search(pattern, value) if value is not None else None
+    return match.group(0) if match else None
+
+
+def _sql_model_key(model_id: str, key_sql: str) -> str:
+    """bedrock_model_key_sql 식을 Athena와 같은 순서로 평가"""
+    prefix = f"COALESCE(reduce(regexp_extract_all({BEDROCK_NORMALIZED_MODEL_SQL}, '"
+    assert key_sql.startswith(prefix)
+    pattern = key_sql[len(prefix):].split("'), CAST(NULL AS VARCHAR)", 1)[0].replace("''", "'")
+    default_key = re.search(r"'([^']*)'\)$", key_sql).group(1)
+
+    # regexp_extract(regexp_replace(regexp_extract(lower(trim(modelId)), '[^/]+$'), ...), '[^.]+$')
+    normalized = _regexp_extract(model_id.strip().lower(), r"[^/]+$")
+    if normalized is not None:
+        normalized = _regexp_extract(re.sub(r"(-v[0-9]+(:[0-9]+)?|:[0-9]+)$", "", normalized), r"[^.]+$")
+
+    longest = None
+    for key in re.findall(pattern, normalized) if normalized is not None else []:
+        if longest is None or len(key) > len(longest):
+            longest = key
+    return longest if longest is not None else default_key
+
+
+@pytest.mark.parametrize(
+    "model_id",
+    [
+        "anthropic.claude-3-haiku-20240307-v1:0",
+        # 컨텍스트 길이 접미사 - 정규화 키가 가격 키와 정확히 같지 않음
+        "us.anthropic.claude-3-haiku-20240307-v1:0:200k",
+        "arn:aws:bedrock:us-east-1:123456789012:inference-profile/apac.anthropic.claude-3-5-sonnet-20241022-v2:0",
+        "global.anthropic.claude-sonnet-4-5-20250929-v1:0",
+        "  Anthropic.Claude-3-Opus-20240229-V1:0  ",
+        "anthropic.claude-3-5-haiku-20241022-v1:0",
+        # 가격 테이블에 없는 모델 - 기본 가격 모델
+        "amazon.titan-text-express-v1",
+        "",
+    ],
+)
+def test_bedrock_model_key_sql_matches_resolver(model_id):
+    resolved = default_resolver.resolve(model_id)
+    expected = resolved[0].lower() if resolved else DEFAULT_PRICING_MODEL.lower()
+
+    assert _sql_model_key(model_id, bedrock_model_key_sql()) == expected
+
+
+def test_bedrock_model_key_sql_uses_resolver_pattern():
+    key_sql = bedrock_model_key_sql("us-east-1")
+
+    assert default_resolver.key_pattern("us-east-1").replace("'", "''") in key_sql
+    # 카탈로그에 없는 리전은 default 가격 키 사용
+    assert bedrock_model_key_sql("xx-unknown-1") == bedrock_model_key_sql("default")
+
+
+def test_bedrock_price_join_keys_exist_in_price_cte():
+    cte = bedrock_price_cte()
+    cte_keys = set(re.findall(r"\('([^']+)', DATE", cte))
+
+    assert "prices.model_key = COALESCE(reduce(regexp_extract_all(" in bedrock_price_join()
+    for model_id in [
+        "us.anthropic.claude-3-haiku-20240307-v1:0:200k",
+        "anthropic.claude-3-7-sonnet-20250219-v1:0",
+        "meta.llama3-70b-instruct-v1:0",
+    ]:
+        assert _sql_model_key(model_id, bedrock_model_key_sql()) in cte_keys
@@ -0,0 +1,113 @@
+"""QueryResultCache TTL / LRU 테스트"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import query_cache
+from query_cache import (
+    CLOSED_RANGE_TTL,
+    OPEN_RANGE_TTL,
+    QueryResultCache,
+    cache_ttl_for_range,
+    user_cache_dir,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(query_cache.time, "time", clock)
+    return clock
+
+
+def _frame(n=3, seed=0):
+    return pd.DataFrame({"user": [f"u{seed}-{i}" for i in range(n)], "calls": list(range(n))})
+
+
+def test_user_cache_dir_follows_xdg(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert user_cache_dir() == tmp_path / "bedrock_usage"
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    assert user_cache_dir() == tmp_path / "home" / ".cache" / "bedrock_usage"
+
+
+def test_default_cache_dir_is_outside_checkout():
+    checkout = query_cache.Path(query_cache.__file__).resolve().parent
+    assert checkout not in query_cache.DEFAULT_CACHE_DIR.resolve().parents
+
+
+def test_make_key_ignores_whitespace_and_comments():
+    key = QueryResultCache.make_key("SELECT 1\n  FROM t -- note\n", "db", "us-east-1", "1")
+
+    assert key == QueryResultCache.make_key("SELECT 1 FROM t;", "db", "us-east-1", "1")
+    assert key != QueryResultCache.make_key("SELECT 1 FROM t", "db", "us-west-2", "1")
+
+
+def test_cache_ttl_for_range():
+    today = datetime.utcnow()
+    assert cache_ttl_for_range(today) == OPEN_RANGE_TTL
+    assert cache_ttl_for_range(today - timedelta(days=1)) == CLOSED_RANGE_TTL
+
+
+def test_get_returns_stored_frame_until_expiry(tmp_path, clock):
+    cache = QueryResultCache(cache_dir=tmp_path)
+    cache.put("k", _frame(), ttl=60)
+
+    clock.now += 59
+    pd.testing.assert_frame_equal(cache.get("k"), _frame())
+
+    clock.now += 1
+    assert cache.get("k") is None
+    assert list(tmp_path.glob("k.*")) == []
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path, clock):
+    cache = QueryResultCache(cache_dir=tmp_path)
+    cache.put("a", _frame(seed=1), ttl=3600)
+    entry_size = next(tmp_path.glob("a.*")).stat().st_size
+    # 대략 두 항목까지만 들어가는 상한
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+
+    clock.now += 1
+    cache.put("b", _frame(seed=2), ttl=3600)
+    clock.now += 1
+    assert cache.get("a") is not None  # a를 최근 사용으로 갱신
+
+    clock.now += 1
+    cache.put("c", _frame(seed=3), ttl=3600)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_put_evicts_expired_entries(tmp_path, clock):
+    cache = QueryResultCache(cache_dir=tmp_path)
+    cache.put("old", _frame(), ttl=10)
+
+    clock.now += 11
+    cache.put("new", _frame(), ttl=10)
+
+    count = cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    assert count == 1
+
+
+def test_clear(tmp_path, clock):
+    cache = QueryResultCache(cache_dir=tmp_path)
+    cache.put("a", _frame(), ttl=60)
+
+    cache.clear()
+
+    assert cache.get("a") is None
@@ -0,0 +1,64 @@
+"""setup_athena_bucket 테스트 (스텁 Glue 클라이언트)"""
+
+from setup_athena_bucket import build_partition_projection, create_glue_resource
+
+
+class StubGlue:
+    def __init__(self, exists=False, update_error=None):
+        self.exists = exists
+        self.update_error = update_error
+        self.updated = []
+
+    def create_table(self, **config):
+        if self.exists:
+            raise Exception("An error occurred (AlreadyExistsException) when calling CreateTable")
+
+    def update_table(self, **config):
+        if self.update_error is not None:
+            raise self.update_error
+        self.updated.append(config)
+
+
+TABLE = {"DatabaseName": "bedrock_analytics", "TableInput": {"Name": "bedrock_invocation_logs"}}
+
+
+def test_existing_table_is_updated(capsys):
+    glue = StubGlue(exists=True)
+
+    create_glue_resource(glue, "table", "bedrock_invocation_logs", TABLE, update_existing=True)
+
+    assert glue.updated == [TABLE]
+    assert "갱신: bedrock_invocation_logs" in capsys.readouterr().out
+
+
+def test_update_failure_is_reported_without_aborting(capsys):
+    glue = StubGlue(
+        exists=True,
+        update_error=Exception("AccessDeniedException: not authorized to perform glue:UpdateTable"),
+    )
+
+    create_glue_resource(glue, "table", "bedrock_invocation_logs", TABLE, update_existing=True)
+
+    out = capsys.readouterr().out
+    assert "갱신 실패" in out
+    assert "glue:UpdateTable" in out
+
+
+def test_existing_table_left_alone_without_update(capsys):
+    glue = StubGlue(exists=True)
+
+    create_glue_resource(glue, "table", "bedrock_invocation_logs", TABLE)
+
+    assert glue.updated == []
+    assert "존재" in capsys.readouterr().out
+
+
+def test_partition_projection_template():
+    params = build_partition_projection("s3://logs/bedrock-logs/", "123456789012", "us-west-2")
+
+    assert params["projection.enabled"] == "true"
+    assert params["projection.month.digits"] == "2"
+    assert params["storage.location.template"] == (
+        "s3://logs/bedrock-logs/AWSLogs/123456789012/BedrockModelInvocationLogs/us-west-2/"
+        "${year}/${month}/${day}/"
+    )
@@ -0,0 +1,161 @@
+"""TokenCounter 테스트 (toy_encoding 사용)"""
+
+import pytest
+
+from token_counter import TokenCounter
+
+TEXTS = [
+    "def value(self):\n    return self.value",
+    "print(the user)",
+    "",
+    "def value(self):\n    return self.value",
+    "in the\n    value = user",
+]
+
+
+def _encode_len(encoding, text):
+    return len(encoding.encode(text)) if text else 0
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_count_many_matches_encode(toy_encoding, num_threads):
+    counter = TokenCounter(toy_encoding)
+
+    counts = counter.count_many(TEXTS, num_threads=num_threads)
+
+    assert counts == [_encode_len(toy_encoding, text) for text in TEXTS]
+    stats = counter.stats()
+    # 빈 문자열은 조회하지 않고, 같은 배치 안의 중복 텍스트는 한 번만 인코딩
+    assert stats["lookups"] == 4
+    assert stats["cache_misses"] == 3
+    assert stats["cache_hits"] == 1
+    assert stats["encoded_tokens"] == sum(
+        _encode_len(toy_encoding, text) for text in dict.fromkeys(TEXTS)
+    )
+
+
+def test_count_many_reuses_cache_across_calls(toy_encoding):
+    counter = TokenCounter(toy_encoding)
+    counter.count_many(TEXTS)
+
+    assert counter.count_many(TEXTS) == counter.count_many(TEXTS, num_threads=4)
+    assert counter.stats()["cache_misses"] == 3
+
+
+def test_cache_evicts_least_recently_used(toy_encoding):
+    counter = TokenCounter(toy_encoding, cache_size=2)
+
+    counter.count("a")
+    counter.count("b")
+    counter.count("a")  # 최근 사용으로 갱신
+    counter.count("c")  # b 제거
+
+    assert counter.stats()["cache_entries"] == 2
+    misses = counter.stats()["cache_misses"]
+    counter.count("a")
+    assert counter.stats()["cache_misses"] == misses
+    counter.count("b")
+    assert counter.stats()["cache_misses"] == misses + 1
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_special_token_text_falls_back_to_estimate(toy_encoding, num_threads):
+    counter = TokenCounter(toy_encoding)
+    special = "hello <|endoftext|> world"
+
+    counts = counter.count_many([special, "print the value"], num_threads=num_threads)
+
+    assert counts == [len(special) // 3, _encode_len(toy_encoding, "print the value")]
+
+
+def test_without_encoding_estimates_from_length():
+    counter = TokenCounter(None)
+
+    assert counter.count_many(["abcdef", "", "abcdefgh"]) == [2, 0, 2]
+    assert counter.stats()["lookups"] == 0
+
+
+def test_stats_delta_and_add_stats(toy_encoding):
+    counter = TokenCounter(toy_encoding)
+    before = counter.stats()
+    counter.count_many(TEXTS)
+    delta = TokenCounter.stats_delta(before, counter.stats())
+
+    merged = TokenCounter(toy_encoding)
+    merged.add_stats(delta)
+
+    assert merged.stats()["cache_misses"] == delta["cache_misses"] == 3
+    assert merged.stats()["encoded_tokens"] == delta["encoded_tokens"]
+
+
+ALPHABET = ["a", "b", "x", "def", " ", "  ", "    ", "\n", "\n\n", "\r\n", "\t", "(", ")", ":", "'", "'s",
+            "1", "23", "é", "한글", "😀", "!", "."]
+
+
+def _random_text(rng, length):
+    return "".join(rng.choice(ALPHABET) for _ in range(length))
+
+
+@pytest.mark.parametrize("segment_chars", [1, 8, 512])
+def test_incremental_count_equals_full_encode(toy_encoding, monkeypatch, segment_chars):
+    import random
+
+    import token_counter
+
+    monkeypatch.setattr(token_counter, "INCREMENTAL_SEGMENT_CHARS", segment_chars)
+    rng = random.Random(segment_chars)
+    counter = TokenCounter(toy_encoding, cache_size=0)
+
+    text = _random_text(rng, 400)
+    for _ in range(300):
+        # 커서 이동처럼 임의 위치에 삽입/삭제/치환
+        position = rng.randrange(len(text) + 1)
+        removed = rng.choice([0, 0, 1, 3, 20])
+        text = text[:position] + _random_text(rng, rng.choice([0, 1, 2, 10])) + text[position + removed:]
+
+        assert counter.count_many([text], [("user", "file.py")]) == [len(toy_encoding.encode(text))]
+
+    # 접두사/접미사를 실제로 재사용했는지
+    assert counter.stats()["incremental_counts"] > 0
+    assert counter.stats()["reused_chars"] > 0
+
+
+def test_incremental_contexts_are_independent(toy_encoding, monkeypatch):
+    import token_counter
+
+    monkeypatch.setattr(token_counter, "INCREMENTAL_SEGMENT_CHARS", 4)
+    counter = TokenCounter(toy_encoding, cache_size=0, context_cache_size=1)
+    first = "def value(self):\n    return self.value\n" * 5
+    second = "print(the user)\n    user\n" * 5
+
+    for text, context in [(first, "a"), (second, "b"), (first + "x", "a"), (second + "y", "b")]:
+        assert counter.count_many([text], [context]) == [len(toy_encoding.encode(text))]
+
+
+def test_incremental_special_token_falls_back(toy_encoding):
+    counter = TokenCounter(toy_encoding)
+    text = "def value\n    <|endoftext|>\n"
+
+    assert counter.count_many([text], ["ctx"]) == [len(text) // 3]
+
+
+def test_failed_attempt_rolls_back_stats(toy_encoding):
+    counter = TokenCounter(toy_encoding)
+    counter.count("print the value")
+    before = counter.stats()
+
+    with pytest.raises(RuntimeError):
+        with counter.attempt():
+            counter.count_many(["def value", "in the user"])
+            raise RuntimeError("connection reset")
+
+    # 실패한 시도의 통계는 빠지고, 계산한 토큰 수는 캐시에 남음
+    assert {key: counter.stats()[key] for key in ("lookups", "encoded_tokens")} == {
+        key: before[key] for key in ("lookups", "encoded_tokens")
+    }
+    assert counter.stats()["cache_entries"] == 3
+
+    with counter.attempt():
+        with counter.attempt():
+            counter.count("def value")
+    assert counter.stats()["lookups"] == before["lookups"] + 1
@@ -0,0 +1,81 @@
+"""UsageCube 뷰 테스트"""
+
+import pandas as pd
+import pytest
+
+from analytics_core import BedrockAthenaTracker
+from usage_cube import UsageCube
+
+
+@pytest.fixture
+def cube():
+    return UsageCube(
+        pd.DataFrame(
+            {
+                "year": ["2024", "2024", "2024", "2024"],
+                "month": ["9", "9", "10", "10"],
+                "day": ["30", "30", "1", "1"],
+                "hour": ["23", "10", "00", "00"],
+                "user_or_app": ["alice", "bob", "alice", "alice"],
+                "model_name": ["haiku", "sonnet", "haiku", "sonnet"],
+                "call_count": [1, 2, 3, 4],
+                "total_input_tokens": [10, 20, 30, 40],
+                "total_output_tokens": [1, 2, 3, 4],
+                "estimated_cost_usd": [0.1, 0.2, 0.3, 0.4],
+            }
+        )
+    )
+
+
+def test_summary(cube):
+    summary = cube.summary()
+
+    assert summary.iloc[0]["total_calls"] == 10
+    assert summary.iloc[0]["total_input_tokens"] == 100
+    assert summary.iloc[0]["total_cost_usd"] == pytest.approx(1.0)
+
+
+def test_by_user_sorted_by_calls(cube):
+    users = cube.by_user()
+
+    assert users["user_or_app"].tolist() == ["alice", "bob"]
+    assert users["call_count"].tolist() == [8, 2]
+
+
+def test_by_user_app_sorted_by_user_then_calls(cube):
+    user_app = cube.by_user_app()
+
+    assert user_app[["user_or_app", "model_name"]].values.tolist() == [
+        ["alice", "haiku"],
+        ["alice", "sonnet"],
+        ["bob", "sonnet"],
+    ]
+    assert user_app["call_count"].tolist() == [4, 4, 2]
+
+
+def test_by_model_averages(cube):
+    models = cube.by_model().set_index("model_name")
+
+    assert models.loc["sonnet", "call_count"] == 6
+    assert models.loc["sonnet", "avg_input_tokens"] == pytest.approx(60 / 6)
+
+
+def test_time_views_sort_numerically(cube):
+    # 문자열 정렬이면 '10'월이 '9'월보다 앞에 옴
+    assert cube.by_day()[["month", "day"]].values.tolist() == [["9", "30"], ["10", "1"]]
+    assert cube.by_hour()["hour"].tolist() == ["10", "23", "00"]
+
+
+def test_empty_cube_views():
+    cube = UsageCube(pd.DataFrame())
+
+    assert cube.summary().empty
+    assert cube.view("user").empty
+    assert cube.view("daily").empty
+
+
+def test_dashboard_empty_section_list_runs_no_query(stub_boto3, athena):
+    tracker = BedrockAthenaTracker(use_cache=False)
+
+    assert list(tracker.iter_dashboard_results(None, None, sections=[])) == []
+    assert athena.count("start_query_execution") == 0
@@ -0,0 +1,376 @@
+"""
+프롬프트 로그 토큰 수 계산 (배치 + LRU 캐시)
+
+Inline 제안 로그는 같은 사용자의 leftContext/rightContext가 거의 그대로 반복되므로,
+텍스트 내용의 해시로 토큰 수를 기억해 두고 처음 보는 텍스트만 인코더로 계산합니다.
+- 캐시 키: 텍스트의 BLAKE2b 해시 (원문은 보관하지 않아 메모리가 항목 수에 비례)
+- 캐시 크기: 최근 사용 순으로 최대 cache_size개 (LRU)
+- 파일의 레코드를 묶어 한 번에 조회하고, 캐시에 없는 텍스트만 인코딩해 토큰 수만 남김
+  (워커 스레드 밖에서 호출되면 tiktoken encode_batch의 스레드 풀로 한 번에 인코딩)
+
+커서가 조금씩 움직이며 생기는 연속된 Inline 요청은 (사용자, 파일)별로 leftContext의 앞부분과
+rightContext의 뒷부분이 대부분 같으므로, 컨텍스트별 직전 텍스트와 줄 단위 누적 토큰 수를 기억해
+두고 공유 접두사/접미사 사이의 바뀐 부분만 다시 인코딩합니다. cl100k_base의 사전 토큰화
+정규식에서 줄바꿈 바로 뒤는, 이어지는 공백(들여쓰기)에 줄바꿈 없이 공백이 아닌 문자가 나오면
+항상 사전 토큰 경계이고 BPE는 사전 토큰마다 독립적이므로, 그 위치에서 나눠 센 토큰 수의 합은
+전체를 한 번에 인코딩한 결과와 정확히 같습니다.
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+# 기본 캐시 항목 수 (항목당 약 100바이트)
+DEFAULT_TOKEN_CACHE_SIZE = 100_000
+
+# 증분 계산용으로 직전 텍스트를 기억해 둘 최대 컨텍스트 수
+DEFAULT_CONTEXT_CACHE_SIZE = 1024
+
+# 증분 계산 시 누적 토큰 수를 기록하는 최소 간격 (문자 수)
+INCREMENTAL_SEGMENT_CHARS = 512
+
+# 줄 경계에서 나눠 세어도 토큰 수가 같은 인코딩
+INCREMENTAL_ENCODINGS = ('cl100k_base',)
+
+# 누적 통계 항목 (stats_delta/add_stats로 주고받는 합계)
+STAT_KEYS = ('cache_hits', 'cache_misses', 'encoded_chars', 'encoded_tokens', 'encode_seconds',
+             'incremental_counts', 'reused_chars')
+
+
+def _fallback_count(text: str) -> int:
+    # 대략적인 추정 (1토큰 ≈ 3글자)
+    return len(text) // 3
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """두 문자열의 공통 접두사 길이 (이진 탐색, 비교는 슬라이스 단위)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    """두 문자열의 공통 접미사 길이 (최대 limit)"""
+    low, high = 0, min(len(a), len(b), limit)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:len(a) - low] == b[len(b) - mid:len(b) - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _line_boundaries(text: str, start: int, min_gap: int) -> List[Tuple[int, int]]:
+    """start 뒤에서 나눠 인코딩해도 되는 줄 시작 위치 (min_gap 이상 간격)
+
+    Returns:
+        [(분할 위치, 그 위치가 경계인지 결정하는 줄의 첫 번째 공백이 아닌 문자 위치)]
+    """
+    boundaries = []
+    newline = text.find('\n', start + min_gap - 1)
+    while newline != -1:
+        boundary = newline + 1
+        guard = boundary
+        while guard < len(text) and text[guard].isspace() and text[guard] not in '\r\n':
+            guard += 1
+
+        if guard < len(text) and not text[guard].isspace():
+            boundaries.append((boundary, guard))
+            newline = text.find('\n', boundary + min_gap - 1)
+        else:
+            newline = text.find('\n', guard)
+    return boundaries
+
+
+class TokenCounter:
+    """텍스트 토큰 수 계산기 (여러 스레드에서 공유)"""
+
+    def __init__(self, encoding=None, cache_size: int = DEFAULT_TOKEN_CACHE_SIZE, logger=None,
+                 context_cache_size: int = DEFAULT_CONTEXT_CACHE_SIZE):
+        """
+        Args:
+            encoding: tiktoken 인코더 (None이면 글자 수 기반 추정, 캐시 사용 안 함)
+            cache_size: 캐시할 최대 텍스트 수 (0이면 캐시 사용 안 함)
+            logger: 로거 인스턴스 (None이면 기본 로거 사용)
+            context_cache_size: 증분 계산용 직전 텍스트를 기억할 최대 컨텍스트 수
+                (0이거나 인코딩이 INCREMENTAL_ENCODINGS가 아니면 항상 전체 인코딩)
+        """
+        self.encoding = encoding
+        self.cache_size = max(0, cache_size)
+        self.logger = logger if logger else logging.getLogger(__name__)
+        self.context_cache_size = (
+            max(0, context_cache_size)
+            if encoding is not None and encoding.name in INCREMENTAL_ENCODINGS else 0
+        )
+
+        # 컨텍스트 -> (직전 텍스트, [(분할 위치, 경계 결정 위치, 그 위치까지의 누적 토큰 수)], 전체 토큰 수)
+        self._contexts: "OrderedDict[Hashable, Tuple[str, List[Tuple[int, int, int]], int]]" = OrderedDict()
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._totals = dict.fromkeys(STAT_KEYS, 0)
+        self._totals['encode_seconds'] = 0.0
+        # 스레드별로 진행 중인 attempt()의 통계 (실패하면 누적 통계에서 뺌)
+        self._local = threading.local()
+
+    def count(self, text: str) -> int:
+        """텍스트 하나의 토큰 수"""
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: Sequence[str], contexts: Optional[Sequence[Hashable]] = None,
+                   num_threads: int = 1) -> List[int]:
+        """여러 텍스트의 토큰 수 (캐시에 없는 텍스트만 한 번에 인코딩)
+
+        Args:
+            texts: 텍스트 목록 (빈 문자열/None은 0)
+            contexts: 텍스트별 증분 계산 컨텍스트 (예: (사용자 ID, 파일명), None이면 전체 인코딩).
+                같은 컨텍스트의 직전 텍스트와 공유하는 접두사는 다시 인코딩하지 않음
+            num_threads: 전체 인코딩할 텍스트를 encode_batch로 나눠 인코딩할 스레드 수.
+                encode_batch는 호출마다 스레드 풀을 만들므로 이미 워커 스레드에서
+                호출할 때는 1(차례로 인코딩)을 사용
+
+        Returns:
+            texts와 같은 순서의 토큰 수 목록
+        """
+        counts = [0] * len(texts)
+        if self.encoding is None:
+            for i, text in enumerate(texts):
+                if text:
+                    counts[i] = _fallback_count(text)
+            return counts
+
+        keys = [
+            hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+            if text else None
+            for text in texts
+        ]
+
+        # 캐시 조회 (같은 배치 안의 중복 텍스트는 한 번만 계산)
+        pending: Dict[bytes, List[int]] = {}
+        pending_texts: List[str] = []
+        pending_contexts: List[Optional[Hashable]] = []
+        with self._lock:
+            for i, (text, key) in enumerate(zip(texts, keys)):
+                if key is None:
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self._record(cache_hits=1)
+                    counts[i] = cached
+                elif key in pending:
+                    self._record(cache_hits=1)
+                    pending[key].append(i)
+                else:
+                    self._record(cache_misses=1)
+                    pending[key] = [i]
+                    pending_texts.append(text)
+                    pending_contexts.append(contexts[i] if contexts is not None else None)
+
+        if not pending_texts:
+            return counts
+
+        started = time.perf_counter()
+        new_counts = [0] * len(pending_texts)
+        full = []
+        for i, (text, context) in enumerate(zip(pending_texts, pending_contexts)):
+            if context is not None and self.context_cache_size:
+                new_counts[i] = self._count_incremental(text, context)
+            else:
+                full.append(i)
+        if num_threads > 1 and len(full) > 1:
+            batch_counts = self._encode_counts([pending_texts[i] for i in full], num_threads)
+        else:
+            batch_counts = [self._encode_count(pending_texts[i]) for i in full]
+        for i, count in zip(full, batch_counts):
+            new_counts[i] = count
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._record(
+                encode_seconds=elapsed,
+                encoded_chars=sum(len(text) for text in pending_texts),
+                encoded_tokens=sum(new_counts)
+            )
+
+            for (key, indices), count in zip(pending.items(), new_counts):
+                for i in indices:
+                    counts[i] = count
+                if self.cache_size:
+                    self._cache[key] = count
+                    self._cache.move_to_end(key)
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return counts
+
+    def _encode_count(self, text: str) -> int:
+        """인코더로 토큰 수 계산 (토큰 목록은 길이만 남기고 바로 버림)
+
+        tiktoken의 encode_batch는 호출마다 스레드 풀을 새로 만들므로, 이미 워커 스레드에서
+        실행되는 이 경로에서는 텍스트를 차례로 인코딩하는 쪽이 빠릅니다.
+        """
+        try:
+            return len(self.encoding.encode(text))
+        except Exception:
+            # 특수 토큰 문자열이 포함된 텍스트 등
+            return _fallback_count(text)
+
+    def _encode_counts(self, texts: List[str], num_threads: int) -> List[int]:
+        """encode_batch로 여러 텍스트를 스레드 풀에서 인코딩해 토큰 수 계산"""
+        try:
+            return [len(tokens) for tokens in self.encoding.encode_batch(texts, num_threads=num_threads)]
+        except Exception:
+            # 특수 토큰 문자열이 포함된 텍스트가 있으면 텍스트별로 처리
+            return [self._encode_count(text) for text in texts]
+
+    def _count_incremental(self, text: str, context: Hashable) -> int:
+        """같은 컨텍스트의 직전 텍스트와 공유하는 접두사/접미사의 토큰 수를 재사용해 계산
+
+        공유 접두사 안의 마지막 분할 위치까지와 공유 접미사 안의 첫 분할 위치부터는 저장된
+        누적 토큰 수를 쓰고, 그 사이만 INCREMENTAL_SEGMENT_CHARS 이상 간격의 줄 경계에서
+        나눠 인코딩합니다.
+        """
+        with self._lock:
+            state = self._contexts.get(context)
+
+        start, base = 0, 0
+        prefix_checkpoints, suffix_checkpoints = [], []
+        end, suffix_tokens = len(text), 0
+        if state is not None:
+            previous, previous_checkpoints, previous_total = state
+
+            # 경계 결정 위치(줄의 첫 번째 공백이 아닌 문자)까지 같아야 그 앞의 사전 토큰이 같음
+            shared_prefix = _common_prefix_length(previous, text)
+            kept = bisect.bisect_left([guard for _, guard, _ in previous_checkpoints], shared_prefix)
+            if kept:
+                prefix_checkpoints = previous_checkpoints[:kept]
+                start, _, base = prefix_checkpoints[-1]
+
+            # 분할 위치 앞의 줄바꿈까지 같아야 그 뒤의 사전 토큰이 같음
+            shared_suffix = _common_suffix_length(previous, text, min(len(previous), len(text)) - start)
+            shift = len(text) - len(previous)
+            first = bisect.bisect_left(
+                [offset for offset, _, _ in previous_checkpoints],
+                len(previous) - shared_suffix + 1,
+                lo=kept
+            )
+            if first < len(previous_checkpoints):
+                suffix_offset, _, suffix_cumulative = previous_checkpoints[first]
+                end = suffix_offset + shift
+                suffix_tokens = previous_total - suffix_cumulative
+                suffix_checkpoints = [
+                    (offset + shift, guard + shift, cumulative - suffix_cumulative)
+                    for offset, guard, cumulative in previous_checkpoints[first:]
+                ]
+
+        try:
+            checkpoints = list(prefix_checkpoints)
+            total = base
+            position = start
+            for boundary, guard in _line_boundaries(text[:end], start, INCREMENTAL_SEGMENT_CHARS):
+                total += len(self.encoding.encode(text[position:boundary]))
+                checkpoints.append((boundary, guard, total))
+                position = boundary
+            total += len(self.encoding.encode(text[position:end]))
+        except Exception:
+            # 특수 토큰 문자열 등 - 전체 인코딩과 같은 방식으로 처리
+            return self._encode_count(text)
+
+        checkpoints.extend(
+            (offset, guard, total + cumulative) for offset, guard, cumulative in suffix_checkpoints
+        )
+        total += suffix_tokens
+
+        with self._lock:
+            self._contexts[context] = (text, checkpoints, total)
+            self._contexts.move_to_end(context)
+            while len(self._contexts) > self.context_cache_size:
+                self._contexts.popitem(last=False)
+            reused = start + len(text) - end
+            if reused:
+                self._record(incremental_counts=1, reused_chars=reused)
+
+        return total
+
+    def _record(self, **deltas):
+        """누적 통계와 이 스레드에서 진행 중인 attempt()의 통계에 더함 (_lock을 잡은 상태에서 호출)"""
+        counted = getattr(self._local, 'attempt', None)
+        for key, value in deltas.items():
+            self._totals[key] += value
+            if counted is not None:
+                counted[key] += value
+
+    @contextmanager
+    def attempt(self):
+        """이 스레드에서 재시도할 수 있는 작업 한 번(로그 파일 하나 처리 등)의 범위
+
+        예외로 끝나면 그 사이 이 스레드가 더한 통계를 누적 통계에서 빼므로, 실패한 시도의
+        조회/인코딩이 다시 시도할 때 두 번 집계되지 않습니다. 캐시와 증분 계산 상태는
+        토큰 수가 정확하므로 그대로 두고 다음 시도에서 재사용합니다.
+        """
+        outer = getattr(self._local, 'attempt', None)
+        counted = dict.fromkeys(STAT_KEYS, 0)
+        self._local.attempt = counted
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                for key, value in counted.items():
+                    self._totals[key] -= value
+            raise
+        else:
+            if outer is not None:
+                for key, value in counted.items():
+                    outer[key] += value
+        finally:
+            self._local.attempt = outer
+
+    def add_stats(self, delta: Dict):
+        """다른 계산기(프로세스 풀 워커 등)의 stats_delta() 결과를 누적 통계에 합산"""
+        with self._lock:
+            self._record(**{key: delta[key] for key in STAT_KEYS})
+
+    def stats(self) -> Dict:
+        """누적 캐시/처리량 통계"""
+        with self._lock:
+            hits, misses = self._totals['cache_hits'], self._totals['cache_misses']
+            lookups = hits + misses
+            return {
+                'lookups': lookups,
+                **self._totals,
+                'cache_hit_rate': hits / lookups if lookups else 0.0,
+                'cache_entries': len(self._cache),
+            }
+
+    @staticmethod
+    def stats_delta(before: Dict, after: Dict) -> Dict:
+        """두 stats() 사이의 통계 (분석 한 번의 캐시 적중률/처리량)
+
+        Returns:
+            lookups, cache_hits, cache_misses, cache_hit_rate, cache_entries,
+            encoded_chars, encoded_tokens, encode_seconds, tokens_per_second,
+            incremental_counts(공유 접두사를 재사용한 텍스트 수), reused_chars(다시 인코딩하지 않은 문자 수)
+        """
+        delta = {
+            key: after[key] - before[key]
+            for key in ('lookups',) + STAT_KEYS
+        }
+        delta['cache_hit_rate'] = delta['cache_hits'] / delta['lookups'] if delta['lookups'] else 0.0
+        delta['cache_entries'] = after['cache_entries']
+        delta['tokens_per_second'] = (
+            delta['encoded_tokens'] / delta['encode_seconds'] if delta['encode_seconds'] else 0.0
+        )
+        return delta
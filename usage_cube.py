@@ -0,0 +1,158 @@
+"""
+Bedrock 사용량 큐브 (단일 스캔 집계)
+
+bedrock_invocation_logs를 (일, 시간, 사용자/애플리케이션, 모델) 단위로 한 번만 집계한
+결과에서 대시보드의 요약/사용자별/사용자-모델별/모델별/일별/시간대별 뷰를 메모리에서
+파생합니다. 뷰마다 Athena 쿼리를 따로 실행할 때보다 스캔량이 약 1/6로 줄고,
+뷰 전환에는 추가 쿼리가 필요 없습니다.
+"""
+
+from typing import List
+
+import pandas as pd
+
+from pricing import calculate_cost_for_dataframe
+
+# 큐브 차원 / 측정값 컬럼
+CUBE_DIMENSIONS = ["year", "month", "day", "hour", "user_or_app", "model_name"]
+CUBE_MEASURES = ["call_count", "total_input_tokens", "total_output_tokens"]
+COST_MEASURE = "estimated_cost_usd"
+
+
+class UsageCube:
+    """(year, month, day, hour, user_or_app, model_name) 단위 사용량 큐브
+
+    각 뷰는 개별 쿼리(build_*_query)와 같은 컬럼 구성/정렬 순서의 DataFrame을 반환합니다.
+    """
+
+    def __init__(self, cube_df: pd.DataFrame):
+        """
+        Args:
+            cube_df: build_usage_cube_query() 결과 (CUBE_DIMENSIONS + CUBE_MEASURES)
+        """
+        self.df = cube_df
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    @property
+    def measures(self) -> List[str]:
+        """합계 대상 컬럼 (큐브 쿼리 또는 add_costs()로 비용이 있으면 포함)"""
+        if COST_MEASURE in self.df.columns:
+            return CUBE_MEASURES + [COST_MEASURE]
+        return CUBE_MEASURES
+
+    def add_costs(self, region: str = "default", logger=None) -> "UsageCube":
+        """큐브 행(일 x 모델)마다 그날 적용되던 가격으로 비용 계산
+
+        이후 모든 뷰에 estimated_cost_usd가 포함되며, 기간 중 가격이 바뀌어도
+        날짜별로 정확한 가격이 합산됩니다.
+        """
+        if not self.df.empty and COST_MEASURE not in self.df.columns:
+            self.df = calculate_cost_for_dataframe(self.df, region=region, logger=logger)
+        return self
+
+    def _rollup(self, dimensions: List[str]) -> pd.DataFrame:
+        """지정한 차원으로 측정값 합계 (category 컬럼은 실제 조합만 유지)"""
+        if self.df.empty:
+            return pd.DataFrame(columns=dimensions + self.measures)
+
+        return (
+            self.df.groupby(dimensions, observed=True, sort=False)[self.measures]
+            .sum()
+            .reset_index()
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """전체 요약 (build_total_summary_query와 같은 1행 DataFrame)"""
+        if self.df.empty:
+            return pd.DataFrame()
+
+        totals = self.df[self.measures].sum()
+        summary = pd.DataFrame(
+            {
+                "total_calls": [int(totals["call_count"])],
+                "total_input_tokens": [int(totals["total_input_tokens"])],
+                "total_output_tokens": [int(totals["total_output_tokens"])],
+            }
+        )
+        if COST_MEASURE in totals:
+            summary["total_cost_usd"] = [float(totals[COST_MEASURE])]
+        return summary
+
+    def by_user(self) -> pd.DataFrame:
+        """사용자/애플리케이션별 (호출 수 내림차순)"""
+        return (
+            self._rollup(["user_or_app"])
+            .sort_values("call_count", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def by_user_app(self) -> pd.DataFrame:
+        """사용자/애플리케이션 x 모델별 (사용자명, 호출 수 내림차순)"""
+        return (
+            self._rollup(["user_or_app", "model_name"])
+            .sort_values(
+                ["user_or_app", "call_count"], ascending=[True, False], kind="stable"
+            )
+            .reset_index(drop=True)
+        )
+
+    def by_model(self) -> pd.DataFrame:
+        """모델별 (평균 토큰 포함, 호출 수 내림차순)"""
+        model_df = self._rollup(["model_name"])
+        calls = model_df["call_count"].where(model_df["call_count"] > 0)
+        model_df["avg_input_tokens"] = (model_df["total_input_tokens"] / calls).fillna(0.0)
+        model_df["avg_output_tokens"] = (model_df["total_output_tokens"] / calls).fillna(0.0)
+
+        columns = [
+            "model_name",
+            "call_count",
+            "avg_input_tokens",
+            "avg_output_tokens",
+            "total_input_tokens",
+            "total_output_tokens",
+        ]
+        if COST_MEASURE in model_df.columns:
+            columns.append(COST_MEASURE)
+
+        return (
+            model_df[columns]
+            .sort_values("call_count", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def by_day(self) -> pd.DataFrame:
+        """일별 (날짜순)"""
+        return self._sorted_by_time(self._rollup(["year", "month", "day"]))
+
+    def by_hour(self) -> pd.DataFrame:
+        """시간대별 (일시순)"""
+        return self._sorted_by_time(self._rollup(["year", "month", "day", "hour"]))
+
+    def view(self, section: str):
+        """대시보드 섹션 이름으로 뷰 조회 (summary, user, user_app, model, daily, hourly)"""
+        views = {
+            "summary": self.summary,
+            "user": self.by_user,
+            "user_app": self.by_user_app,
+            "model": self.by_model,
+            "daily": self.by_day,
+            "hourly": self.by_hour,
+        }
+        return views[section]()
+
+    @staticmethod
+    def _sorted_by_time(df: pd.DataFrame) -> pd.DataFrame:
+        # 파티션 값은 문자열이므로 정수 기준으로 정렬 (예: '9' < '10')
+        time_columns = [col for col in ["year", "month", "day", "hour"] if col in df.columns]
+        if df.empty:
+            return df
+
+        order = df[time_columns].apply(
+            lambda col: pd.to_numeric(col.astype(str), errors="coerce")
+        )
+        return df.loc[order.sort_values(time_columns, kind="stable").index].reset_index(
+            drop=True
+        )